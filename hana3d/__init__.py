@@ -40,10 +40,16 @@ from .config import HANA3D_DESCRIPTION, HANA3D_NAME, HANA3D_UI
 from .src import async_loop, autothumb, download, upload
 from .src.application.application import Application
 from .src.authentication.authentication import Authentication
+from .src.cache import thumbnail_cache
+from .src.cache.thumbnail_cache import ThumbnailCache
 from .src.edit_asset import operators as edit_ops
 from .src.logs import logger, send_logs
 from .src.panels import panel_builder
+from .src.requests_async.session_pool import SessionPool
 from .src.search import operator as search_op
+from .src.search.local_index import LocalIndex
+from .src.ui.atlas import TextureAtlas
+from .src.ui.thumbnail_textures import ThumbnailTextures
 
 bl_info = {
     'name': 'Hana3D',
@@ -91,6 +97,16 @@ def thumbnail_load(context):
             props.force_preview_reload = True
 
 
+def update_connection_pool(self, context):
+    """Apply the connection pool preferences to the requests sent from now on.
+
+    Parameters:
+        self: add-on preferences
+        context: Blender context
+    """
+    SessionPool().configure()
+
+
 @ bpy.app.handlers.persistent
 def check_timers_timer():
     """Check if all timers are registered regularly.
@@ -112,6 +128,8 @@ def check_timers_timer():
         bpy.app.timers.register(thread_tools.threads_state_update)
     if not bpy.app.timers.is_registered(ui.redraw_regions):
         bpy.app.timers.register(ui.redraw_regions)
+    if not bpy.app.timers.is_registered(thumbnail_cache.save_timer):
+        bpy.app.timers.register(thumbnail_cache.save_timer)
     return 5.0
 
 
@@ -224,6 +242,125 @@ class Hana3DAddonPreferences(AddonPreferences):
         description="Which directories will be used for storing downloaded data",
         default="BOTH",
     )
+    download_segments: IntProperty(
+        name="Download Segments",
+        description="Number of parallel connections used to download large files. "
+        "Set to 1 to always download in a single stream",
+        default=4,
+        min=1,
+        max=16,
+    )
+
+    segmented_download_threshold: IntProperty(
+        name="Segmented Download Threshold (MB)",
+        description="Files larger than this are downloaded in parallel segments, "
+        "when the server supports byte ranges",
+        default=50,
+        min=1,
+    )
+    thumbnail_concurrency: IntProperty(
+        name="Parallel Thumbnail Downloads",
+        description="Number of search thumbnails downloaded at the same time",
+        default=8,
+        min=1,
+        max=32,
+    )
+    instant_local_results: BoolProperty(
+        name="Instant Local Results",
+        description="Show matching assets from previous searches while the server is queried, "
+        "and when it can not be reached",
+        default=True,
+    )
+    search_cache_ttl: IntProperty(
+        name="Search Cache Lifetime",
+        description="Seconds during which repeated searches are answered from memory, "
+        "without asking the server again. Older responses are shown while they are checked, "
+        "up to four times this long. 0 disables the cache",
+        default=300,
+        min=0,
+        max=3600,
+    )
+    prefetch_thumbnail_neighbours: BoolProperty(
+        name="Prefetch Neighbour Thumbnails",
+        description="When hovering an asset, also fetch large thumbnails of the assets beside it",
+        default=True,
+    )
+    http_transport: EnumProperty(
+        name="HTTP Transport",
+        items=(
+            (
+                'NATIVE',
+                'Asyncio',
+                'send requests on the asyncio event loop, without using worker threads',
+            ),
+            (
+                'REQUESTS',
+                'Requests',
+                'send requests with the requests library in worker threads. '
+                'Always used when a proxy is configured',
+            ),
+        ),
+        description="Which HTTP client is used to talk to the server",
+        default="REQUESTS",
+    )
+    http_pool_size: IntProperty(
+        name="Connections per Host",
+        description="Number of idle connections kept open to each server for reuse",
+        default=10,
+        min=1,
+        max=64,
+        update=update_connection_pool,
+    )
+    http_idle_timeout: IntProperty(
+        name="Connection Idle Timeout (s)",
+        description="Idle pooled connections older than this are not reused, 0 for no limit",
+        default=60,
+        min=0,
+        update=update_connection_pool,
+    )
+    max_concurrent_downloads: IntProperty(
+        name="Max Concurrent Downloads",
+        description="Number of assets downloaded at the same time, other downloads wait in a queue",
+        default=4,
+        min=1,
+        max=16,
+    )
+    multipart_upload_threshold: IntProperty(
+        name="Multipart Upload Threshold (MB)",
+        description="Upload files at least this large in parts sent in parallel. "
+        "0 always sends files in a single request",
+        default=100,
+        min=0,
+    )
+    upload_part_size: IntProperty(
+        name="Upload Part Size (MiB)",
+        description="Size of each part of a multipart upload",
+        default=16,
+        min=5,
+        max=512,
+    )
+    max_concurrent_part_uploads: IntProperty(
+        name="Parallel Part Uploads",
+        description="Number of parts of a multipart upload sent at the same time",
+        default=4,
+        min=1,
+        max=16,
+    )
+    cache_size_limit: IntProperty(
+        name="Asset Cache Size Limit (GB)",
+        description="Least recently used asset files are removed from the global directory "
+        "when it grows over this size. 0 means unlimited",
+        default=0,
+        min=0,
+    )
+    thumbnail_cache_size: IntProperty(
+        name="Thumbnail Cache Size Limit (MB)",
+        description="Least recently used search thumbnails are removed from the temp directory "
+        "when it grows over this size. 0 means unlimited",
+        default=500,
+        min=0,
+    )
+
     thumbnail_use_gpu: BoolProperty(
         name="Use GPU for Thumbnails Rendering",
         description="By default this is off so you can continue your work without any lag",
@@ -237,6 +374,40 @@ class Hana3DAddonPreferences(AddonPreferences):
         min=0,
         max=20,
     )
+    next_page_prefetch: IntProperty(
+        name="Prefetch Next Page At (%)",
+        description="Fetch the next page of search results when the asset bar is scrolled "
+        "past this percentage of the loaded results",
+        default=50,
+        min=10,
+        max=100,
+        subtype="PERCENTAGE",
+    )
+    search_all_asset_types: BoolProperty(
+        name="Search All Asset Types",
+        description="Also search the other asset types with the same keywords in the "
+        "background, so switching between them shows results right away",
+        default=False,
+    )
+    batched_asset_bar: BoolProperty(
+        name="Batched Asset Bar Drawing",
+        description="Draw the asset bar thumbnails from a texture atlas with a single batch. "
+        "Frame times of both modes are written to the debug log",
+        default=True,
+    )
+    preview_memory_budget: IntProperty(
+        name="Preview Memory Budget (MB)",
+        description="Memory kept for the previews of the asset types that are not shown. "
+        "0 means unlimited",
+        default=256,
+        min=0,
+    )
+    thumbnail_textures: BoolProperty(
+        name="Decode Thumbnails in Background (Experimental)",
+        description="Decode PNG search thumbnails in worker threads and draw them as textures. "
+        "Other thumbnails, such as JPEGs, are still loaded by Blender",
+        default=False,
+    )
 
     thumb_size: IntProperty(name="Assetbar thumbnail Size", default=96, min=-1, max=256)
 
@@ -302,9 +473,29 @@ class Hana3DAddonPreferences(AddonPreferences):
         layout.prop(self, "project_subdir")
         # layout.prop(self, "temp_dir")
         layout.prop(self, "directory_behaviour")
+        layout.prop(self, "download_segments")
+        layout.prop(self, "segmented_download_threshold")
+        layout.prop(self, "cache_size_limit")
+        layout.prop(self, "thumbnail_cache_size")
+        layout.prop(self, "max_concurrent_downloads")
+        layout.prop(self, "multipart_upload_threshold")
+        layout.prop(self, "upload_part_size")
+        layout.prop(self, "max_concurrent_part_uploads")
+        layout.prop(self, "thumbnail_concurrency")
+        layout.prop(self, "prefetch_thumbnail_neighbours")
+        layout.prop(self, "search_cache_ttl")
+        layout.prop(self, "instant_local_results")
+        layout.prop(self, "http_transport")
+        layout.prop(self, "http_pool_size")
+        layout.prop(self, "http_idle_timeout")
         layout.prop(self, "thumbnail_use_gpu")
         layout.prop(self, "thumb_size")
         layout.prop(self, "max_assetbar_rows")
+        layout.prop(self, "next_page_prefetch")
+        layout.prop(self, "search_all_asset_types")
+        layout.prop(self, "preview_memory_budget")
+        layout.prop(self, "batched_asset_bar")
+        layout.prop(self, "thumbnail_textures")
         layout.prop(self, "search_in_header")
 
         addon_updater_ops.update_settings_ui(self, context)
@@ -340,6 +531,7 @@ def register():
         module.register()
 
     utils.load_prefs()
+    SessionPool().configure()
 
     bpy.app.timers.register(check_timers_timer, persistent=True)
     bpy.app.handlers.load_post.append(scene_load)
@@ -350,6 +542,14 @@ def unregister():
     for module in reversed(modules):
         module.unregister()
 
+    SessionPool().close()
+    if bpy.app.timers.is_registered(thumbnail_cache.save_timer):
+        bpy.app.timers.unregister(thumbnail_cache.save_timer)
+    ThumbnailCache().save()
+    LocalIndex().close()
+    ThumbnailTextures().shutdown()
+    TextureAtlas().clear()
+
     bpy.app.timers.unregister(check_timers_timer)
     bpy.app.handlers.load_post.remove(thumbnail_load)
     bpy.app.handlers.load_post.remove(scene_load)
@@ -28,6 +28,7 @@ from .report_tools import execute_wrapper
 from .src.async_loop import run_async_function
 from .src.preferences.preferences import Preferences
 from .src.preferences.profile import Profile
+from .src.search.local_index import LocalIndex
 from .src.ui import colors
 from .src.ui.main import UI
 from .tasks_queue import add_task
@@ -48,6 +49,21 @@ def login(authenticator: oauth.OAuthAuthenticator):
     add_task(write_tokens, args=(oauth_response,))
 
 
+def create_authenticator() -> oauth.OAuthAuthenticator:
+    """Create an authenticator for the configured Auth0 application.
+
+    Returns:
+        oauth.OAuthAuthenticator: authenticator
+    """
+    return oauth.OAuthAuthenticator(
+        auth0_url=AUTH_URL,
+        platform_url=PLATFORM_URL,
+        client_id=CLIENT_ID,
+        ports=PORTS,
+        audience=AUDIENCE,
+    )
+
+
 def refresh_token(immediate: bool = False) -> dict:
     """Refresh OAuth token.
 
@@ -60,13 +76,7 @@ def refresh_token(immediate: bool = False) -> dict:
         ui.add_report('Already Refreshing token, will be ready soon.')
         return
     preferences.refresh_in_progress = True
-    authenticator = oauth.OAuthAuthenticator(
-        auth0_url=AUTH_URL,
-        platform_url=PLATFORM_URL,
-        client_id=CLIENT_ID,
-        ports=PORTS,
-        audience=AUDIENCE,
-    )
+    authenticator = create_authenticator()
     oauth_response = authenticator.get_refreshed_token(preferences.api_key_refresh)
     if oauth_response['access_token'] is not None and oauth_response['refresh_token'] is not None:
         write_tokens(oauth_response)
@@ -105,6 +115,7 @@ def reset_tokens():
     preferences.refresh_in_progress = False
     if HANA3D_PROFILE in bpy.context.window_manager.keys():
         del bpy.context.window_manager[HANA3D_PROFILE]
+    LocalIndex().clear()
 
 
 class RegisterLoginOnline(bpy.types.Operator):
@@ -128,13 +139,7 @@ class RegisterLoginOnline(bpy.types.Operator):
     @staticmethod
     def start_login_thread():
         global active_authenticator
-        authenticator = oauth.OAuthAuthenticator(
-            auth0_url=AUTH_URL,
-            platform_url=PLATFORM_URL,
-            client_id=CLIENT_ID,
-            ports=PORTS,
-            audience=AUDIENCE,
-        )
+        authenticator = create_authenticator()
         # we store authenticator globally to be able to ping the server if connection fails.
         active_authenticator = authenticator
         thread = threading.Thread(target=login, args=([authenticator]), daemon=True)
@@ -46,6 +46,7 @@ from .config import (
 )
 from .src.libraries.libraries import update_libraries_list
 from .src.search import search
+from .src.search.preview_window import PreviewWindow
 from .src.tags.tags import update_tags_list
 from .src.upload import upload
 
@@ -129,9 +130,7 @@ class Hana3DSkuItem(PropertyGroup):
 class Hana3DUIProps(PropertyGroup):
     def switch_search_results(self, context):
         asset_type = self.asset_type_search.lower()
-        search_results = search.get_search_results(asset_type)
-        for index, search_result in enumerate(search_results):
-            search.load_preview(asset_type, search_result, index)
+        PreviewWindow().switch(asset_type)
 
     def switch_active_asset_type(self, context):
         self.asset_type = self.asset_type_render
@@ -259,7 +258,7 @@ def workspace_items(self, context):
 
 def search_update(self, context):
     logging.debug('search updater')
-    search.run_operator()
+    search.run_operator(debounce=True)
 
 
 class Hana3DTagItem(PropertyGroup):
@@ -278,12 +277,12 @@ class Hana3DCommonSearchProps:
     def update_tags_input(self, context):
         if self.tags_input != '':
             self.tags_list[self.tags_input].selected = True
-            search.run_operator()
+            search.run_operator(debounce=True)
 
     def update_libraries_input(self, context):
         if self.libraries_input != '':
             self.libraries_list[self.libraries_input].selected = True
-            search.run_operator()
+            search.run_operator(debounce=True)
 
     # STATES
     search_keywords: StringProperty(
@@ -211,6 +211,11 @@ def get_download_filenames(asset_data):
         for d in dirs:
             file_name = os.path.join(d, fn)
             file_names.append(file_name)
+
+        from .src.cache.asset_cache import AssetCache  # noqa: WPS433
+        cached_file = AssetCache().lookup(asset_data)
+        if cached_file is not None:
+            file_names[0] = cached_file
     return file_names
 
 
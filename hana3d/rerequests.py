@@ -18,11 +18,10 @@
 import logging
 import uuid
 
-import requests
-
 from . import hana3d_oauth
 from .config import HANA3D_DESCRIPTION
 from .src.preferences.preferences import Preferences
+from .src.requests_async.session_pool import SessionPool
 from .src.ui import colors
 from .src.ui.main import UI
 
@@ -34,7 +33,8 @@ def rerequest(method, url, **kwargs):
         immediate = kwargs['immediate']
         kwargs.pop('immediate')
     # first normal attempt
-    response = requests.request(method, url, **kwargs)
+    session = SessionPool().session
+    response = session.request(method, url, **kwargs)
 
     logging.debug(f'{method.upper()} {url}')
     logging.debug(response.status_code)
@@ -57,7 +57,7 @@ def rerequest(method, url, **kwargs):
             oauth_response = hana3d_oauth.refresh_token(immediate=immediate)
             updated_headers = get_headers(api_key=oauth_response['access_token'])
             kwargs['headers'].update(updated_headers)
-            response = requests.request(method, url, **kwargs)
+            response = session.request(method, url, **kwargs)
     return response
 
 
@@ -1,11 +1,12 @@
 """Hana3D authentication using Auth0."""
 import logging
-import time
 
+from .token_manager import TokenManager
 from ..async_loop import run_async_function
 from ..preferences.preferences import Preferences
 from ..preferences.profile import Profile
-from ...hana3d_oauth import refresh_token
+
+MIN_TIMER_INTERVAL = 10
 
 
 class Authentication(object):
@@ -16,21 +17,23 @@ class Authentication(object):
         self.preferences = Preferences()
         self.profile = Profile()
 
-    def refresh_token_timer(self) -> str:
-        """Refresh the API key token.
+    def refresh_token_timer(self) -> float:
+        """Refresh the API key token ahead of its expiration.
 
         Returns:
-            str: api_key_life
+            float: seconds until the timer runs again
         """
         logging.info('refresh_token_timer')  # noqa: WPS421
         self.update_tokens()
-        return self.preferences.get().api_key_life
+        token_manager = TokenManager()
+        if not self.preferences.get().api_key:
+            return self.preferences.get().api_key_life
+        return max(token_manager.seconds_until_refresh(), MIN_TIMER_INTERVAL)
 
     def update_tokens(self) -> None:
-        """Refresh the API key token."""
+        """Refresh the API key token in the background if it is about to expire."""
         api_key_exists = self.preferences.get().api_key
-        api_key_has_timed_out = self.preferences.get().api_key_timeout < time.time()
-        if (api_key_exists and api_key_has_timed_out):
-            refresh_token(immediate=False)
+        if TokenManager().needs_refresh():
+            run_async_function(TokenManager().refresh)
         if api_key_exists and self.profile.get() is None:
             run_async_function(self.profile.update_async)
@@ -0,0 +1,98 @@
+"""Single-flight refresh of the API token."""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import requests
+
+from ..metaclasses.singleton import Singleton
+from ..preferences.preferences import Preferences
+from ..ui import colors
+from ..ui.main import UI
+from ... import hana3d_oauth
+
+REFRESH_MARGIN = 60  # seconds before api_key_timeout when the token is refreshed
+
+
+class TokenManager(object, metaclass=Singleton):
+    """Refresh the API token off the main thread, sharing one auth call between all callers."""
+
+    def __init__(self) -> None:
+        """Create the TokenManager instance."""
+        self._refresh_task: Optional[asyncio.Future] = None
+
+    def needs_refresh(self) -> bool:
+        """Check if the token expired or is about to expire.
+
+        Returns:
+            bool: True if there is a token that should be refreshed
+        """
+        preferences = Preferences().get()
+        if not preferences.api_key or not preferences.api_key_refresh:
+            return False
+        return preferences.api_key_timeout - REFRESH_MARGIN < time.time()
+
+    def seconds_until_refresh(self) -> float:
+        """Get how long the current token can be used before it should be refreshed.
+
+        Returns:
+            float: seconds until the refresh, 0 if it is due
+        """
+        return max(Preferences().get().api_key_timeout - REFRESH_MARGIN - time.time(), 0)
+
+    async def get_token(self) -> str:
+        """Get a valid token, refreshing it first if it is about to expire.
+
+        Returns:
+            str: API token, empty if the user is logged out
+        """
+        if self.needs_refresh():
+            return await self.refresh()
+        return Preferences().get().api_key
+
+    async def refresh(self, rejected_token: Optional[str] = None) -> str:
+        """Refresh the token, or wait for the refresh that is already running.
+
+        Parameters:
+            rejected_token: token the server refused; if it was already replaced, no refresh is made
+
+        Returns:
+            str: new API token, empty if the refresh failed
+        """
+        api_key = Preferences().get().api_key
+        if rejected_token is not None and api_key and api_key != rejected_token:
+            return api_key
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._refresh())
+        return await asyncio.shield(self._refresh_task)
+
+    async def _refresh(self) -> str:
+        preferences = Preferences().get()
+        ui = UI()
+        logging.debug('refreshing token')
+        preferences.refresh_in_progress = True
+        authenticator = hana3d_oauth.create_authenticator()
+        loop = asyncio.get_event_loop()
+        try:
+            oauth_response = await loop.run_in_executor(
+                None,
+                authenticator.get_refreshed_token,
+                preferences.api_key_refresh,
+            )
+        except requests.exceptions.RequestException as request_error:
+            logging.error(f'Could not reach the auth server to refresh the token: {request_error}')
+            return ''
+        except AssertionError as auth_error:
+            logging.error(f'Token refresh failed: {auth_error}')
+            oauth_response = {}
+        finally:
+            preferences.refresh_in_progress = False
+
+        tokens = (oauth_response.get('access_token'), oauth_response.get('refresh_token'))
+        if None in tokens:
+            ui.add_report('Auto-Login failed, please login manually', color=colors.RED)
+            hana3d_oauth.reset_tokens()
+            return ''
+        hana3d_oauth.write_tokens(oauth_response)
+        return oauth_response['access_token']
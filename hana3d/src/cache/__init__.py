@@ -0,0 +1 @@
+"""Local asset cache module."""
@@ -0,0 +1,284 @@
+"""Content-addressed cache of downloaded asset files."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import urllib.parse
+from typing import Dict, List, Optional, Set
+
+import bpy
+
+from ..metaclasses.singleton import Singleton
+from ..preferences.preferences import Preferences
+
+HASH_CHUNK_SIZE = 1024 * 1024
+INDEX_FILENAME = 'index.json'
+TOUCH_SAVE_INTERVAL = 60  # seconds between index writes caused only by reads
+
+
+def hash_file(file_path: str) -> str:
+    """Compute the sha256 digest of a file without loading it in memory.
+
+    Parameters:
+        file_path: path of the file
+
+    Returns:
+        str: hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as opened_file:
+        for chunk in iter(lambda: opened_file.read(HASH_CHUNK_SIZE), b''):  # noqa: WPS426
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _same_file(first_path: str, second_path: str) -> bool:
+    try:
+        return os.path.samefile(first_path, second_path)
+    except OSError:
+        return os.path.normcase(os.path.realpath(first_path)) == os.path.normcase(
+            os.path.realpath(second_path),
+        )
+
+
+def _asset_keys(asset_data) -> List[str]:
+    keys = []
+    if asset_data.view_id:
+        keys.append(f'view:{asset_data.view_id}')
+    if asset_data.download_url:
+        url_path = urllib.parse.urlsplit(asset_data.download_url).path
+        keys.append(f'url:{url_path}')
+    return keys
+
+
+class AssetCache(object, metaclass=Singleton):  # noqa: WPS214
+    """Hash-named blobs under the global directory, indexed by view_id and url.
+
+    Identical files served under different view_ids are stored only once, and the
+    least recently used blobs are evicted when the cache grows over its size budget.
+    """
+
+    def __init__(self) -> None:
+        """Create the AssetCache instance."""
+        self._cache_dir = ''
+        self._keys: Dict[str, str] = {}
+        self._blobs: Dict[str, Dict] = {}
+        self._last_save = 0.0
+
+    @property
+    def cache_dir(self) -> str:
+        """Directory of the cache, loading its index if the global directory changed.
+
+        Returns:
+            str: cache directory
+        """
+        global_dir = Preferences().get().global_dir
+        if global_dir.startswith('//'):
+            global_dir = bpy.path.abspath(global_dir)
+        cache_dir = os.path.join(global_dir, 'cache')
+        if cache_dir != self._cache_dir:
+            self._load(cache_dir)
+        return cache_dir
+
+    def blob_path(self, digest: str) -> str:
+        """Path of the blob with the given digest.
+
+        Parameters:
+            digest: sha256 of the file
+
+        Returns:
+            str: blob path
+        """
+        extension = self._blobs.get(digest, {}).get('ext', '.blend')
+        return os.path.join(self.cache_dir, 'blobs', digest[:2], f'{digest}{extension}')
+
+    def lookup(self, asset_data) -> Optional[str]:
+        """Get the cached file of an asset.
+
+        Parameters:
+            asset_data: Asset Data
+
+        Returns:
+            str | None: path of the cached file, if there is one
+        """
+        self.cache_dir  # noqa: WPS428
+        for key in _asset_keys(asset_data):
+            digest = self._keys.get(key)
+            if digest is None:
+                continue
+            blob_path = self.blob_path(digest)
+            if not os.path.isfile(blob_path):
+                logging.debug(f'Cached blob {digest} is gone, dropping it from the index')
+                self._drop_blob(digest)
+                self._save()
+                return None
+            self._touch(digest)
+            return blob_path
+        return None
+
+    def store(self, asset_data, file_path: str, digest: str) -> str:
+        """Move a downloaded file into the cache.
+
+        Parameters:
+            asset_data: Asset Data
+            file_path: path of the downloaded file
+            digest: sha256 of the downloaded file
+
+        Returns:
+            str: path of the blob holding the file
+        """
+        self.cache_dir  # noqa: WPS428
+        if digest not in self._blobs:
+            self._blobs[digest] = {
+                'size': os.path.getsize(file_path),
+                'ext': os.path.splitext(file_path)[1] or '.blend',
+                'last_access': time.time(),
+            }
+        blob_path = self.blob_path(digest)
+        if os.path.isfile(blob_path):
+            if not _same_file(file_path, blob_path):
+                logging.info(f'{asset_data.name} is already cached as {digest}, dropping duplicate')
+                os.remove(file_path)
+            os.utime(blob_path)  # revision checks compare against the file timestamps
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(file_path, blob_path)
+
+        for key in _asset_keys(asset_data):
+            self._keys[key] = digest
+        self._touch(digest, force_save=True)
+        self.evict(keep={digest})
+        return blob_path
+
+    async def store_async(self, asset_data, file_path: str) -> str:
+        """Hash a downloaded file in a worker thread and move it into the cache.
+
+        Parameters:
+            asset_data: Asset Data
+            file_path: path of the downloaded file
+
+        Returns:
+            str: path of the blob holding the file
+        """
+        loop = asyncio.get_event_loop()
+        digest = await loop.run_in_executor(None, hash_file, file_path)
+        return self.store(asset_data, file_path, digest)
+
+    def discard(self, asset_data) -> None:
+        """Forget the cached file of an asset, removing the blob if nothing else uses it.
+
+        Parameters:
+            asset_data: Asset Data
+        """
+        self.cache_dir  # noqa: WPS428
+        digests = {self._keys.pop(key) for key in _asset_keys(asset_data) if key in self._keys}
+        for digest in digests:
+            if digest in self._keys.values():
+                continue
+            blob_path = self.blob_path(digest)
+            if os.path.isfile(blob_path):
+                os.remove(blob_path)
+            self._drop_blob(digest)
+        self._save()
+
+    def evict(self, keep: Optional[Set[str]] = None) -> int:
+        """Evict least recently used blobs until the cache fits in its size budget.
+
+        Blobs used by libraries of the open file are never evicted.
+
+        Parameters:
+            keep: digests that should not be evicted
+
+        Returns:
+            int: number of bytes freed
+        """
+        budget = Preferences().get().cache_size_limit * 1000 * 1000 * 1000
+        total_size = sum(blob['size'] for blob in self._blobs.values())
+        if budget <= 0 or total_size <= budget:
+            return 0
+
+        protected = set(keep or ()) | self._referenced_digests()
+        freed = 0
+        by_access = sorted(self._blobs.items(), key=lambda item: item[1]['last_access'])
+        for digest, blob in by_access:
+            if total_size - freed <= budget:
+                break
+            if digest in protected:
+                continue
+            blob_path = self.blob_path(digest)
+            if os.path.isfile(blob_path):
+                os.remove(blob_path)
+            freed += blob['size']
+            self._drop_blob(digest)
+            logging.info(f'Evicted {digest} from asset cache ({blob["size"]} bytes)')
+        self._save()
+        return freed
+
+    def _referenced_digests(self) -> Set[str]:
+        """Get the blobs used by libraries of the open file, directly or through a link.
+
+        Returns:
+            Set[str]: digests of the blobs
+        """
+        blobs_dir = os.path.normcase(os.path.realpath(os.path.join(self._cache_dir, 'blobs')))
+        referenced = set()
+        linked_files = set()
+        for library in bpy.data.libraries:
+            library_path = os.path.normcase(os.path.realpath(bpy.path.abspath(library.filepath)))
+            if library_path.startswith(blobs_dir):
+                digest = os.path.splitext(os.path.basename(library_path))[0]
+                referenced.add(digest)
+            elif os.path.isfile(library_path):
+                library_stat = os.stat(library_path)
+                linked_files.add((library_stat.st_dev, library_stat.st_ino))
+        if not linked_files:
+            return referenced
+        for digest in self._blobs:
+            blob_path = self.blob_path(digest)
+            if not os.path.isfile(blob_path):
+                continue
+            blob_stat = os.stat(blob_path)
+            if (blob_stat.st_dev, blob_stat.st_ino) in linked_files:
+                referenced.add(digest)
+        return referenced
+
+    def _touch(self, digest: str, force_save: bool = False) -> None:
+        now = time.time()
+        self._blobs[digest]['last_access'] = now
+        if force_save or now - self._last_save > TOUCH_SAVE_INTERVAL:
+            self._save()
+
+    def _drop_blob(self, digest: str) -> None:
+        self._blobs.pop(digest, None)
+        for key in [key for key, value in self._keys.items() if value == digest]:
+            self._keys.pop(key)
+
+    def _load(self, cache_dir: str) -> None:
+        self._cache_dir = cache_dir
+        self._keys = {}
+        self._blobs = {}
+        index_path = os.path.join(cache_dir, INDEX_FILENAME)
+        if not os.path.isfile(index_path):
+            return
+        try:
+            with open(index_path, 'r') as index_file:
+                index = json.load(index_file)
+            self._keys = index['keys']
+            self._blobs = index['blobs']
+        except (OSError, KeyError, ValueError) as error:
+            logging.error(f'Could not read asset cache index {index_path}: {error}')
+
+    def _save(self) -> None:
+        os.makedirs(self._cache_dir, exist_ok=True)
+        index_path = os.path.join(self._cache_dir, INDEX_FILENAME)
+        tmp_index_path = f'{index_path}_tmp'
+        try:
+            with open(tmp_index_path, 'w') as index_file:
+                json.dump({'keys': self._keys, 'blobs': self._blobs}, index_file)
+            os.replace(tmp_index_path, index_path)
+        except OSError as error:
+            logging.error(f'Could not write asset cache index {index_path}: {error}')
+            return
+        self._last_save = time.time()
@@ -0,0 +1,207 @@
+"""Size-bounded cache of the thumbnails downloaded by searches."""
+import json
+import logging
+import os
+import time
+from typing import Dict, Set
+
+import bpy
+
+from ..metaclasses.singleton import Singleton
+from ..preferences.preferences import Preferences
+
+INDEX_FILENAME = 'thumbnails.json'
+SAVE_INTERVAL = 30  # seconds between index writes, from a timer
+EVICTION_TARGET = 0.9  # fraction of the budget kept by an eviction, so it does not run on each add
+
+
+class ThumbnailCache(object, metaclass=Singleton):  # noqa: WPS214
+    """Thumbnails under the temp directory, tracked by an index instead of per-file stat calls.
+
+    The index survives restarts, and the least recently used thumbnails are removed when the
+    cache grows over its size budget. Lookups only read memory, as they run while drawing; the
+    index is written by `save_timer` and when the add-on is unregistered.
+    """
+
+    def __init__(self) -> None:
+        """Create the ThumbnailCache instance."""
+        self._temp_dir = ''
+        self._entries: Dict[str, Dict] = {}
+        self._total_size = 0
+        self._dirty = False
+
+    def contains(self, thumbnail_path: str) -> bool:
+        """Check if a thumbnail was downloaded, marking it as recently used.
+
+        The file is not checked; when it fails to load, the caller discards it from the cache.
+
+        Parameters:
+            thumbnail_path: path of the thumbnail
+
+        Returns:
+            bool: True if the thumbnail is in the cache
+        """
+        key = self._key(thumbnail_path)
+        entry = self._entries.get(key) if key else None
+        if entry is None:
+            return False
+        entry['last_access'] = time.time()
+        self._dirty = True
+        return True
+
+    def add(self, thumbnail_path: str) -> None:
+        """Track a downloaded thumbnail, evicting old ones if the cache is over its budget.
+
+        Parameters:
+            thumbnail_path: path of the thumbnail
+        """
+        key = self._key(thumbnail_path)
+        if not key:
+            return
+        size = os.path.getsize(thumbnail_path)
+        previous = self._entries.get(key)
+        if previous is not None:
+            self._total_size -= previous['size']
+        self._entries[key] = {'size': size, 'last_access': time.time()}
+        self._total_size += size
+        self._dirty = True
+        self.evict()
+
+    def discard(self, thumbnail_path: str) -> None:
+        """Forget a thumbnail whose file is missing or broken.
+
+        Parameters:
+            thumbnail_path: path of the thumbnail
+        """
+        key = self._key(thumbnail_path)
+        entry = self._entries.pop(key, None) if key else None
+        if entry is not None:
+            self._total_size -= entry['size']
+            self._dirty = True
+
+    def evict(self) -> int:
+        """Remove least recently used thumbnails until the cache fits in its size budget.
+
+        Thumbnails loaded as Blender images are never removed.
+
+        Returns:
+            int: number of bytes freed
+        """
+        budget = Preferences().get().thumbnail_cache_size * 1000 * 1000
+        if budget <= 0 or self._total_size <= budget:
+            return 0
+
+        target = budget * EVICTION_TARGET
+        protected = self._loaded_images()
+        freed = 0
+        by_access = sorted(self._entries.items(), key=lambda item: item[1]['last_access'])
+        for key, entry in by_access:
+            if self._total_size <= target:
+                break
+            thumbnail_path = os.path.join(self._temp_dir, key)
+            if os.path.normcase(thumbnail_path) in protected:
+                continue
+            try:
+                os.remove(thumbnail_path)
+            except FileNotFoundError:
+                logging.debug(f'Thumbnail {thumbnail_path} was already removed')
+            self._entries.pop(key)
+            self._total_size -= entry['size']
+            freed += entry['size']
+        logging.info(f'Evicted {freed} bytes of thumbnails ({self._total_size} bytes cached)')
+        self._dirty = True
+        return freed
+
+    def save(self) -> None:
+        """Write the index if it changed since it was last written."""
+        if not self._dirty or not self._temp_dir:
+            return
+        index_path = os.path.join(self._temp_dir, INDEX_FILENAME)
+        tmp_index_path = f'{index_path}_tmp'
+        try:
+            with open(tmp_index_path, 'w') as index_file:
+                json.dump(self._entries, index_file, separators=(',', ':'))
+            os.replace(tmp_index_path, index_path)
+        except OSError as error:
+            logging.error(f'Could not write thumbnail cache index {index_path}: {error}')
+            return
+        self._dirty = False
+
+    def _key(self, thumbnail_path: str) -> str:
+        """Index key of a thumbnail, loading the index of its temp directory if needed.
+
+        Thumbnails are stored as `<temp dir>/<asset type>_search/<file>`, so the key is
+        derived from the path alone, without touching the file system.
+
+        Parameters:
+            thumbnail_path: path of the thumbnail
+
+        Returns:
+            str: path of the thumbnail relative to the temp directory, empty for other files
+        """
+        search_dir, filename = os.path.split(thumbnail_path)
+        temp_dir, search_dir_name = os.path.split(search_dir)
+        if not search_dir_name.endswith('_search'):
+            return ''
+        if temp_dir != self._temp_dir:
+            self._load(temp_dir)
+        return os.path.join(search_dir_name, filename)
+
+    def _loaded_images(self) -> Set[str]:
+        return {
+            os.path.normcase(bpy.path.abspath(image.filepath))
+            for image in bpy.data.images
+            if image.filepath
+        }
+
+    def _load(self, temp_dir: str) -> None:
+        self.save()
+        self._temp_dir = temp_dir
+        self._entries = {}
+        self._dirty = False
+        index_path = os.path.join(temp_dir, INDEX_FILENAME)
+        if os.path.isfile(index_path):
+            try:
+                with open(index_path, 'r') as index_file:
+                    self._entries = json.load(index_file)
+            except (OSError, ValueError) as error:
+                logging.error(f'Could not read thumbnail cache index {index_path}: {error}')
+                self._entries = self._scan(temp_dir)
+        else:
+            self._entries = self._scan(temp_dir)
+        self._total_size = sum(entry['size'] for entry in self._entries.values())
+
+    def _scan(self, temp_dir: str) -> Dict[str, Dict]:
+        """Index the thumbnails already on disk, for directories written before the index.
+
+        Parameters:
+            temp_dir: temp directory holding the search thumbnail directories
+
+        Returns:
+            Dict[str, Dict]: size and last access of each thumbnail, by relative path
+        """
+        entries: Dict[str, Dict] = {}
+        if not os.path.isdir(temp_dir):
+            return entries
+        for directory in os.scandir(temp_dir):
+            if not directory.is_dir() or not directory.name.endswith('_search'):
+                continue
+            for thumbnail in os.scandir(directory.path):
+                if not thumbnail.is_file() or thumbnail.name.endswith('_tmp'):
+                    continue
+                stat = thumbnail.stat()
+                key = os.path.join(directory.name, thumbnail.name)
+                entries[key] = {'size': stat.st_size, 'last_access': stat.st_atime}
+        self._dirty = bool(entries)
+        logging.info(f'Indexed {len(entries)} thumbnails in {temp_dir}')
+        return entries
+
+
+def save_timer() -> float:
+    """Write the thumbnail cache index from a Blender timer.
+
+    Returns:
+        float: seconds until the next write
+    """
+    ThumbnailCache().save()
+    return SAVE_INTERVAL
@@ -19,8 +19,6 @@ import functools
 import json
 import logging
 import os
-import shutil
-from dataclasses import asdict
 from queue import Queue
 
 import bpy
@@ -36,11 +34,16 @@ from bpy.props import (
 
 from .downloader import Downloader
 from .lib import check_existing
+from .links import link_file
+from .partial import has_partial
+from .scheduler import DownloadPriority, DownloadScheduler
 from ..asset.asset_type import AssetType
 from ..async_loop import ensure_async_loop
+from ..cache.asset_cache import AssetCache
 from ..libraries.libraries import set_library_props, update_libraries_list
+from ..search.local_index import LocalIndex
 from ..search.query import Query
-from ..search.search import AssetData, get_search_results
+from ..search.search import AssetData, get_search_results, get_thumbnail_path
 from ..tags.tags import update_tags_list
 from ..ui import colors
 from ..ui.main import UI
@@ -70,15 +73,18 @@ def check_missing():
             missing.append(library)
 
     for library in missing:
-        asset_data = library['asset_data']
+        asset_data = AssetData(**library['asset_data'].to_dict())
         downloaded = check_existing(asset_data)
         if downloaded:
             try:
                 library.reload()
             except Exception:
-                download(library['asset_data'], redownload=True)
+                download(asset_data, priority=DownloadPriority.batch, redownload=True)
         else:
-            download(library['asset_data'], redownload=True)
+            file_names = paths.get_download_filenames(asset_data)
+            if file_names and has_partial(file_names[0]):
+                logging.info(f'Resuming interrupted download of {asset_data.name}')
+            download(asset_data, priority=DownloadPriority.batch, redownload=True)
 
 
 def get_used_libs() -> set:
@@ -136,12 +142,13 @@ def set_thumbnail(asset_data, asset):
         asset_props = getattr(asset, HANA3D_NAME)
         asset_props.thumbnail = ''
     else:
-        thumbnail_name = asset_data.thumbnail.split(os.sep)[-1]  # noqa: WPS204
-        tempdir = paths.get_temp_dir(f'{asset_data.asset_type}_search')  # noqa: WPS204
-        thumbpath = os.path.join(tempdir, thumbnail_name)
+        thumbpath = get_thumbnail_path(asset_data)
         asset_thumbs_dir = paths.get_download_dirs(asset_data.asset_type)[0]
-        asset_thumb_path = os.path.join(asset_thumbs_dir, thumbnail_name)
-        shutil.copy(thumbpath, asset_thumb_path)
+        asset_thumb_path = os.path.join(asset_thumbs_dir, os.path.basename(thumbpath))
+        try:
+            link_file(thumbpath, asset_thumb_path, allow_symlink=False)  # search dir is temporary
+        except OSError as error:
+            logging.warning(f'Could not keep thumbnail of {asset_data.name}: {error}')
         asset_props = getattr(asset, HANA3D_NAME)
         asset_props.thumbnail = asset_thumb_path
 
@@ -176,7 +183,7 @@ def process_finished_thread(downloader: Downloader):
     # duplicate file if the global and subdir are used in prefs
     # todo this should try to check if both files exist and are ok.
     if len(file_names) == 2:
-        shutil.copyfile(file_names[0], file_names[1])
+        link_file(file_names[0], file_names[1], allow_symlink=False)  # cache blobs can be evicted
 
     if downloader.passargs.get('redownload'):
         # handle lost libraries here:
@@ -203,9 +210,11 @@ def execute_append_tasks():
         append_tasks_queue.task_done()
     except Exception as e:
         asset_data, = task.args
-        file_names = file_names = paths.get_download_filenames(asset_data)
+        file_names = paths.get_download_filenames(asset_data)
+        AssetCache().discard(asset_data)
         for f in file_names:
-            remove_file(f)
+            if os.path.isfile(f):
+                remove_file(f)
         ui = UI()
         ui.add_report(f'Error when appending {asset_data.name} to scene: {e}', color=colors.RED)
 
@@ -223,7 +232,7 @@ def timer_update():  # TODO might get moved to handle all hana3d stuff, not to s
     '''check for running and finished downloads and react. write progressbars too.'''
     if len(download_threads) == 0:
         return 1.0
-    for view_id, downloader in download_threads.items():
+    for view_id, downloader in list(download_threads.items()):
         if downloader.finished:
             # Ignore download theads that are finished but the asset was not appended
             continue
@@ -232,6 +241,15 @@ def timer_update():  # TODO might get moved to handle all hana3d stuff, not to s
             update_downloaded_progress(downloader)
             continue
 
+        if downloader.interrupted():
+            ui = UI()
+            ui.add_report(
+                f'Download of {asset_data.name} was interrupted, it will resume on the next try',
+                color=colors.RED,
+            )
+            download_threads.pop(view_id)
+            continue
+
         if bpy.context.mode == 'EDIT' and asset_data.asset_type in {'model', 'material'}:
             continue
 
@@ -243,20 +261,20 @@ def timer_update():  # TODO might get moved to handle all hana3d stuff, not to s
     return 0.1
 
 
-def download(asset_data, **kwargs):
-    '''start the download thread'''
+def download(asset_data, priority: DownloadPriority = DownloadPriority.user, **kwargs):
+    '''queue the download in the scheduler, it starts when a transfer slot is free'''
 
     # incoming data can be either directly dict from python, or blender id property
     # (recovering failed downloads on reload)
     if type(asset_data) == dict:
         asset_data = AssetData(**asset_data)
 
-    logging.debug(f'Downloading asset_data {json.dumps(asdict(asset_data))}')
+    logging.debug(f'Downloading asset_data {json.dumps(asset_data.to_dict())}')
     thread = Downloader(asset_data, **kwargs)
-    thread.start()
 
     view_id = asset_data.view_id
     download_threads[view_id] = thread
+    DownloadScheduler().submit(thread, priority)
 
 
 def add_import_params(thread: Downloader, location, rotation):
@@ -378,7 +396,7 @@ def import_model(window_manager, asset_data: AssetData, file_names: list, **kwar
     if link:
         group = parent.instance_collection
         lib = group.library
-        lib['asset_data'] = asdict(asset_data)
+        lib['asset_data'] = asset_data.to_dict()
 
     utils.fill_object_metadata(parent)
     return parent
@@ -427,7 +445,7 @@ def import_material(asset_data: AssetData, file_names: list, **kwargs):
 
 def set_asset_props(asset, asset_data):
     asset_props = getattr(asset, HANA3D_NAME)
-    asset['asset_data'] = asdict(asset_data)
+    asset['asset_data'] = asset_data.to_dict()
 
     set_thumbnail(asset_data, asset)
 
@@ -477,7 +495,8 @@ def append_asset(asset_data: AssetData, **kwargs):
         asset = import_material(asset_data, file_names, **kwargs)
 
     wm[f'{HANA3D_NAME}_assets_used'] = wm.get(f'{HANA3D_NAME}_assets_used', {})
-    wm[f'{HANA3D_NAME}_assets_used'][asset_data.view_id] = asdict(asset_data)
+    wm[f'{HANA3D_NAME}_assets_used'][asset_data.view_id] = asset_data.to_dict()
+    LocalIndex().mark_downloaded(asset_data.view_id)
 
     set_asset_props(asset, asset_data)
 
@@ -532,17 +551,23 @@ def check_asset_in_scene(asset_data: AssetData) -> str:
     return ''
 
 
-def start_download(asset_data: AssetData, **kwargs):
+def start_download(
+    asset_data: AssetData,
+    priority: DownloadPriority = DownloadPriority.user,
+    **kwargs,
+):
     """
     Check if file isn't downloading or doesn't exist, then start new download.
 
     Parameters:
         asset_data: asset data
+        priority: priority class of the download
         kwargs: additional parameters
     """
     logging.info(f'Starting download {asset_data.name}')
     view_id = asset_data.view_id
     if view_id in download_threads and download_threads[view_id].is_alive():
+        DownloadScheduler().reprioritize(view_id, priority)
         if asset_data.asset_type in {'model', 'material'}:
             thread = download_threads[view_id]
             add_import_params(thread, kwargs['model_location'], kwargs['model_rotation'])
@@ -561,10 +586,10 @@ def start_download(asset_data: AssetData, **kwargs):
             'location': kwargs['model_location'],
             'rotation': kwargs['model_rotation'],
         }
-        download(asset_data, import_params=[transform], **kwargs)
+        download(asset_data, priority=priority, import_params=[transform], **kwargs)
 
     elif asset_data.asset_type == 'scene':
-        download(asset_data, **kwargs)
+        download(asset_data, priority=priority, **kwargs)
 
 
 asset_types = (
@@ -588,6 +613,7 @@ class Hana3DKillDownloadOperator(bpy.types.Operator):
     def execute(self, context):
         thread = download_threads.pop(self.view_id)
         thread.stop()
+        DownloadScheduler().cancel(self.view_id)
 
         tasks = []
         while not append_tasks_queue.empty():
@@ -740,7 +766,7 @@ class Hana3DBatchDownloadOperator(bpy.types.Operator):  # noqa : WPS338
 
     batch_size: IntProperty(  # type: ignore
         name='Batch Size',
-        description='number of objects to download in parallel',
+        description='number of objects to queue for download at once',
         default=20,  # noqa : WPS432
     )
 
@@ -811,7 +837,7 @@ class Hana3DBatchDownloadOperator(bpy.types.Operator):  # noqa : WPS338
                 'replace': False,
             }
 
-            start_download(asset_data, **kwargs)
+            start_download(asset_data, priority=DownloadPriority.batch, **kwargs)
 
         return {'FINISHED'}
 
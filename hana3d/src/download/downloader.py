@@ -1,16 +1,57 @@
 """Downloader class."""
 import asyncio
 import logging
+import math
 import os
 import threading
-from typing import Optional
+from typing import Callable, List, Optional
+
+import requests
 
 from .lib import check_existing
+from .partial import PartialDownload, load_partial, remove_partial, save_partial
 from ..async_loop import run_async_function
+from ..cache.asset_cache import AssetCache
+from ..preferences.preferences import Preferences
+from ..requests_async.basic_request import iter_content_async
 from ..requests_async.requests_async import Request
 from ..search.search import AssetData
 from ... import paths
 
+CHUNK_SIZE = 500 * 1000
+MAX_RESUME_ATTEMPTS = 3
+SIDECAR_SAVE_INTERVAL = 5 * 1000 * 1000  # bytes written between sidecar updates
+RETRYABLE_CLIENT_ERRORS = frozenset((408, 425, 429))
+
+
+class SegmentRejectedError(Exception):
+    """Server refused to answer a byte range of a segmented download."""
+
+
+class DownloadFailedError(Exception):
+    """Server answered with an error that retrying or resuming the download will not fix."""
+
+
+def _check_response(response: requests.Response) -> bool:
+    """Check the status of the response to a download, closing it if it failed.
+
+    Parameters:
+        response: response to the request of the file
+
+    Returns:
+        bool: True if the file is being sent
+
+    Raises:
+        DownloadFailedError: the server refused the request, trying again will not help
+    """
+    if response.ok:
+        return True
+    response.close()
+    status_code = response.status_code
+    if 400 <= status_code < 500 and status_code not in RETRYABLE_CLIENT_ERRORS:  # noqa: WPS432
+        raise DownloadFailedError(f'Server answered {status_code}')
+    return False
+
 
 class Downloader(object):  # noqa: WPS214
     """Class responsible for downloading assets asynchronously."""
@@ -31,6 +72,10 @@ class Downloader(object):  # noqa: WPS214
         self._queue: asyncio.Queue = asyncio.LifoQueue()
         self._progress = 0
         self._stop_event = threading.Event()
+        self._interrupted = False
+        self._unsaved_bytes = 0
+        self._queued = False
+        self._ranges_supported = True
 
     def stop(self) -> None:
         """Stop current download."""
@@ -45,13 +90,27 @@ class Downloader(object):  # noqa: WPS214
         return self._stop_event.is_set()
 
     def is_alive(self) -> bool:
-        """Return if the download is currently happening.
+        """Return if the download is currently happening or waiting to start.
 
         Returns:
-            bool: True if the download has started and not finished, False otherwise
+            bool: True if the download is queued or has started and not finished, False otherwise
         """
+        if self._queued:
+            return not self.stopped()
         return not self._task.done() if self._task else False
 
+    def mark_queued(self) -> None:
+        """Flag the download as waiting for a transfer slot in the scheduler."""
+        self._queued = True
+
+    def queued(self) -> bool:
+        """Return if the download is waiting for a transfer slot.
+
+        Returns:
+            bool: True if the download has not started yet
+        """
+        return self._queued
+
     def set_progress(self, progress: int) -> None:
         """Manually updates the download progress.
 
@@ -72,8 +131,13 @@ class Downloader(object):  # noqa: WPS214
             pass  # noqa: WPS420
         return self._progress
 
-    def start(self):
-        """Try to download file from Hana3D."""
+    def start(self, done_callback: Optional[Callable] = None):
+        """Try to download file from Hana3D.
+
+        Parameters:
+            done_callback: called when the download task is done, if a download is needed
+        """
+        self._queued = False
         asset_data = self.asset_data
 
         # only now we can check if the file already exists.
@@ -92,49 +156,278 @@ class Downloader(object):  # noqa: WPS214
             logging.debug(f'Stopping download: {asset_data.name}')
             return
 
-        self._task = run_async_function(self._download_async)
+        self._task = run_async_function(self._download_async, done_callback)
 
-    def _read_chunk(self, iterator):
-        try:
-            return next(iterator)
-        except Exception:
-            return b''
+    def interrupted(self) -> bool:
+        """Return if the download stopped before the whole file was received.
+
+        Returns:
+            bool: True if the download was interrupted and can be resumed later
+        """
+        return self._interrupted
 
     async def _download_async(self):
         asset_data = self.asset_data
 
         file_name = paths.get_download_filenames(asset_data)[0]  # prefer global dir if possible.
-
         tmp_file_name = f'{file_name}_tmp'
+
+        finished = False
+        for attempt in range(MAX_RESUME_ATTEMPTS):
+            try:
+                finished = await self._download_attempt(tmp_file_name)
+            except DownloadFailedError as failure:
+                logging.error(f'Could not download {asset_data.name}: {failure}')
+                remove_partial(tmp_file_name)
+                return
+            except (OSError, requests.exceptions.RequestException) as error:
+                logging.warning(f'Error when downloading {asset_data.name}: {error}')
+            if finished or self.stopped():
+                break
+            logging.info(f'Download of {asset_data.name} interrupted (attempt {attempt + 1})')
+
+        if not finished:
+            self._interrupted = not self.stopped()
+            return
+
+        remove_partial(tmp_file_name, keep_file=True)
+        os.rename(tmp_file_name, file_name)
+        try:
+            await AssetCache().store_async(asset_data, file_name)
+        except OSError as error:
+            logging.warning(f'Could not add {asset_data.name} to the asset cache: {error}')
+
+    async def _download_attempt(self, tmp_file_name: str) -> bool:
+        """Download asset file to its temporary file, resuming it when possible.
+
+        Parameters:
+            tmp_file_name: path of the temporary file
+
+        Returns:
+            bool: True if the whole file was downloaded
+        """
+        partial = load_partial(tmp_file_name, self.asset_data.download_url)
+        if partial is not None and partial.segments:
+            if self._ranges_supported:
+                logging.info(f'Resuming segmented download of {self.asset_data.name}')
+                return await self._download_segments(tmp_file_name, partial)
+            remove_partial(tmp_file_name)
+            partial = None
+
+        response, partial = await self._request_file(tmp_file_name, partial)
+        if not _check_response(response):
+            return False
+
+        if partial is None and self._should_segment(response):
+            partial = self._preallocate_segments(tmp_file_name, response)
+            return await self._download_segments(tmp_file_name, partial, response)
+
+        return await self._stream_to_tmp(tmp_file_name, response, partial)
+
+    async def _request_file(self, tmp_file_name: str, partial: Optional[PartialDownload]):
+        asset_data = self.asset_data
+
+        headers = {}
+        if partial is not None:
+            logging.info(f'Resuming {asset_data.name} from byte {partial.bytes_written}')
+            headers['Range'] = f'bytes={partial.bytes_written}-'
+            if partial.etag:
+                headers['If-Range'] = partial.etag
+
+        request = Request()
+        response = await request.get(asset_data.download_url, stream=True, headers=headers)
+
+        if partial is not None and response.status_code == 416:  # noqa: WPS432
+            logging.debug(f'Range not satisfiable, restarting {asset_data.name}')
+            response.close()
+            remove_partial(tmp_file_name)
+            response = await request.get(asset_data.download_url, stream=True, headers={})
+            partial = None
+
+        resumed = partial is not None and response.status_code == 206  # noqa: WPS432
+        if partial is not None and not resumed:
+            logging.debug(f'Server did not accept range request for {asset_data.name}')
+        return response, partial if resumed else None
+
+    def _should_segment(self, response: requests.Response) -> bool:
+        preferences = Preferences().get()
+        total_length = response.headers.get('Content-Length')
+        if not self._ranges_supported:
+            return False
+        if preferences.download_segments < 2 or total_length is None:
+            return False
+        if response.headers.get('Accept-Ranges', '').lower() != 'bytes':
+            logging.debug(f'Server does not accept ranges for {self.asset_data.name}')
+            return False
+        threshold = preferences.segmented_download_threshold * 1000 * 1000
+        return response.status_code == 200 and int(total_length) >= threshold  # noqa: WPS432
+
+    def _preallocate_segments(
+        self,
+        tmp_file_name: str,
+        response: requests.Response,
+    ) -> PartialDownload:
+        file_size = int(response.headers['Content-Length'])
+        n_segments = Preferences().get().download_segments
+        segment_size = math.ceil(file_size / n_segments)
+
+        segments = [
+            [start, min(start + segment_size, file_size) - 1, 0]
+            for start in range(0, file_size, segment_size)
+        ]
         with open(tmp_file_name, 'wb') as tmp_file:
-            logging.info(f'Downloading {file_name}')
+            tmp_file.truncate(file_size)
+
+        partial = PartialDownload(
+            url=self.asset_data.download_url,
+            etag=response.headers.get('ETag', ''),
+            bytes_written=0,
+            size=file_size,
+            segments=segments,
+        )
+        save_partial(tmp_file_name, partial)
+        logging.info(f'Downloading {self.asset_data.name} in {len(segments)} segments')
+        return partial
+
+    async def _download_segments(  # noqa: WPS210
+        self,
+        tmp_file_name: str,
+        partial: PartialDownload,
+        first_response: Optional[requests.Response] = None,
+    ) -> bool:
+        """Download the segments of a file in parallel.
+
+        If the server rejects a range, the other segments are cancelled and the file is streamed
+        in a single request instead, in this same attempt and in every later one.
+
+        Parameters:
+            tmp_file_name: path of the temporary file
+            partial: bookkeeping of the segments
+            first_response: response already streaming the start of the file
+
+        Returns:
+            bool: True if the whole file was downloaded
+        """
+        tasks = []
+        for index, segment in enumerate(partial.segments):
+            response = first_response if index == 0 else None
+            tasks.append(
+                asyncio.ensure_future(
+                    self._download_segment(tmp_file_name, partial, segment, response),
+                ),
+            )
+
+        pending = set(tasks)
+        rejection = None
+        while pending and rejection is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            rejection = next(
+                (
+                    task.exception()
+                    for task in done
+                    if isinstance(task.exception(), SegmentRejectedError)
+                ),
+                None,
+            )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        if rejection is not None:
+            logging.info(f'{rejection}, streaming {self.asset_data.name} in one request')
+            self._ranges_supported = False
+            remove_partial(tmp_file_name)
+            response, _ = await self._request_file(tmp_file_name, None)
+            if not _check_response(response):
+                return False
+            return await self._stream_to_tmp(tmp_file_name, response, None)
+
+        save_partial(tmp_file_name, partial)
+        finished = True
+        for task in tasks:
+            if task.exception() is not None:
+                logging.warning(f'Segment of {self.asset_data.name} failed: {task.exception()}')
+            finished = finished and task.exception() is None and task.result() is True
+        return finished
 
+    async def _download_segment(  # noqa: WPS210
+        self,
+        tmp_file_name: str,
+        partial: PartialDownload,
+        segment: List[int],
+        response: Optional[requests.Response] = None,
+    ) -> bool:
+        start, end, _ = segment
+        if start + segment[2] > end:
+            return True
+
+        if response is None:
+            headers = {'Range': f'bytes={start + segment[2]}-{end}'}
+            if partial.etag:
+                headers['If-Range'] = partial.etag
             request = Request()
-            response = await request.get(asset_data.download_url, stream=True)
-            total_length = response.headers.get('Content-Length')
+            response = await request.get(self.asset_data.download_url, stream=True, headers=headers)
+            if response.status_code != 206:  # noqa: WPS432
+                response.close()
+                raise SegmentRejectedError(f'Segment request answered {response.status_code}')
 
-            if total_length is None:  # no content length header
-                tmp_file.write(response.content)
-                return
+        # unbuffered, so the sidecar never claims bytes that are not on disk yet
+        try:
+            with open(tmp_file_name, 'r+b', buffering=0) as tmp_file:
+                tmp_file.seek(start + segment[2])
+                async for download_data in iter_content_async(response, CHUNK_SIZE):
+                    download_data = download_data[:end + 1 - start - segment[2]]  # noqa: WPS440
+                    tmp_file.write(download_data)
+                    segment[2] += len(download_data)
+                    await self._advance(tmp_file_name, partial, len(download_data))
+                    if start + segment[2] > end or self.stopped():
+                        break
+        finally:
+            response.close()
+        return start + segment[2] > end
 
-            chunk_size = 500 * 1000  # noqa: WPS432
-            iterator = response.iter_content(chunk_size=chunk_size)
+    async def _stream_to_tmp(
+        self,
+        tmp_file_name: str,
+        response: requests.Response,
+        partial: Optional[PartialDownload],
+    ) -> bool:
+        asset_data = self.asset_data
+        offset = partial.bytes_written if partial is not None else 0
+        total_length = response.headers.get('Content-Length')
+        mode = 'ab' if partial is not None else 'wb'
+        with open(tmp_file_name, mode) as tmp_file:
+            logging.info(f'Downloading {asset_data.name} to {tmp_file_name}')
 
-            downloaded = 0
-            file_size = int(total_length)
+            if total_length is None:  # no content length header
+                async for download_data in iter_content_async(response, CHUNK_SIZE):
+                    tmp_file.write(download_data)
+                return True
 
-            loop = asyncio.get_event_loop()
-            while True:
-                download_data = await loop.run_in_executor(None, self._read_chunk, iterator)
-                if not download_data:
-                    break
-                downloaded += len(download_data)
-                progress = int(100 * downloaded / file_size)
-                await self._queue.put(progress)
+            partial = PartialDownload(
+                url=asset_data.download_url,
+                etag=response.headers.get('ETag', ''),
+                bytes_written=offset,
+                size=offset + int(total_length),
+            )
+            save_partial(tmp_file_name, partial)
+
+            async for download_data in iter_content_async(response, CHUNK_SIZE):  # noqa: WPS440
                 tmp_file.write(download_data)
+                tmp_file.flush()
+                await self._advance(tmp_file_name, partial, len(download_data))
                 if self.stopped():
-                    logging.debug(f'Stopping download: {asset_data.name}')
-                    tmp_file.close()
-                    os.remove(tmp_file_name)
-                    return
-        os.rename(tmp_file_name, file_name)
+                    break
+
+        save_partial(tmp_file_name, partial)
+        return partial.bytes_written >= partial.size
+
+    async def _advance(self, tmp_file_name: str, partial: PartialDownload, n_bytes: int):
+        partial.bytes_written += n_bytes
+        self._unsaved_bytes += n_bytes
+        await self._queue.put(int(100 * partial.bytes_written / partial.size))
+        if self._unsaved_bytes >= SIDECAR_SAVE_INTERVAL:
+            save_partial(tmp_file_name, partial)
+            self._unsaved_bytes = 0
+        if self.stopped():
+            logging.debug(f'Stopping download: {self.asset_data.name}, keeping partial file')
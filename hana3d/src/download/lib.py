@@ -1,8 +1,9 @@
 """Helper methods for asset download."""
 import os
-import shutil
 from datetime import datetime
 
+from .links import link_file
+from ..cache.asset_cache import AssetCache
 from ..search.search import AssetData
 from ... import paths
 
@@ -24,14 +25,17 @@ def newer_asset_in_server(asset_data: AssetData, file_name: str) -> bool:
 
 
 def copy_file(source: str, target: str):
-    """Copy source file to target file if source exists and target does not.
+    """Link or copy source file to target file if source exists and target does not.
+
+    Symlinks are not used: the source may be a blob the asset cache evicts later, and the two
+    copies are kept so that either one survives when the other is deleted.
 
     Parameters:
         source: path to file to be copied
         target: path to file that will be written
     """
     if os.path.isfile(source) and not os.path.isfile(target):
-        shutil.copy(source, target)
+        link_file(source, target, allow_symlink=False)
 
 
 def check_existing(asset_data: AssetData) -> bool:
@@ -53,7 +57,9 @@ def check_existing(asset_data: AssetData) -> bool:
         return False
 
     if newer_asset_in_server(asset_data, file_names[0]):
-        os.remove(file_names[0])
+        AssetCache().discard(asset_data)
+        if os.path.isfile(file_names[0]):
+            os.remove(file_names[0])
         return False
 
     return True
@@ -0,0 +1,89 @@
+"""Place files in a second directory without duplicating their data when possible."""
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import shutil
+import sys
+import uuid
+from typing import Callable, List, Tuple
+
+FICLONE = 0x40049409  # Linux ioctl to share extents between files on btrfs/xfs
+
+
+def _reflink_linux(source: str, target: str):
+    import fcntl  # noqa: WPS433
+
+    with open(source, 'rb') as source_file, open(target, 'wb') as target_file:
+        try:
+            fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+        except OSError:
+            target_file.close()
+            os.remove(target)
+            raise
+
+
+def _reflink_darwin(source: str, target: str):
+    libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    if libc.clonefile(source.encode(), target.encode(), 0) != 0:
+        error_number = ctypes.get_errno()
+        raise OSError(error_number, os.strerror(error_number))
+
+
+def _reflink(source: str, target: str):
+    if sys.platform.startswith('linux'):
+        _reflink_linux(source, target)
+    elif sys.platform == 'darwin':
+        _reflink_darwin(source, target)
+    else:
+        raise OSError(errno.ENOTSUP, 'reflink is not supported on this platform')
+
+
+def _copy(source: str, target: str):
+    shutil.copyfile(source, target)
+
+
+STRATEGIES: List[Tuple[str, Callable[[str, str], None]]] = [
+    ('reflink', _reflink),
+    ('hardlink', os.link),
+    ('symlink', os.symlink),
+    ('copy', _copy),
+]
+
+
+def link_file(source: str, target: str, allow_symlink: bool = True) -> str:
+    """Make target hold the same content as source, replacing it if it exists.
+
+    Tries a copy-on-write reflink, then a hardlink, then a symlink, and only copies the data
+    when none of them is possible, e.g. across drives on a filesystem without link support.
+
+    Parameters:
+        source: path of the existing file
+        target: path of the file to be created
+        allow_symlink: symlinks are skipped for sources that may be deleted later
+
+    Returns:
+        str: name of the strategy that was used
+
+    Raises:
+        OSError: if the file could not even be copied
+    """
+    size = os.path.getsize(source)
+    tmp_target = f'{target}.{uuid.uuid4().hex[:8]}_tmp'
+    errors = []
+    for strategy, place_file in STRATEGIES:
+        if strategy == 'symlink' and not allow_symlink:
+            continue
+        try:
+            place_file(os.path.abspath(source), tmp_target)
+        except (OSError, NotImplementedError, AttributeError) as error:
+            errors.append(f'{strategy}: {error}')
+            continue
+        os.replace(tmp_target, target)
+        saved = 0 if strategy == 'copy' else size
+        logging.info(f'Placed {target} using {strategy} ({saved} bytes saved)')
+        if errors:
+            logging.debug(f'Link strategies that failed for {target}: {"; ".join(errors)}')
+        return strategy
+    raise OSError(f'Could not place {source} at {target}: {"; ".join(errors)}')
@@ -0,0 +1,141 @@
+"""Bookkeeping for interrupted downloads that can be resumed."""
+import json
+import logging
+import os
+import urllib.parse
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class PartialDownload(object):
+    """Sidecar describing a partially written `_tmp` file.
+
+    Single stream downloads are written sequentially, so `bytes_written` is enough to resume them.
+    Segmented downloads preallocate the whole file and keep `[start, end, written]` per segment.
+    """
+
+    url: str
+    etag: str
+    bytes_written: int
+    size: int = 0
+    segments: List[List[int]] = field(default_factory=list)
+
+    def matches(self, url: str) -> bool:
+        """Check if the partial file belongs to the given url.
+
+        Presigned download urls change their query string on every search,
+        so only the scheme, host and path are compared.
+
+        Parameters:
+            url: download url of the asset
+
+        Returns:
+            bool: True if the partial file was downloaded from the same resource
+        """
+        return _strip_query(self.url) == _strip_query(url)
+
+
+def _strip_query(url: str) -> str:
+    split_url = urllib.parse.urlsplit(url or '')
+    return f'{split_url.scheme}://{split_url.netloc}{split_url.path}'
+
+
+def get_sidecar_path(tmp_file_name: str) -> str:
+    """Get path of the sidecar file of a partial download.
+
+    Parameters:
+        tmp_file_name: path to the partial download
+
+    Returns:
+        str: path to the sidecar file
+    """
+    return f'{tmp_file_name}.json'
+
+
+def load_partial(tmp_file_name: str, url: str) -> Optional[PartialDownload]:
+    """Load a resumable partial download, if there is one.
+
+    Parameters:
+        tmp_file_name: path to the partial download
+        url: download url of the asset
+
+    Returns:
+        PartialDownload | None: partial download info if it can be resumed
+    """
+    sidecar_path = get_sidecar_path(tmp_file_name)
+    if not os.path.isfile(tmp_file_name) or not os.path.isfile(sidecar_path):
+        return None
+
+    try:
+        with open(sidecar_path, 'r') as sidecar_file:
+            partial = PartialDownload(**json.load(sidecar_file))
+    except (OSError, TypeError, ValueError) as error:
+        logging.warning(f'Ignoring corrupted download sidecar {sidecar_path}: {error}')
+        remove_partial(tmp_file_name)
+        return None
+
+    if not partial.matches(url):
+        logging.debug(f'Partial download {tmp_file_name} belongs to another url, discarding')
+        remove_partial(tmp_file_name)
+        return None
+
+    if partial.segments:
+        if os.path.getsize(tmp_file_name) != partial.size:
+            logging.debug(f'Preallocated file {tmp_file_name} has the wrong size, discarding')
+            remove_partial(tmp_file_name)
+            return None
+        partial.bytes_written = sum(written for _, _, written in partial.segments)
+        return partial
+
+    # the file on disk is the source of truth, the sidecar may lag a few chunks behind
+    partial.bytes_written = os.path.getsize(tmp_file_name)
+    if partial.bytes_written == 0:
+        return None
+    return partial
+
+
+def save_partial(tmp_file_name: str, partial: PartialDownload) -> None:
+    """Write the sidecar of a partial download.
+
+    Parameters:
+        tmp_file_name: path to the partial download
+        partial: partial download info
+    """
+    sidecar_path = get_sidecar_path(tmp_file_name)
+    try:
+        with open(sidecar_path, 'w') as sidecar_file:
+            json.dump(asdict(partial), sidecar_file)
+    except OSError as error:
+        logging.warning(f'Could not write download sidecar {sidecar_path}: {error}')
+
+
+def remove_partial(tmp_file_name: str, keep_file: bool = False) -> None:
+    """Remove a partial download and its sidecar.
+
+    Parameters:
+        tmp_file_name: path to the partial download
+        keep_file: remove only the sidecar, keeping the partial file
+    """
+    paths_to_remove = [get_sidecar_path(tmp_file_name)]
+    if not keep_file:
+        paths_to_remove.append(tmp_file_name)
+    for path in paths_to_remove:
+        if os.path.isfile(path):
+            try:
+                os.remove(path)
+            except OSError as error:
+                logging.warning(f'Could not remove {path}: {error}')
+
+
+def has_partial(file_name: str) -> bool:
+    """Check if there is a resumable partial download for the given file.
+
+    Parameters:
+        file_name: final path of the downloaded file
+
+    Returns:
+        bool: True if a partial download with sidecar exists
+    """
+    tmp_file_name = f'{file_name}_tmp'
+    return os.path.isfile(tmp_file_name) and os.path.isfile(get_sidecar_path(tmp_file_name))
@@ -0,0 +1,171 @@
+"""Scheduler that limits and orders concurrent asset downloads."""
+import collections
+import logging
+import time
+from enum import IntEnum
+from typing import Deque, Dict, Optional
+
+from .downloader import Downloader
+from ..metaclasses.singleton import Singleton
+from ..preferences.preferences import Preferences
+
+WAIT_TIME_SAMPLES = 20
+
+
+class DownloadPriority(IntEnum):
+    """Priority classes of downloads, lower values start first.
+
+    A download the user asked for never waits behind a batch; batches only run in the slots
+    user downloads leave free.
+    """
+
+    user = 0
+    batch = 1
+
+
+class _QueuedDownload(object):
+    def __init__(self, downloader: Downloader, priority: DownloadPriority):
+        self.downloader = downloader
+        self.priority = priority
+        self.queued_at = time.monotonic()
+
+    @property
+    def view_id(self) -> str:
+        return self.downloader.asset_data.view_id
+
+
+class DownloadScheduler(object, metaclass=Singleton):
+    """Keep downloads in FIFO queues per priority and start them as transfer slots free up."""
+
+    def __init__(self) -> None:
+        """Create the DownloadScheduler instance."""
+        self._queues: Dict[DownloadPriority, Deque[_QueuedDownload]] = {
+            priority: collections.deque() for priority in DownloadPriority
+        }
+        self._active: Dict[str, Downloader] = {}
+        self._wait_times: Deque[float] = collections.deque(maxlen=WAIT_TIME_SAMPLES)
+
+    def submit(self, downloader: Downloader, priority: DownloadPriority) -> None:
+        """Queue a download and start it if there is a free transfer slot.
+
+        Parameters:
+            downloader: download to be started
+            priority: priority class of the download
+        """
+        downloader.mark_queued()
+        self._queues[priority].append(_QueuedDownload(downloader, priority))
+        logging.debug(f'Queued {downloader.asset_data.name} with priority {priority.name}')
+        self._dispatch()
+
+    def reprioritize(self, view_id: str, priority: DownloadPriority) -> bool:
+        """Move a queued download to a higher priority class.
+
+        Parameters:
+            view_id: view_id of the queued asset
+            priority: new priority class
+
+        Returns:
+            bool: True if the download was queued and got promoted
+        """
+        queued = self._find(view_id)
+        if queued is None or queued.priority <= priority:
+            return False
+        self._queues[queued.priority].remove(queued)
+        queued.priority = priority
+        self._queues[priority].append(queued)
+        logging.debug(f'Promoted {queued.downloader.asset_data.name} to priority {priority.name}')
+        self._dispatch()
+        return True
+
+    def cancel(self, view_id: str) -> None:
+        """Remove a download from the queue, if it has not started yet.
+
+        Parameters:
+            view_id: view_id of the queued asset
+        """
+        queued = self._find(view_id)
+        if queued is not None:
+            self._queues[queued.priority].remove(queued)
+
+    def is_queued(self, view_id: str) -> bool:
+        """Check if a download is waiting for a transfer slot.
+
+        Parameters:
+            view_id: view_id of the asset
+
+        Returns:
+            bool: True if the download is queued
+        """
+        return self._find(view_id) is not None
+
+    def queue_depth(self) -> int:
+        """Get number of downloads waiting for a transfer slot.
+
+        Returns:
+            int: number of queued downloads
+        """
+        return sum(len(queue) for queue in self._queues.values())
+
+    def active_count(self) -> int:
+        """Get number of downloads currently transferring.
+
+        Returns:
+            int: number of active downloads
+        """
+        return len(self._active)
+
+    def wait_time(self, view_id: str) -> float:
+        """Get for how long a queued download has been waiting.
+
+        Parameters:
+            view_id: view_id of the queued asset
+
+        Returns:
+            float: seconds in the queue, 0 if the download is not queued
+        """
+        queued = self._find(view_id)
+        return time.monotonic() - queued.queued_at if queued is not None else 0
+
+    def average_wait_time(self) -> float:
+        """Get average time that recently started downloads spent in the queue.
+
+        Returns:
+            float: average wait in seconds
+        """
+        if not self._wait_times:
+            return 0
+        return sum(self._wait_times) / len(self._wait_times)
+
+    def _find(self, view_id: str) -> Optional[_QueuedDownload]:
+        for queue in self._queues.values():
+            for queued in queue:
+                if queued.view_id == view_id:
+                    return queued
+        return None
+
+    def _pop_next(self) -> Optional[_QueuedDownload]:
+        for priority in DownloadPriority:
+            if self._queues[priority]:
+                return self._queues[priority].popleft()
+        return None
+
+    def _dispatch(self) -> None:
+        max_concurrent = Preferences().get().max_concurrent_downloads
+        while len(self._active) < max_concurrent:
+            queued = self._pop_next()
+            if queued is None:
+                return
+            downloader = queued.downloader
+            if downloader.stopped():
+                continue
+            wait = time.monotonic() - queued.queued_at
+            self._wait_times.append(wait)
+            logging.debug(f'Starting download of {downloader.asset_data.name} after {wait:.1f}s')
+            view_id = queued.view_id
+            downloader.start(done_callback=lambda _task, view_id=view_id: self._release(view_id))
+            if downloader.is_alive():
+                self._active[view_id] = downloader
+
+    def _release(self, view_id: str) -> None:
+        self._active.pop(view_id, None)
+        self._dispatch()
@@ -10,7 +10,7 @@ from ..libraries.libraries import (
     set_library_props,
     update_libraries_list,
 )
-from ..search.search import get_search_results
+from ..search.search import get_search_results, get_thumbnail_path
 from ..tags.tags import clear_tags, update_tags_list
 from ... import paths
 from ...config import HANA3D_ASSET
@@ -61,11 +61,9 @@ def _set_thumbnail(asset_data, asset_props):
     if asset_data.thumbnail == '':
         asset_props.thumbnail = ''
     else:
-        thumbnail_name = asset_data.thumbnail.split(os.sep)[-1]  # noqa: WPS204
-        tempdir = paths.get_temp_dir(f'{asset_data.asset_type}_search')  # noqa: WPS204
-        thumbpath = os.path.join(tempdir, thumbnail_name)
+        thumbpath = get_thumbnail_path(asset_data)
         asset_thumbs_dir = paths.get_download_dirs(asset_data.asset_type)[0]
-        asset_thumb_path = os.path.join(asset_thumbs_dir, thumbnail_name)
+        asset_thumb_path = os.path.join(asset_thumbs_dir, os.path.basename(thumbpath))
         with suppress(FileNotFoundError):
             shutil.copy(thumbpath, asset_thumb_path)
         asset_props.thumbnail = asset_thumb_path
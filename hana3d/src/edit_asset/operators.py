@@ -9,6 +9,8 @@ from .edit import get_edit_props
 from .export_data import get_edit_data
 from ..async_loop.async_mixin import AsyncModalOperatorMixin
 from ..search import search
+from ..search.local_index import LocalIndex
+from ..search.search_cache import SearchCache
 from ..ui.main import UI
 from ...config import HANA3D_DESCRIPTION, HANA3D_NAME
 
@@ -47,6 +49,8 @@ class EditAssetOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa: W
         logging.debug(f'Editing view: new data is {view_data}')
         await edit_view(ui, correlation_id, props.view_id, view_data)
 
+        SearchCache().clear()
+        LocalIndex().remove(props.id)
         search.run_operator()
 
         ui.add_report(text='Asset successfully edited')
@@ -78,6 +82,8 @@ class DeleteAssetOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa:
         props = get_edit_props()
         await delete_asset(ui, props.id)
 
+        SearchCache().clear()
+        LocalIndex().remove(props.id)
         search.run_operator()
 
         ui.add_report(text='Asset deleted')
@@ -2,6 +2,7 @@
 from bpy.types import Panel
 
 from .. import download
+from ..download.scheduler import DownloadScheduler
 from ...config import HANA3D_DESCRIPTION, HANA3D_NAME
 
 
@@ -20,9 +21,17 @@ class Hana3DDownloadPanel(Panel):
 
     def draw(self, context):  # noqa: D102
         layout = self.layout
+        scheduler = DownloadScheduler()
+        layout.label(
+            text=f'Active: {scheduler.active_count()}  Queued: {scheduler.queue_depth()}  '
+            f'Avg wait: {scheduler.average_wait_time():.0f}s',
+        )
         for view_id, thread in download.download_threads.items():
             row = layout.row()
             row.label(text=thread.asset_data.name)
-            row.label(text=f'{int(thread.progress())}%')
+            if thread.queued():
+                row.label(text=f'queued {scheduler.wait_time(view_id):.0f}s')
+            else:
+                row.label(text=f'{int(thread.progress())}%')
             op = row.operator(f'scene.{HANA3D_NAME}_download_kill', text='', icon='CANCEL')
             op.view_id = view_id
@@ -15,7 +15,27 @@ class UserPreferences(object):
     api_key_timeout: int
     api_key_life: str
     id_token: str
+    download_segments: int
+    segmented_download_threshold: int
+    cache_size_limit: int
+    thumbnail_cache_size: int
+    max_concurrent_downloads: int
+    multipart_upload_threshold: int
+    upload_part_size: int
+    max_concurrent_part_uploads: int
+    thumbnail_concurrency: int
+    prefetch_thumbnail_neighbours: bool
+    search_cache_ttl: int
+    instant_local_results: bool
+    http_transport: str
+    http_pool_size: int
+    http_idle_timeout: int
     max_assetbar_rows: int
+    next_page_prefetch: int
+    search_all_asset_types: bool
+    preview_memory_budget: int
+    batched_asset_bar: bool
+    thumbnail_textures: bool
     thumb_size: int
 
 
@@ -3,42 +3,76 @@ import asyncio
 import functools
 import logging
 import uuid
+from typing import AsyncIterator
 
 import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
 
+from . import native_transport
+from .native_transport import NativeResponse
+from .session_pool import SessionPool
 from ..preferences.preferences import Preferences
 from ..ui import colors
 from ..ui.main import UI
 
 
+async def iter_content_async(response, chunk_size: int) -> AsyncIterator[bytes]:
+    """Iterate over the body of a response from any transport without blocking the event loop.
+
+    Parameters:
+        response: response of a streamed request
+        chunk_size: maximum size of each chunk
+
+    Yields:
+        bytes: chunk of the body
+    """
+    if isinstance(response, NativeResponse):
+        async for native_chunk in response.aiter_content(chunk_size):
+            yield native_chunk
+        return
+
+    loop = asyncio.get_event_loop()
+    iterator = response.iter_content(chunk_size=chunk_size)
+    while True:
+        chunk = await loop.run_in_executor(None, next, iterator, b'')
+        if not chunk:
+            return
+        yield chunk
+
+
 class BasicRequest(object):  # noqa : WPS214
     """Hana3D requests async."""
 
     def __init__(self):
         """Create a Requests object."""
         self.preferences = Preferences()
-        retry_strategy = Retry(
-            total=5,
-            status_forcelist=[429, 500, 502, 503, 504],
-            method_whitelist=['DELETE', 'GET', 'POST', 'PUT', 'PATCH'],
-            backoff_factor=0.1,
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session = requests.Session()
-        self.session.mount('http://', adapter)
-        self.session.mount('https://', adapter)
+        self.session = SessionPool().session
+
+    def _use_native_transport(self, kwargs: dict) -> bool:
+        if self.preferences.get().http_transport != 'NATIVE':
+            return False
+        if not native_transport.SUPPORTED_KWARGS.issuperset(kwargs):
+            return False
+        if native_transport.proxies_configured():
+            logging.debug('Proxy configured, falling back to requests transport')
+            return False
+        return True
+
+    async def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        if self._use_native_transport(kwargs):
+            return await native_transport.request(method, url, **kwargs)
 
-    async def _request(self, method: str, url: str, **kwargs) -> requests.Response:    # noqa : WPS210
         loop = asyncio.get_event_loop()
-
         partial = functools.partial(self.session.request, method, url, **kwargs)
-        response = await loop.run_in_executor(None, partial)
+        return await loop.run_in_executor(None, partial)
+
+    async def _request(self, method: str, url: str, **kwargs) -> requests.Response:    # noqa : WPS210
+        response = await self._send(method, url, **kwargs)
 
         logging.debug(f'{method.upper()} {url} ({response.status_code})')  # noqa : WPS221
 
         if not response.ok:
+            if isinstance(response, NativeResponse):
+                await response.read()
             status_code = response.status_code
             ui = UI()
             ui.add_report(
@@ -0,0 +1,529 @@
+"""HTTP/1.1 client on asyncio streams, so transfers run on the event loop instead of threads."""
+import asyncio
+import json
+import logging
+import ssl
+import urllib.parse
+import urllib.request
+from typing import AsyncIterator, Iterable, Optional, Tuple, Union
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .session_pool import PooledConnection, SessionPool
+
+MAX_REDIRECTS = 10
+REDIRECT_STATUSES = frozenset((301, 302, 303, 307, 308))
+RETRY_TOTAL = 5
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+BACKOFF_FACTOR = 0.1
+MAX_RETRY_AFTER = 30
+READ_SIZE = 64 * 1024
+SUPPORTED_KWARGS = frozenset((
+    'headers', 'params', 'data', 'json', 'stream', 'timeout', 'allow_redirects',
+))
+
+Body = Union[None, bytes, Iterable[bytes]]
+
+_ssl_context: Optional[ssl.SSLContext] = None
+
+
+def proxies_configured() -> bool:
+    """Check if the environment asks for a proxy, which only the requests transport handles.
+
+    Returns:
+        bool: True if a proxy is configured
+    """
+    return bool(urllib.request.getproxies())
+
+
+def _get_ssl_context() -> ssl.SSLContext:
+    global _ssl_context  # noqa: WPS420
+    if _ssl_context is None:
+        try:
+            import certifi  # noqa: WPS433
+        except ImportError:
+            _ssl_context = ssl.create_default_context()
+        else:
+            _ssl_context = ssl.create_default_context(cafile=certifi.where())
+    return _ssl_context
+
+
+async def _with_timeout(awaitable, timeout: Optional[float]):
+    if timeout is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout)
+
+
+class NativeResponse(object):  # noqa: WPS214
+    """Response of the asyncio transport, mirroring the parts of `requests.Response` in use."""
+
+    def __init__(  # noqa: WPS211
+        self,
+        method: str,
+        url: str,
+        status_code: int,
+        reason: str,
+        headers: CaseInsensitiveDict,
+        connection: PooledConnection,
+        keep_alive: bool,
+        timeout: Optional[float] = None,
+    ):
+        """Create a NativeResponse whose body is still in the stream.
+
+        Parameters:
+            method: HTTP method of the request
+            url: URL that answered the request
+            status_code: HTTP status code
+            reason: HTTP reason phrase
+            headers: response headers
+            connection: connection to read the body from
+            keep_alive: return the connection to the pool once the body is read
+            timeout: seconds to wait for each read
+        """
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self._connection: Optional[PooledConnection] = connection
+        self._reader = connection.reader
+        self._timeout = timeout
+        self._content: Optional[bytes] = None
+        self._consumed = False
+
+        transfer_encoding = headers.get('Transfer-Encoding', '').lower()
+        delimited = 'Content-Length' in headers or 'chunked' in transfer_encoding
+        self._keep_alive = keep_alive
+        no_body = method.upper() == 'HEAD' or status_code in {204, 304} or status_code < 200
+        if no_body:
+            self._content = b''
+            self._release()
+        elif not delimited:
+            self._keep_alive = False  # body ends when the server closes the connection
+
+    @property
+    def ok(self) -> bool:  # noqa: WPS111
+        """Check if the status code is not an error.
+
+        Returns:
+            bool: True if the status code is lower than 400
+        """
+        return self.status_code < 400  # noqa: WPS432
+
+    @property
+    def content(self) -> bytes:
+        """Body of the response, it has to be read first when the request was streamed.
+
+        Returns:
+            bytes: response body
+
+        Raises:
+            RuntimeError: if the streamed body was not read yet
+        """
+        if self._content is None:
+            raise RuntimeError('Streamed response body has not been read, await read() first')
+        return self._content
+
+    @property
+    def text(self) -> str:
+        """Body of the response decoded as text.
+
+        Returns:
+            str: response body
+        """
+        content_type = self.headers.get('Content-Type', '')
+        _, _, charset = content_type.partition('charset=')
+        return self.content.decode(charset.split(';')[0].strip() or 'utf-8', errors='replace')
+
+    def json(self):
+        """Body of the response decoded as JSON.
+
+        Returns:
+            Any: decoded JSON
+        """
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        """Raise an HTTPError if the status code is an error.
+
+        Raises:
+            HTTPError: if the request failed
+        """
+        if not self.ok:
+            raise requests.exceptions.HTTPError(
+                f'{self.status_code} {self.reason} for url: {self.url}',
+                response=self,
+            )
+
+    async def read(self) -> bytes:
+        """Read the whole body of a streamed response.
+
+        Returns:
+            bytes: response body
+        """
+        if self._content is None:
+            self._content = b''.join([chunk async for chunk in self.aiter_content(READ_SIZE)])
+        return self._content
+
+    async def aiter_content(self, chunk_size: int = READ_SIZE) -> AsyncIterator[bytes]:
+        """Iterate over the body as it arrives.
+
+        Parameters:
+            chunk_size: maximum size of each chunk
+
+        Yields:
+            bytes: chunk of the body
+
+        Raises:
+            ChunkedEncodingError: if the body is malformed
+            ConnectionError: if the connection drops before the body is complete
+            ReadTimeout: if the server stops sending data
+        """
+        if self._content is not None:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start:start + chunk_size]
+            return
+        if self._consumed:
+            raise RuntimeError('Response body was already consumed')
+        self._consumed = True
+
+        try:
+            async for chunk in self._iter_body(chunk_size):
+                yield chunk
+        except asyncio.TimeoutError as timeout_error:
+            raise requests.exceptions.ReadTimeout(timeout_error)
+        except ValueError as value_error:
+            raise requests.exceptions.ChunkedEncodingError(value_error)
+        except (OSError, asyncio.IncompleteReadError) as connection_error:
+            raise requests.exceptions.ConnectionError(connection_error)
+        else:
+            self._release()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Close the connection of the response, unless it was already returned to the pool."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _release(self) -> None:
+        if self._connection is None:
+            return
+        if self._keep_alive:
+            SessionPool().release(self._connection)
+        else:
+            self._connection.close()
+        self._connection = None
+
+    async def _iter_body(self, chunk_size: int) -> AsyncIterator[bytes]:
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            async for chunk in self._iter_chunked():
+                yield chunk
+            return
+
+        content_length = self.headers.get('Content-Length')
+        remaining = int(content_length) if content_length is not None else None
+        while remaining is None or remaining > 0:
+            read_size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk = await _with_timeout(self._reader.read(read_size), self._timeout)
+            if not chunk:
+                if remaining is not None:
+                    raise asyncio.IncompleteReadError(b'', remaining)
+                return
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+    async def _iter_chunked(self) -> AsyncIterator[bytes]:
+        while True:
+            size_line = await _with_timeout(self._reader.readline(), self._timeout)
+            chunk_size = int(size_line.split(b';')[0].strip(), 16)
+            if chunk_size == 0:
+                await self._skip_trailers()
+                return
+            chunk = await _with_timeout(self._reader.readexactly(chunk_size), self._timeout)
+            await _with_timeout(self._reader.readline(), self._timeout)
+            yield chunk
+
+    async def _skip_trailers(self) -> None:
+        while True:
+            line = await _with_timeout(self._reader.readline(), self._timeout)
+            if line in {b'\r\n', b'\n', b''}:
+                return
+
+
+def _prepare_url(url: str, params: Optional[dict]) -> str:
+    if not params:
+        return url
+    split_url = urllib.parse.urlsplit(url)
+    query = urllib.parse.urlencode(params, doseq=True)
+    if split_url.query:
+        query = f'{split_url.query}&{query}'
+    return urllib.parse.urlunsplit(split_url._replace(query=query))
+
+
+def _prepare_body(  # noqa: WPS231
+    headers: CaseInsensitiveDict,
+    data=None,
+    json_data=None,
+) -> Body:
+    if json_data is not None:
+        headers.setdefault('Content-Type', 'application/json')
+        return json.dumps(json_data).encode('utf-8')
+    if data is None:
+        return None
+    if isinstance(data, dict):
+        headers.setdefault('Content-Type', 'application/x-www-form-urlencoded')
+        return urllib.parse.urlencode(data, doseq=True).encode('utf-8')
+    if isinstance(data, str):
+        return data.encode('utf-8')
+    return data
+
+
+def _is_replayable(body: Body) -> bool:
+    """Check if the body can be sent again, generators can only be iterated once.
+
+    Parameters:
+        body: request body
+
+    Returns:
+        bool: True if the request can be retried or redirected with its body
+    """
+    return body is None or isinstance(body, bytes) or iter(body) is not body
+
+
+async def _write_body(writer: asyncio.StreamWriter, body: Body, chunked: bool) -> None:
+    if body is None:
+        return
+    if isinstance(body, bytes):
+        writer.write(body)
+        await writer.drain()
+        return
+    loop = asyncio.get_event_loop()
+    chunks = iter(body)
+    while True:
+        # iterating may read a file, so it is done in a worker thread to keep the UI responsive
+        chunk = await loop.run_in_executor(None, next, chunks, None)
+        if chunk is None:
+            break
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')  # noqa: WPS440
+        if chunked:
+            if chunk:
+                writer.write(f'{len(chunk):X}\r\n'.encode('ascii') + chunk + b'\r\n')
+        else:
+            writer.write(chunk)
+        await writer.drain()
+    if chunked:
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+
+async def _read_head(
+    reader: asyncio.StreamReader,
+    timeout: Optional[float],
+) -> Tuple[int, str, CaseInsensitiveDict, str]:
+    while True:
+        status_line = await _with_timeout(reader.readline(), timeout)
+        if not status_line:
+            raise ConnectionResetError('Connection closed before the response status line')
+        status_parts = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        if len(status_parts) < 2 or not status_parts[0].startswith('HTTP/'):
+            raise ValueError(f'Malformed response status line {status_line!r}')
+        http_version = status_parts[0]
+        status_code = status_parts[1]
+        if not status_code.isdigit():
+            raise ValueError(f'Malformed response status code {status_code!r}')
+        reason = status_parts[2] if len(status_parts) > 2 else ''
+        headers = CaseInsensitiveDict()
+        while True:
+            line = await _with_timeout(reader.readline(), timeout)
+            if line in {b'\r\n', b'\n', b''}:
+                break
+            name, _, header_value = line.decode('latin-1').partition(':')
+            name = name.strip()
+            header_value = header_value.strip()
+            if name in headers:
+                header_value = f'{headers[name]}, {header_value}'
+            headers[name] = header_value
+        if int(status_code) != 100:  # noqa: WPS432
+            return int(status_code), reason, headers, http_version
+
+
+async def _send(  # noqa: WPS210,WPS211
+    method: str,
+    url: str,
+    headers: CaseInsensitiveDict,
+    body: Body,
+    stream: bool,
+    timeout: Optional[float],
+) -> NativeResponse:
+    split_url = urllib.parse.urlsplit(url)
+    if split_url.scheme not in {'http', 'https'}:
+        raise requests.exceptions.InvalidSchema(f'No connection adapters were found for {url}')
+    is_https = split_url.scheme == 'https'
+    port = split_url.port or (443 if is_https else 80)  # noqa: WPS432
+    target = split_url.path or '/'
+    if split_url.query:
+        target = f'{target}?{split_url.query}'
+
+    request_headers = CaseInsensitiveDict({
+        'Host': split_url.netloc.rpartition('@')[2],
+        'User-Agent': f'python-requests/{requests.__version__}',
+        'Accept': '*/*',
+        'Accept-Encoding': 'identity',
+    })
+    request_headers.update(headers)
+    chunked = False
+    if isinstance(body, bytes):
+        request_headers['Content-Length'] = str(len(body))
+    elif body is not None:
+        try:
+            request_headers['Content-Length'] = str(len(body))
+        except TypeError:
+            request_headers['Transfer-Encoding'] = 'chunked'
+            chunked = True
+    elif method.upper() in {'POST', 'PUT', 'PATCH'}:
+        request_headers['Content-Length'] = '0'
+
+    head_lines = [f'{method.upper()} {target} HTTP/1.1']
+    head_lines.extend(f'{name}: {header_value}' for name, header_value in request_headers.items())
+    head = ('\r\n'.join(head_lines) + '\r\n\r\n').encode('latin-1')
+
+    host_key = (split_url.scheme, split_url.hostname, port)
+    ssl_context = _get_ssl_context() if is_https else None
+    # a body that can only be iterated once is never sent over a connection that may be stale
+    fresh = not _is_replayable(body)
+    while True:
+        try:
+            connection = await _with_timeout(
+                SessionPool().acquire(host_key, ssl_context, fresh=fresh),
+                timeout,
+            )
+        except asyncio.TimeoutError as connect_timeout:
+            raise requests.exceptions.ConnectTimeout(connect_timeout)
+        except OSError as connect_error:
+            raise requests.exceptions.ConnectionError(connect_error)
+
+        try:
+            connection.writer.write(head)
+            await _write_body(connection.writer, body, chunked)
+            status_code, reason, response_headers, http_version = await _read_head(
+                connection.reader,
+                timeout,
+            )
+        except asyncio.TimeoutError as timeout_error:
+            connection.close()
+            raise requests.exceptions.ReadTimeout(timeout_error)
+        except (OSError, ValueError) as connection_error:
+            connection.close()
+            if connection.reused:
+                logging.debug(f'Pooled connection to {split_url.hostname} was closed, reconnecting')
+                fresh = True
+                continue
+            raise requests.exceptions.ConnectionError(connection_error)
+        break
+
+    keep_alive = (
+        http_version == 'HTTP/1.1'
+        and response_headers.get('Connection', '').lower() != 'close'
+    )
+    response = NativeResponse(
+        method, url, status_code, reason, response_headers, connection, keep_alive, timeout,
+    )
+    if not stream:
+        await response.read()
+    return response
+
+
+def _retry_delay(attempt: int, response: Optional[NativeResponse]) -> float:
+    retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+    if retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_AFTER)
+    return BACKOFF_FACTOR * (2 ** attempt)
+
+
+async def _send_with_retries(  # noqa: WPS211
+    method: str,
+    url: str,
+    headers: CaseInsensitiveDict,
+    body: Body,
+    stream: bool,
+    timeout: Optional[float],
+) -> NativeResponse:
+    retries = RETRY_TOTAL if _is_replayable(body) else 0
+    for attempt in range(retries + 1):
+        try:
+            response = await _send(method, url, headers, body, stream, timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+            if attempt == retries:
+                raise
+            logging.debug(f'{method.upper()} {url} failed ({error}), retrying')
+            await asyncio.sleep(_retry_delay(attempt, None))
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == retries:
+            return response
+        logging.debug(f'{method.upper()} {url} answered {response.status_code}, retrying')
+        response.close()
+        await asyncio.sleep(_retry_delay(attempt, response))
+    raise requests.exceptions.RetryError(f'Max retries exceeded for {url}')
+
+
+async def request(  # noqa: WPS211
+    method: str,
+    url: str,
+    headers: Optional[dict] = None,
+    params: Optional[dict] = None,
+    data=None,
+    json=None,  # noqa: WPS442
+    stream: bool = False,
+    timeout: Optional[float] = None,
+    allow_redirects: bool = True,
+) -> NativeResponse:
+    """Send a request over asyncio streams, retrying and following redirects like requests.
+
+    Parameters:
+        method: HTTP method
+        url: URL to send request
+        headers: request headers
+        params: query string parameters
+        data: body as bytes, str, form dict or iterable of chunks
+        json: body to be encoded as JSON
+        stream: leave the body in the connection, to be read with `aiter_content`
+        timeout: seconds to wait for the connection and for each read
+        allow_redirects: follow redirects
+
+    Returns:
+        NativeResponse: response
+
+    Raises:
+        TooManyRedirects: if the server keeps redirecting
+    """
+    request_headers = CaseInsensitiveDict(headers or {})
+    url = _prepare_url(url, params)
+    body = _prepare_body(request_headers, data, json)
+
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await _send_with_retries(method, url, request_headers, body, stream, timeout)
+        location = response.headers.get('Location')
+        if not allow_redirects or response.status_code not in REDIRECT_STATUSES or not location:
+            return response
+        to_get = method.upper() != 'HEAD' and (
+            response.status_code == 303  # noqa: WPS432
+            or (response.status_code in {301, 302} and method.upper() == 'POST')
+        )
+        if not to_get and not _is_replayable(body):
+            return response  # the body was consumed and can not be sent to the new location
+        response.close()
+
+        new_url = urllib.parse.urljoin(url, location)
+        if urllib.parse.urlsplit(new_url).netloc != urllib.parse.urlsplit(url).netloc:
+            request_headers.pop('Authorization', None)
+        if to_get:
+            method = 'GET'
+            body = None
+            request_headers.pop('Content-Type', None)
+        logging.debug(f'Redirected from {url} to {new_url}')
+        url = new_url
+    raise requests.exceptions.TooManyRedirects(f'Exceeded {MAX_REDIRECTS} redirects')
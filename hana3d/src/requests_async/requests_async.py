@@ -1,15 +1,12 @@
 """Hana3D requests async."""
-import asyncio
-import functools
-import logging
 import os
 import sys
 
 import requests
 
 from .basic_request import BasicRequest
+from ..authentication.token_manager import TokenManager
 from ..ui.main import UI
-from ... import hana3d_oauth
 from ...config import HANA3D_DESCRIPTION
 
 
@@ -58,6 +55,10 @@ class Request(BasicRequest):
     """Hana3D requests async."""
 
     async def _request(self, method: str, url: str, **kwargs) -> requests.Response:    # noqa : WPS210
+        token_manager = TokenManager()
+        if token_manager.needs_refresh():
+            self._update_token(kwargs, await token_manager.get_token())
+
         response = await super()._request(method, url, **kwargs)
 
         if not response.ok:
@@ -67,17 +68,28 @@ class Request(BasicRequest):
                 code = None
 
             if response.status_code == 401 and code == 'token_expired':  # noqa : WPS432
-                loop = asyncio.get_event_loop()
-                logging.debug('refreshing token')
-                ui = UI()
-                ui.add_report(
-                    f'Refreshing token. If this fails, login in {HANA3D_DESCRIPTION} Login panel.',
-                    10,
-                )
-
-                oauth_response = hana3d_oauth.refresh_token()
-                updated_headers = self.get_headers(api_key=oauth_response['access_token'])
-                kwargs['headers'].update(updated_headers)
-                partial = functools.partial(requests.request, method, url, **kwargs)
-                response = await loop.run_in_executor(None, partial)
+                rejected_token = self._sent_token(kwargs)
+                if rejected_token == self.preferences.get().api_key:
+                    ui = UI()
+                    ui.add_report(
+                        'Refreshing token. '
+                        f'If this fails, login in {HANA3D_DESCRIPTION} Login panel.',
+                        10,
+                    )
+                api_key = await token_manager.refresh(rejected_token=rejected_token)
+                if api_key:
+                    self._update_token(kwargs, api_key)
+                    response = await self._send(method, url, **kwargs)
         return response
+
+    def _sent_token(self, kwargs: dict) -> str:
+        authorization = (kwargs.get('headers') or {}).get('Authorization', '')
+        return authorization.replace('Bearer ', '', 1)
+
+    def _update_token(self, kwargs: dict, api_key: str) -> None:
+        headers = kwargs.get('headers')
+        if not headers or not api_key or 'Authorization' not in headers:
+            return
+        headers['Authorization'] = f'Bearer {api_key}'
+        if 'X-ID-Token' in headers:
+            headers['X-ID-Token'] = self.preferences.get().id_token
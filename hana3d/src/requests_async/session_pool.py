@@ -0,0 +1,285 @@
+"""Process-wide HTTP connection pool shared by every request."""
+import asyncio
+import collections
+import logging
+import ssl
+import threading
+import time
+from typing import Deque, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from requests.packages.urllib3.util.retry import Retry
+
+from ..metaclasses.singleton import Singleton
+from ..preferences.preferences import Preferences
+
+HostKey = Tuple[str, str, int]
+PoolSettings = Tuple[int, int]  # connections per host, idle timeout in seconds
+
+DEFAULT_SETTINGS: PoolSettings = (10, 60)  # defaults of the add-on preferences
+
+
+class ConnectionStats(object):
+    """Thread-safe counters of new and reused connections per host."""
+
+    def __init__(self) -> None:
+        """Create a ConnectionStats object."""
+        self._lock = threading.Lock()
+        self.new: Dict[str, int] = collections.Counter()
+        self.reused: Dict[str, int] = collections.Counter()
+
+    def count(self, host: str, reused: bool) -> None:
+        """Count a connection being handed to a request.
+
+        Parameters:
+            host: host of the connection
+            reused: True if the connection was taken from the pool
+        """
+        with self._lock:
+            if reused:
+                self.reused[host] += 1
+            else:
+                self.new[host] += 1
+                logging.debug(
+                    f'New connection to {host} '
+                    f'({self.new[host]} new, {self.reused[host]} reused)',
+                )
+
+    def summary(self) -> str:
+        """Describe the counters of all hosts.
+
+        Returns:
+            str: human readable counters
+        """
+        with self._lock:
+            hosts = sorted(set(self.new) | set(self.reused))
+            return ', '.join(
+                f'{host}: {self.new[host]} new, {self.reused[host]} reused' for host in hosts
+            )
+
+
+class _CountingPoolMixin(object):
+    """Count handshakes and drop connections that stayed idle for too long."""
+
+    idle_timeout: float = 0
+    stats: Optional[ConnectionStats] = None
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)  # noqa: WPS437
+        last_used = getattr(conn, 'hana3d_last_used', None)
+        idle_for = time.monotonic() - last_used if last_used is not None else 0
+        if conn.sock is not None and self.idle_timeout and idle_for > self.idle_timeout:
+            conn.close()
+        if self.stats is not None:
+            self.stats.count(self.host, reused=conn.sock is not None)
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn.hana3d_last_used = time.monotonic()
+        super()._put_conn(conn)  # noqa: WPS437
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass  # noqa: WPS420,WPS604
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass  # noqa: WPS420,WPS604
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count reuse and honour an idle timeout."""
+
+    def __init__(self, stats: ConnectionStats, idle_timeout: float, **kwargs):
+        """Create a PooledHTTPAdapter.
+
+        Parameters:
+            stats: counters shared by all pools
+            idle_timeout: seconds after which an idle connection is not reused
+            kwargs: arguments of HTTPAdapter
+        """
+        self._stats = stats
+        self._idle_timeout = idle_timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):  # noqa: D102
+        super().init_poolmanager(*args, **kwargs)
+        pool_classes = {}
+        for scheme, base_class in (  # noqa: WPS352
+            ('http', _CountingHTTPConnectionPool),
+            ('https', _CountingHTTPSConnectionPool),
+        ):
+            pool_classes[scheme] = type(
+                base_class.__name__,
+                (base_class,),
+                {'stats': self._stats, 'idle_timeout': self._idle_timeout},
+            )
+        self.poolmanager.pool_classes_by_scheme = pool_classes
+
+
+class PooledConnection(object):
+    """Keep-alive connection of the asyncio transport."""
+
+    def __init__(
+        self,
+        key: HostKey,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        """Create a PooledConnection.
+
+        Parameters:
+            key: scheme, host and port of the connection
+            reader: stream to read responses from
+            writer: stream to write requests to
+        """
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+        self.last_used = time.monotonic()
+
+    def is_usable(self, idle_timeout: float) -> bool:
+        """Check if the connection can still carry a request.
+
+        Parameters:
+            idle_timeout: seconds after which an idle connection is not reused
+
+        Returns:
+            bool: True if the connection is open and was not idle for too long
+        """
+        if self.writer.is_closing() or self.reader.at_eof():
+            return False
+        return not idle_timeout or time.monotonic() - self.last_used <= idle_timeout
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.writer.close()
+
+
+class SessionPool(object, metaclass=Singleton):
+    """Shared `requests.Session` and asyncio keep-alive connections, keyed by host.
+
+    The preferences are only read by `configure`, on the main thread, as requests run in worker
+    threads too.
+    """
+
+    def __init__(self) -> None:
+        """Create the SessionPool instance."""
+        self.stats = ConnectionStats()
+        self._lock = threading.Lock()
+        self._settings = DEFAULT_SETTINGS
+        self._session: Optional[requests.Session] = None
+        self._retired_sessions: List[requests.Session] = []
+        self._idle: Dict[HostKey, Deque[PooledConnection]] = collections.defaultdict(
+            collections.deque,
+        )
+
+    def configure(self) -> None:
+        """Read the pool preferences, replacing the session if they changed.
+
+        Must be called on the main thread. Requests that already got the previous session keep
+        using it, so it is only closed with the pool.
+        """
+        preferences = Preferences().get()
+        settings = (preferences.http_pool_size, preferences.http_idle_timeout)
+        with self._lock:
+            if settings == self._settings:
+                return
+            self._settings = settings
+            if self._session is not None:
+                self._retired_sessions.append(self._session)
+                self._session = None
+
+    @property
+    def session(self) -> requests.Session:
+        """Session shared by every thread, created with the last settings configured.
+
+        Returns:
+            requests.Session: pooled session
+        """
+        with self._lock:
+            if self._session is None:
+                self._session = self._create_session(*self._settings)
+            return self._session
+
+    async def acquire(
+        self,
+        key: HostKey,
+        ssl_context: Optional[ssl.SSLContext],
+        fresh: bool = False,
+    ) -> PooledConnection:
+        """Get an idle connection to the host, or open a new one.
+
+        Parameters:
+            key: scheme, host and port
+            ssl_context: TLS context for https connections
+            fresh: always open a new connection, for bodies that can not be sent twice
+
+        Returns:
+            PooledConnection: connection ready to send a request
+        """
+        _, idle_timeout = self._settings
+        idle_connections = self._idle[key]
+        while idle_connections and not fresh:
+            connection = idle_connections.pop()
+            if connection.is_usable(idle_timeout):
+                connection.reused = True
+                self.stats.count(key[1], reused=True)
+                return connection
+            connection.close()
+
+        _, host, port = key
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+        self.stats.count(host, reused=False)
+        return PooledConnection(key, reader, writer)
+
+    def release(self, connection: PooledConnection) -> None:
+        """Return a connection whose response was fully read, so it can be reused.
+
+        Parameters:
+            connection: connection to be kept alive
+        """
+        idle_connections = self._idle[connection.key]
+        pool_size, _ = self._settings
+        if len(idle_connections) >= pool_size:
+            connection.close()
+            return
+        connection.last_used = time.monotonic()
+        idle_connections.append(connection)
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        with self._lock:
+            if self._session is not None:
+                self._retired_sessions.append(self._session)
+                self._session = None
+            for session in self._retired_sessions:
+                session.close()
+            self._retired_sessions.clear()
+        for idle_connections in self._idle.values():
+            for connection in idle_connections:
+                connection.close()
+        self._idle.clear()
+        logging.debug(f'Connection pool closed ({self.stats.summary()})')
+
+    def _create_session(self, pool_size: int, idle_timeout: int) -> requests.Session:
+        retry_strategy = Retry(
+            total=5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            method_whitelist=['DELETE', 'GET', 'PUT', 'PATCH'],  # a POST may create twice
+            backoff_factor=0.1,
+        )
+        adapter = PooledHTTPAdapter(
+            self.stats,
+            idle_timeout,
+            max_retries=retry_strategy,
+            pool_maxsize=pool_size,
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
@@ -1,5 +1,4 @@
 """Auxiliary search async functions."""
-import asyncio
 import json
 import logging
 import os
@@ -7,8 +6,12 @@ from typing import Dict
 
 import requests
 
+from .controller import SearchController
 from .query import Query
 from .search import get_original_search_results
+from .search_cache import CachedSearch, SearchCache
+from ..async_loop import run_async_function
+from ..cache.thumbnail_cache import ThumbnailCache
 from ..requests_async.requests_async import Request
 from ..ui import colors
 from ..ui.main import UI
@@ -20,7 +23,8 @@ async def search_assets(query: Query, options: Dict, ui: UI) -> Dict:
 
     Arguments:
         query: Search query
-        options: Additional parameters
+        options: Additional parameters; `background` searches another asset type than the
+            one shown and does not replace the last query
         ui: UI object
 
     Returns:
@@ -47,9 +51,27 @@ async def search_assets(query: Query, options: Dict, ui: UI) -> Dict:
 
         urlquery = urlquery.replace('False', 'false').replace('True', 'true')
     else:
-        query.save_last_query()
+        if not options.get('background'):
+            query.save_last_query()
         urlquery = paths.get_api_url('search', query=query.to_dict())
 
+    cache = SearchCache()
+    cache_key = cache.key(query, urlquery)
+    if not (options['get_next'] or options.get('background')):
+        cache.shown_key = cache_key
+    cached = cache.get(cache_key) if cache.enabled() else None
+    if cached is not None:
+        revalidating = cached.revalidation is not None and not cached.revalidation.done()
+        if not cache.is_fresh(cached) and not revalidating:
+            cached.revalidation = run_async_function(
+                _revalidate_search,
+                cached=cached,
+                url=urlquery,
+                cache_key=cache_key,
+                refresh_results=not (options['get_next'] or options.get('background')),
+            )
+        return cached.response
+
     try:
         logging.debug(urlquery)
         response = await request.get(urlquery, headers=headers)
@@ -59,15 +81,56 @@ async def search_assets(query: Query, options: Dict, ui: UI) -> Dict:
         ui.add_report(text=str(request_error), color=colors.RED)
         raise request_error
 
+    if response.ok and cache.enabled():
+        cache.store(cache_key, dict_response, response.headers.get('ETag', ''))
+
     logging.debug(f'Search assets result: {json.dumps(dict_response)}')
     return dict_response
 
 
-def _read_chunk(iterator):
+async def _revalidate_search(
+    cached: CachedSearch,
+    url: str,
+    cache_key: str,
+    refresh_results: bool,
+):
+    """Check if a stale cached search page changed, updating the cache if it did.
+
+    Parameters:
+        cached: stale cached page
+        url: url of the search page
+        cache_key: key of the page in the search cache
+        refresh_results: search again to show the new page if it changed and is still the
+            page of the query shown
+    """
+    cache = SearchCache()
+    request = Request()
+    headers = request.get_headers()
+    if cached.etag:
+        headers['If-None-Match'] = cached.etag
     try:
-        return next(iterator)
-    except Exception:
-        return b''
+        response = await request.get(url, headers=headers)
+    except requests.exceptions.RequestException as request_error:
+        logging.debug(f'Could not revalidate search: {request_error}')
+        return
+
+    if response.status_code == 304:  # noqa: WPS432
+        logging.debug('Cached search is still valid')
+        cache.touch(cache_key)
+        return
+    if not response.ok:
+        return
+
+    dict_response = response.json()
+    cache.store(cache_key, dict_response, response.headers.get('ETag', ''))
+    if dict_response == cached.response:
+        return
+    logging.debug('Cached search changed on the server')
+    if cache.shown_key != cache_key:
+        logging.debug('Not refreshing results, another query is shown')
+        return
+    if refresh_results and not SearchController().is_searching():
+        SearchController().request()
 
 
 async def download_thumbnail(image_path: str, url: str):
@@ -87,20 +150,8 @@ async def download_thumbnail(image_path: str, url: str):
 
     tmp_file_name = f'{image_path}_tmp'
     with open(tmp_file_name, 'wb') as tmp_file:
-        total_length = response.headers.get('Content-Length')
-
-        if total_length is None:  # no content length header
-            tmp_file.write(response.content)
-        else:
-            chunk_size = 500 * 1000  # noqa: WPS432
-            iterator = response.iter_content(chunk_size=chunk_size)
-            loop = asyncio.get_event_loop()
-            while True:
-                download_data = await loop.run_in_executor(None, _read_chunk, iterator)
-                if not download_data:
-                    tmp_file.close()
-                    break
-                tmp_file.write(download_data)
+        tmp_file.write(response.content)
 
     os.rename(tmp_file_name, image_path)
+    ThumbnailCache().add(image_path)
     logging.debug('Download finished')
@@ -0,0 +1,110 @@
+"""Coordination of search requests, so that only the latest query is shown."""
+import asyncio
+import logging
+from typing import Optional
+
+import bpy
+
+from .search import get_search_props
+from ..async_loop import run_async_function
+from ..metaclasses.singleton import Singleton
+from ...config import HANA3D_NAME
+
+DEBOUNCE_DELAY = 0.25  # seconds without typing before a search-as-you-type query is sent
+
+
+class SearchController(object, metaclass=Singleton):
+    """Debounce search requests and cancel the search superseded by a newer one."""
+
+    def __init__(self) -> None:
+        """Create the SearchController instance."""
+        self._generation = 0
+        self._pending: Optional[asyncio.Future] = None
+        self._running: Optional[asyncio.Future] = None
+
+    def request(self, get_next: bool = False, debounce: bool = False) -> bool:
+        """Ask for a search, replacing any search that was requested but not sent yet.
+
+        Parameters:
+            get_next: get next batch of results of the current query
+            debounce: wait for DEBOUNCE_DELAY seconds without new requests before searching
+
+        Returns:
+            bool: False if the request for the next page was dropped, as a search is running
+        """
+        if get_next and self.is_searching():
+            logging.debug('Ignoring request for next page, a search is running')
+            return False
+        self._cancel_pending()
+        if not debounce:
+            self._run_operator(get_next)
+            return True
+        self._pending = run_async_function(self._debounced, get_next=get_next)
+        return True
+
+    def begin(self, task: Optional[asyncio.Future]) -> int:
+        """Register the task of a search operator, cancelling the search it supersedes.
+
+        Parameters:
+            task: task running the search
+
+        Returns:
+            int: generation of the search, to be checked with `is_current`
+        """
+        if self._running is not None and self._running is not task and not self._running.done():
+            logging.debug('Cancelling superseded search')
+            self._running.cancel()
+        self._generation += 1
+        self._running = task
+        self._set_searching(True)
+        return self._generation
+
+    def is_current(self, generation: int) -> bool:
+        """Check if a search is still the latest one, so its results may be shown.
+
+        Parameters:
+            generation: generation returned by `begin`
+
+        Returns:
+            bool: True if no newer search was started
+        """
+        return generation == self._generation
+
+    def finish(self, generation: int) -> None:
+        """Mark a search as done.
+
+        Parameters:
+            generation: generation returned by `begin`
+        """
+        if not self.is_current(generation):
+            return
+        self._running = None
+        self._set_searching(False)
+
+    def is_searching(self) -> bool:
+        """Check if a search is running.
+
+        Returns:
+            bool: True if the latest search did not finish yet
+        """
+        return self._running is not None and not self._running.done()
+
+    async def _debounced(self, get_next: bool) -> None:
+        await asyncio.sleep(DEBOUNCE_DELAY)
+        self._pending = None
+        self._run_operator(get_next)
+
+    def _cancel_pending(self) -> None:
+        if self._pending is not None and not self._pending.done():
+            self._pending.cancel()
+        self._pending = None
+
+    def _run_operator(self, get_next: bool) -> None:
+        logging.debug(f'Running search operator with get_next = {get_next}')
+        search_op = getattr(bpy.ops.view3d, f'{HANA3D_NAME}_search')
+        search_op(get_next=get_next)
+
+    def _set_searching(self, is_searching: bool) -> None:
+        search_props = get_search_props()
+        if search_props is not None:
+            search_props.is_searching = is_searching
@@ -0,0 +1,99 @@
+"""On-demand download of the large thumbnails shown in asset bar tooltips."""
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+
+import bpy
+
+from .async_functions import download_thumbnail
+from .search import AssetData
+from ..async_loop import run_async_function
+from ..cache.thumbnail_cache import ThumbnailCache
+from ..metaclasses.singleton import Singleton
+from ..preferences.preferences import Preferences
+from ... import paths
+
+HOVER_DELAY = 0.15  # seconds the pointer has to rest on an asset before its thumbnail is fetched
+
+
+def _tag_redraw_view3d() -> None:
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+class LargeThumbnailFetcher(object, metaclass=Singleton):
+    """Fetch the large thumbnail of the hovered asset, cancelling it when the pointer moves on."""
+
+    def __init__(self) -> None:
+        """Create the LargeThumbnailFetcher instance."""
+        self._hovered: Optional[str] = None
+        self._tasks: Dict[str, asyncio.Future] = {}
+
+    def hover(self, search_results: List[AssetData], index: int) -> None:
+        """Schedule the large thumbnail of the hovered asset and, optionally, its neighbours.
+
+        Parameters:
+            search_results: search results shown in the asset bar
+            index: index of the hovered asset
+        """
+        asset_data = search_results[index]
+        if asset_data.view_id == self._hovered:
+            return
+        self._hovered = asset_data.view_id
+
+        wanted = [asset_data]
+        if Preferences().get().prefetch_thumbnail_neighbours:
+            neighbours = (index - 1, index + 1)
+            wanted.extend(
+                search_results[neighbour]
+                for neighbour in neighbours
+                if 0 <= neighbour < len(search_results)
+            )
+        wanted_paths = {self._thumbnail_path(wanted_asset) for wanted_asset in wanted}
+
+        for path in list(self._tasks):
+            if path not in wanted_paths:
+                self._cancel(path)
+        for wanted_asset in wanted:
+            self._schedule(wanted_asset)
+
+    def leave(self) -> None:
+        """Cancel pending fetches when no asset is hovered anymore."""
+        self._hovered = None
+        for path in list(self._tasks):
+            self._cancel(path)
+
+    def _thumbnail_path(self, asset_data: AssetData) -> str:
+        directory = paths.get_temp_dir(f'{asset_data.asset_type}_search')
+        return os.path.join(directory, asset_data.thumbnail)
+
+    def _schedule(self, asset_data: AssetData) -> None:
+        if not asset_data.thumbnail or not asset_data.thumbnail_url:
+            return
+        path = self._thumbnail_path(asset_data)
+        if path in self._tasks or ThumbnailCache().contains(path):
+            return
+        self._tasks[path] = run_async_function(
+            self._fetch,
+            done_callback=lambda task, path=path: self._forget(path, task),
+            path=path,
+            url=asset_data.thumbnail_url,
+        )
+
+    def _forget(self, path: str, task: asyncio.Future) -> None:
+        if self._tasks.get(path) is task:
+            self._tasks.pop(path)
+
+    def _cancel(self, path: str) -> None:
+        task = self._tasks.pop(path, None)
+        if task is not None and not task.done():
+            logging.debug(f'Cancelled large thumbnail {path}')
+            task.cancel()
+
+    async def _fetch(self, path: str, url: str) -> None:
+        await asyncio.sleep(HOVER_DELAY)
+        await download_thumbnail(path, url)
+        _tag_redraw_view3d()
@@ -0,0 +1,317 @@
+"""Local full-text index of every search result seen, for instant and offline search."""
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import bpy
+
+from .query import Query
+from .search import AssetData
+from ..metaclasses.singleton import Singleton
+from ..preferences.preferences import Preferences
+
+INDEX_FILENAME = 'search_index.sqlite'
+MAX_LOCAL_RESULTS = 100
+SEARCH_COLUMNS = ('name', 'description', 'tags', 'libraries', 'sku', 'verification_status')
+
+Row = Dict[str, Any]
+
+
+def _library_ids(asset_data: AssetData) -> str:
+    return ','.join(str(library.get('id') or '') for library in asset_data.libraries)
+
+
+def _library_names(asset_data: AssetData) -> str:
+    return ' '.join(library.get('name') or '' for library in asset_data.libraries)
+
+
+def _skus(asset_data: AssetData) -> str:
+    skus = []
+    for library in asset_data.libraries:
+        view_props = (library.get('metadata') or {}).get('view_props') or {}
+        skus.append(view_props.get('sku') or library.get('slug') or '')
+    return ' '.join(sku for sku in skus if sku)
+
+
+class LocalIndex(object, metaclass=Singleton):  # noqa: WPS214
+    """SQLite index of search results, with FTS5 full-text search when it is available."""
+
+    def __init__(self) -> None:
+        """Create the LocalIndex instance."""
+        self._lock = threading.Lock()
+        self._path = ''
+        self._connection: Optional[sqlite3.Connection] = None
+        self._full_text = False
+
+    async def record_async(self, search_results: List[AssetData], public: bool = False) -> None:
+        """Add or update search results in the index from a worker thread.
+
+        Parameters:
+            search_results: parsed search results
+            public: True if the results come from a public-only search
+        """
+        rows = [self._row(asset_data, public) for asset_data in search_results]
+        loop = asyncio.get_event_loop()
+        started_at = time.monotonic()
+        try:
+            connection = self._connect()
+            await loop.run_in_executor(None, self._write_rows, connection, rows)
+        except sqlite3.Error as error:
+            logging.warning(f'Could not update local search index: {error}')
+            return
+        elapsed = time.monotonic() - started_at
+        logging.debug(f'Indexed {len(rows)} search results locally in {elapsed:.3f}s')
+
+    def mark_downloaded(self, view_id: str) -> None:
+        """Remember that an asset was downloaded.
+
+        Parameters:
+            view_id: view id of the asset
+        """
+        try:
+            connection = self._connect()
+            with self._lock, connection:
+                connection.execute(
+                    'UPDATE assets SET downloaded = 1 WHERE view_id = ?', (view_id,),
+                )
+        except sqlite3.Error as error:
+            logging.warning(f'Could not update local search index: {error}')
+
+    def remove(self, asset_id: str) -> None:
+        """Forget every view of an asset that was edited or deleted.
+
+        Parameters:
+            asset_id: id of the asset
+        """
+        try:
+            connection = self._connect()
+            with self._lock, connection:
+                connection.execute(
+                    'DELETE FROM assets_text WHERE rowid IN '
+                    '(SELECT id FROM assets WHERE asset_id = ?)',
+                    (asset_id,),
+                )
+                connection.execute('DELETE FROM assets WHERE asset_id = ?', (asset_id,))
+        except sqlite3.Error as error:
+            logging.warning(f'Could not update local search index: {error}')
+
+    def clear(self) -> None:
+        """Forget every indexed asset, so the next user does not see them."""
+        try:
+            connection = self._connect()
+            with self._lock, connection:
+                connection.execute('DELETE FROM assets_text')
+                connection.execute('DELETE FROM assets')
+        except sqlite3.Error as error:
+            logging.warning(f'Could not clear local search index: {error}')
+
+    def search(self, query: Query) -> List[AssetData]:
+        """Answer a search query from the index.
+
+        Parameters:
+            query: search query
+
+        Returns:
+            List[AssetData]: matching results, most recently seen first; empty if the index
+            can not be read
+        """
+        started_at = time.monotonic()
+        try:
+            connection = self._connect()
+            conditions, parameters = self._conditions(query)
+            statement = (
+                'SELECT assets.data, assets.downloaded FROM assets '
+                'JOIN assets_text ON assets_text.rowid = assets.id '
+                f'WHERE {" AND ".join(conditions)} '
+                'ORDER BY assets.seen_at DESC LIMIT ?'
+            )
+            with self._lock:
+                rows = connection.execute(statement, (*parameters, MAX_LOCAL_RESULTS)).fetchall()
+        except sqlite3.Error as error:
+            logging.warning(f'Could not search local index: {error}')
+            return []
+
+        search_results = []
+        for data, downloaded in rows:
+            asset_data = AssetData(**json.loads(data))
+            asset_data.downloaded = 100 if downloaded else 0
+            search_results.append(asset_data)
+        elapsed = time.monotonic() - started_at
+        logging.debug(f'Local search found {len(search_results)} results in {elapsed:.3f}s')
+        return search_results
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+                self._path = ''
+
+    def _conditions(self, query: Query) -> Tuple[List[str], List]:
+        conditions = ['assets.asset_type = ?']
+        parameters: List = [query.asset_type]
+        if query.view_id:
+            conditions.append('assets.view_id = ?')
+            parameters.append(query.view_id)
+        if query.public:
+            conditions.append('assets.public = 1')
+        if query.workspace:
+            conditions.append('assets.workspace = ?')
+            parameters.append(query.workspace)
+        if query.verification_status:
+            conditions.append('assets.verification_status = ?')
+            parameters.append(query.verification_status)
+        for tag in filter(None, query.tags.split(',')):
+            conditions.append("(',' || assets.tags || ',') LIKE ?")
+            parameters.append(f'%,{tag},%')
+        for library_id in filter(None, query.libraries.split(',')):
+            conditions.append("(',' || assets.library_ids || ',') LIKE ?")
+            parameters.append(f'%,{library_id},%')
+        self._add_text_condition(query.search_term, conditions, parameters)
+        return conditions, parameters
+
+    def _add_text_condition(self, search_term: str, conditions: List[str], parameters: List):
+        words = re.findall(r'\w+', search_term)
+        if not words:
+            return
+        if self._full_text:
+            conditions.append('assets_text MATCH ?')
+            parameters.append(' '.join(f'"{word}"*' for word in words))
+            return
+        searchable = " || ' ' || ".join(f'assets_text.{column}' for column in SEARCH_COLUMNS)
+        for word in words:
+            conditions.append(f'({searchable}) LIKE ?')
+            parameters.append(f'%{word}%')
+
+    def _row(self, asset_data: AssetData, public: bool) -> Row:
+        asset_dict = asset_data.to_dict()
+        asset_dict['downloaded'] = 0
+        return {
+            'view_id': asset_data.view_id,
+            'asset_id': asset_data.id,
+            'public': public,
+            'asset_type': asset_data.asset_type,
+            'workspace': asset_data.workspace,
+            'verification_status': asset_data.verification_status,
+            'tags': ','.join(asset_data.tags),
+            'library_ids': _library_ids(asset_data),
+            'library_names': _library_names(asset_data),
+            'name': asset_data.name,
+            'description': asset_data.description,
+            'sku': _skus(asset_data),
+            'data': json.dumps(asset_dict),
+            'downloaded': asset_data.downloaded > 0,
+        }
+
+    def _write_rows(self, connection: sqlite3.Connection, rows: List[Row]) -> None:
+        with self._lock, connection:
+            for row in rows:
+                self._upsert(connection, row)
+
+    def _upsert(self, connection: sqlite3.Connection, row: Row) -> None:
+        existing = connection.execute(
+            'SELECT id, downloaded, public FROM assets WHERE view_id = ?', (row['view_id'],),
+        ).fetchone()
+        values = (
+            row['asset_id'],
+            row['asset_type'],
+            row['workspace'],
+            row['verification_status'],
+            row['tags'],
+            row['library_ids'],
+            int(row['downloaded'] or (existing is not None and bool(existing[1]))),
+            int(row['public'] or (existing is not None and bool(existing[2]))),
+            time.time(),
+            row['data'],
+        )
+        if existing is None:
+            cursor = connection.execute(
+                'INSERT INTO assets (asset_id, asset_type, workspace, verification_status, '
+                'tags, library_ids, downloaded, public, seen_at, data, view_id) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (*values, row['view_id']),
+            )
+            row_id = cursor.lastrowid
+        else:
+            row_id = existing[0]
+            connection.execute(
+                'UPDATE assets SET asset_id = ?, asset_type = ?, workspace = ?, '
+                'verification_status = ?, tags = ?, library_ids = ?, downloaded = ?, '
+                'public = ?, seen_at = ?, data = ? WHERE id = ?',
+                (*values, row_id),
+            )
+            connection.execute('DELETE FROM assets_text WHERE rowid = ?', (row_id,))
+        connection.execute(
+            'INSERT INTO assets_text (rowid, name, description, tags, libraries, sku, '
+            'verification_status) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                row_id,
+                row['name'],
+                row['description'],
+                row['tags'].replace(',', ' '),
+                row['library_names'],
+                row['sku'],
+                row['verification_status'],
+            ),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        global_dir = Preferences().get().global_dir
+        if global_dir.startswith('//'):
+            global_dir = bpy.path.abspath(global_dir)
+        index_path = os.path.join(global_dir, INDEX_FILENAME)
+        if self._connection is not None and index_path == self._path:
+            return self._connection
+
+        self.close()
+        os.makedirs(global_dir, exist_ok=True)
+        connection = sqlite3.connect(index_path, check_same_thread=False)
+        with self._lock, connection:
+            self._full_text = self._create_tables(connection)
+        logging.debug(f'Opened local search index {index_path} (full text: {self._full_text})')
+        self._connection = connection
+        self._path = index_path
+        return connection
+
+    def _create_tables(self, connection: sqlite3.Connection) -> bool:
+        """Create the tables of the index.
+
+        Parameters:
+            connection: database connection
+
+        Returns:
+            bool: True if the text table uses FTS5, False if it falls back to LIKE queries
+        """
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS assets ('
+            'id INTEGER PRIMARY KEY, view_id TEXT UNIQUE NOT NULL, asset_type TEXT, '
+            'workspace TEXT, verification_status TEXT, tags TEXT, library_ids TEXT, '
+            'downloaded INTEGER DEFAULT 0, seen_at REAL, data TEXT, asset_id TEXT, '
+            'public INTEGER DEFAULT 0)',
+        )
+        existing_columns = {
+            column[1] for column in connection.execute('PRAGMA table_info(assets)')
+        }
+        for column, column_type in (('asset_id', 'TEXT'), ('public', 'INTEGER DEFAULT 0')):
+            if column not in existing_columns:
+                connection.execute(f'ALTER TABLE assets ADD COLUMN {column} {column_type}')
+        connection.execute('CREATE INDEX IF NOT EXISTS assets_asset_id ON assets (asset_id)')
+        columns = ', '.join(SEARCH_COLUMNS)
+        try:
+            connection.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS assets_text USING fts5({columns})',
+            )
+        except sqlite3.OperationalError as error:
+            logging.info(f'SQLite has no FTS5 ({error}), local search will be slower')
+            connection.execute(f'CREATE TABLE IF NOT EXISTS assets_text ({columns})')
+        text_table = connection.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'assets_text'",
+        ).fetchone()
+        return 'fts5' in text_table[0].lower()
@@ -1,28 +1,35 @@
 """Search operator."""
 
+import asyncio
 import logging
 import os
+import time
 from typing import Dict, List, Tuple
 
 import bpy
 from bpy.props import BoolProperty, IntProperty, StringProperty
 
 from .async_functions import download_thumbnail, search_assets
+from .controller import SearchController
+from .local_index import LocalIndex
+from .preview_window import PREFETCH_ROWS, PreviewWindow
 from .query import Query
 from .search import (
     AssetData,
     get_search_props,
     get_search_results,
-    load_preview,
     set_original_search_results,
     set_search_results,
 )
 from ..asset.asset_type import AssetType
+from ..async_loop import run_async_function
 from ..async_loop.async_mixin import AsyncModalOperatorMixin
+from ..authentication.token_manager import TokenManager
+from ..cache.thumbnail_cache import ThumbnailCache
 from ..preferences.preferences import Preferences
 from ..ui import colors
 from ..ui.main import UI
-from ... import hana3d_oauth, paths, utils
+from ... import paths, utils
 from ...config import HANA3D_DESCRIPTION, HANA3D_NAME, HANA3D_UI
 
 Thumbnail = Tuple[str, str]
@@ -78,9 +85,8 @@ class SearchOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa: WPS2
             context: Blender context
 
         Returns:
-            bool: only search if no search operation is running
+            bool: always True, SearchController cancels the search a new one supersedes
         """
-        # TODO: really check if search is running
         return True
 
     async def async_execute(self, context):
@@ -101,7 +107,6 @@ class SearchOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa: WPS2
 
         logging.debug(f'Search_props: {search_props}')
         ui = UI()
-        ui_props = getattr(bpy.context.window_manager, HANA3D_UI)
         asset_type = self._get_asset_type_from_ui()
 
         query = Query(bpy.context, search_props)
@@ -112,34 +117,76 @@ class SearchOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa: WPS2
         logging.debug(f'Search options: {str(options)}')
         ui.add_report(text=f'{HANA3D_DESCRIPTION} searching...', timeout=2)
 
-        if search_props.is_searching:
-            return {'FINISHED'}
-        search_props.is_searching = True
+        controller = SearchController()
+        generation = controller.begin(asyncio.current_task())
+        searches = [self._search(query, options, generation)]
+        if self._search_all_asset_types(query):
+            searches.extend(
+                self._search_other_type(query, other_type, generation)
+                for other_type in AssetType
+                if other_type != asset_type
+            )
+        try:
+            search_statuses = await asyncio.gather(*searches)
+            return search_statuses[0]
+        except asyncio.CancelledError:
+            logging.debug('Search cancelled by a newer search')
+            raise
+        finally:
+            controller.finish(generation)
+            self.quit()
+
+    async def _search(self, query: Query, options: Dict, generation: int):  # noqa: WPS210
+        search_props = get_search_props()
+        ui = UI()
+        ui_props = getattr(bpy.context.window_manager, HANA3D_UI)
+        asset_type = query.asset_type
+
+        local_results: List[AssetData] = []
+        if not options['get_next'] and Preferences().get().instant_local_results:
+            local_results = self._show_local_results(query)
 
         try:
             request_data = await search_assets(query, options, ui)
         except Exception:
-            return {'CANCELED'}
+            if local_results:
+                text = f'Could not reach the server, showing {len(local_results)} local results'
+                ui.add_report(text=text, color=colors.RED)
+                return {'FINISHED'}
+            return {'CANCELLED'}
+
+        if not SearchController().is_current(generation):
+            logging.debug('Discarding results of a superseded search')
+            return {'CANCELLED'}
 
         tempdir = paths.get_temp_dir(f'{asset_type}_search')
 
         result_field = []
+        new_results: List[AssetData] = []
         ok, error = self._check_errors(request_data)
         if ok:
             run_assetbar_op = getattr(bpy.ops.object, f'{HANA3D_NAME}_run_assetbar_fix_context')
             status = run_assetbar_op()
             logging.debug(f'Asset bar operator status: {status}')
 
-            result_field = self._parse_response(asset_type, request_data)
-            logging.debug(f'Parsed results: {len(result_field)}')
+            new_results = self._parse_response(asset_type, request_data)
+            logging.debug(f'Parsed results: {len(new_results)}')
+            run_async_function(
+                LocalIndex().record_async,
+                search_results=new_results,
+                public=query.public,
+            )
 
             if options['get_next']:
                 previous_results = get_search_results(asset_type)
                 self.next_index = len(previous_results)
-                result_field = previous_results + result_field
+                new_results = self._drop_duplicates(previous_results, new_results)
+                result_field = previous_results + new_results
                 set_search_results(asset_type, result_field)
             else:
                 self.next_index = 0
+                PreviewWindow().reset(asset_type)
+                result_field = new_results
                 set_search_results(asset_type, result_field)
 
             set_original_search_results(asset_type, request_data)
@@ -153,22 +200,105 @@ class SearchOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa: WPS2
             ui.add_report(text=error, color=colors.RED)
             search_props.search_error = True
 
-        small_thumbnails, full_thumbnails = self._get_thumbnails(tempdir, request_data)
-        await self._load_thumbnails(small_thumbnails, full_thumbnails, asset_type, result_field)
+        small_thumbnails = self._get_thumbnails(tempdir, new_results)
+        await self._load_thumbnails(small_thumbnails, asset_type, result_field)
 
         status = run_assetbar_op()
         logging.debug(f'Asset bar operator status: {status}')
-
-        search_props.is_searching = False
         return {'FINISHED'}
 
+    def _search_all_asset_types(self, query: Query) -> bool:
+        if self.get_next or query.view_id:
+            return False
+        return Preferences().get().search_all_asset_types
+
+    async def _search_other_type(  # noqa: WPS210
+        self,
+        query: Query,
+        asset_type: AssetType,
+        generation: int,
+    ) -> None:
+        """Search another asset type with the same keywords and load its first rows.
+
+        Parameters:
+            query: query of the asset type shown
+            asset_type: other asset type to search
+            generation: generation of the search, from SearchController
+        """
+        other_query = Query(bpy.context, get_search_props(asset_type))
+        other_query.asset_type = asset_type
+        other_query.search_term = query.search_term
+        options = {'get_next': False, 'background': True}
+        try:
+            request_data = await search_assets(other_query, options, UI())
+        except Exception as error:
+            logging.debug(f'Background {asset_type} search failed: {error}')
+            return
+        ok, _ = self._check_errors(request_data)
+        if not ok or not SearchController().is_current(generation):
+            return
+
+        search_results = self._parse_response(asset_type, request_data)
+        PreviewWindow().reset(asset_type)
+        set_search_results(asset_type, search_results)
+        set_original_search_results(asset_type, request_data)
+        run_async_function(
+            LocalIndex().record_async,
+            search_results=search_results,
+            public=other_query.public,
+        )
+
+        ui_props = getattr(bpy.context.window_manager, HANA3D_UI)
+        first_rows = max(ui_props.total_count, 1) + ui_props.wcount * PREFETCH_ROWS
+        tempdir = paths.get_temp_dir(f'{asset_type}_search')
+        small_thumbnails = self._get_thumbnails(tempdir, search_results[:first_rows])
+        semaphore = asyncio.Semaphore(Preferences().get().thumbnail_concurrency)
+
+        async def fetch(thumbnail: Thumbnail):
+            imgpath, url = thumbnail
+            if imgpath is None or ThumbnailCache().contains(imgpath):
+                return
+            async with semaphore:
+                await download_thumbnail(imgpath, url)
+
+        fetches = [fetch(thumbnail) for thumbnail in small_thumbnails]
+        await asyncio.gather(*fetches, return_exceptions=True)
+        if SearchController().is_current(generation):
+            PreviewWindow().warm(asset_type)
+            logging.debug(f'Warmed {len(search_results)} {asset_type} results in the background')
+
+    def _show_local_results(self, query: Query) -> List[AssetData]:
+        """Show the results of the local index while the server is queried.
+
+        Parameters:
+            query: search query
+
+        Returns:
+            List[AssetData]: local results, replaced by the remote ones when they arrive
+        """
+        local_results = LocalIndex().search(query)
+        if not local_results:
+            return local_results
+        asset_type = query.asset_type
+        PreviewWindow().reset(asset_type)
+        set_search_results(asset_type, local_results)
+        set_original_search_results(asset_type, {'count': len(local_results), 'results': []})
+        PreviewWindow().update(asset_type, force=True)
+        run_assetbar_op = getattr(bpy.ops.object, f'{HANA3D_NAME}_run_assetbar_fix_context')
+        run_assetbar_op()
+        UI().add_report(text=f'{len(local_results)} local results', timeout=2)
+        return local_results
+
     def _check_errors(self, request_data: Dict) -> Tuple[bool, str]:
         if request_data.get('status_code') == 401:  # noqa: WPS432
             logging.debug(request_data)
             if request_data.get('code') == 'token_expired':
                 user_preferences = Preferences().get()
                 if user_preferences.api_key != '':
-                    hana3d_oauth.refresh_token(immediate=False)
+                    run_async_function(
+                        TokenManager().refresh,
+                        rejected_token=user_preferences.api_key,
+                    )
                     return False, request_data.get('description', '')
                 return False, 'Missing or wrong api_key in addon preferences'
         elif request_data.get('status_code') == 403:  # noqa: WPS432
@@ -243,10 +373,6 @@ class SearchOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa: WPS2
     ) -> AssetData:
         # Check for assetBaseId for backwards compatibility
         view_id = response.get('viewId') or response.get('assetBaseId') or ''
-        tooltip = utils.generate_tooltip(
-            response['name'],
-            response['description'],
-        )
         asset_data = AssetData(
             thumbnail_name,
             small_thumbnail_name,
@@ -255,87 +381,131 @@ class SearchOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa: WPS2
             view_id,
             response['name'],
             response['assetType'],
-            tooltip,
-            response['tags'],
-            response['verificationStatus'],
-            str(response['author']['id']),
-            response['description'] or '',
-            response.get('render_jobs', []),
-            response.get('workspace', ''),
+            tags=response['tags'],
+            verification_status=response['verificationStatus'],
+            author_id=str(response['author']['id']),
+            description=response['description'] or '',
+            render_jobs=response.get('render_jobs', []),
+            workspace=response.get('workspace', ''),
+            metadata=response.get('metadata'),
+            libraries=response.get('libraries') or (),
         )
 
         asset_data.created = str(response.get('created'))
         asset_data.revision = str(response.get('revision'))
 
-        if 'metadata' in response and response['metadata'] is not None:
-            asset_data.metadata = response['metadata']
-        if 'libraries' in response and response['libraries'] is not None:
-            asset_data.libraries = response['libraries']
+        for rfile in response['files']:
+            if rfile['fileType'] == 'thumbnail':
+                asset_data.thumbnail_url = rfile['fileThumbnailLarge'] or ''
+                asset_data.thumbnail_small_url = rfile['fileThumbnail'] or ''
         return asset_data
 
-    def _get_thumbnails(
+    def _drop_duplicates(
         self,
-        tempdir: str,
-        request_data: Dict,
-    ) -> Tuple[List[Thumbnail], List[Thumbnail]]:
-        thumb_small_urls: List = []
-        thumb_small_filepaths: List = []
-        thumb_full_urls: List = []
-        thumb_full_filepaths: List = []
-        # END OF PARSING
-        for rdata in request_data.get('results', []):
-            for rfile in rdata['files']:
-                # TODO move validation of published assets to server, too many checks here.
-                thumbnail = rfile['fileThumbnailLarge']
-                small_thumbnail = rfile['fileThumbnail']
-                if rfile['fileType'] != 'thumbnail':
-                    continue
-
-                if small_thumbnail is None:
-                    thumb_small_urls.append(None)
-                    thumb_small_filepaths.append(None)
-                else:
-                    thumb_small_urls.append(small_thumbnail)
-                    imgname = paths.extract_filename_from_url(small_thumbnail)
-                    imgpath = os.path.join(tempdir, imgname)
-                    thumb_small_filepaths.append(imgpath)
-
-                if thumbnail is None:
-                    thumb_full_urls.append(None)
-                    thumb_full_filepaths.append(None)
-                else:
-                    thumb_full_urls.append(thumbnail)
-                    imgname = paths.extract_filename_from_url(rfile['fileThumbnailLarge'])
-                    imgpath = os.path.join(tempdir, imgname)
-                    thumb_full_filepaths.append(imgpath)
-
-        small_thumbnails = zip(thumb_small_filepaths, thumb_small_urls)
-        full_thumbnails = zip(thumb_full_filepaths, thumb_full_urls)
-
-        return list(small_thumbnails), list(full_thumbnails)
+        previous_results: List[AssetData],
+        new_results: List[AssetData],
+    ) -> List[AssetData]:
+        """Remove results of a new page that were already returned by a previous one.
+
+        Pages may overlap when assets are created or deleted between requests.
+
+        Parameters:
+            previous_results: results already shown
+            new_results: results of the new page
+
+        Returns:
+            List[AssetData]: new results that are not shown yet
+        """
+        seen = {asset_data.view_id for asset_data in previous_results}
+        unique_results = []
+        for asset_data in new_results:
+            if asset_data.view_id in seen:
+                continue
+            seen.add(asset_data.view_id)
+            unique_results.append(asset_data)
+        if len(unique_results) < len(new_results):
+            duplicates = len(new_results) - len(unique_results)
+            logging.debug(f'Dropped {duplicates} results already in previous pages')
+        return unique_results
+
+    def _get_thumbnails(self, tempdir: str, search_results: List[AssetData]) -> List[Thumbnail]:
+        """Get small thumbnails of the results, large ones are fetched on hover.
+
+        Parameters:
+            tempdir: directory of the search thumbnails
+            search_results: parsed results, in the order they are shown
+
+        Returns:
+            List[Thumbnail]: path and url of each small thumbnail
+        """
+        small_thumbnails: List[Thumbnail] = []
+        for asset_data in search_results:
+            if not asset_data.thumbnail_small or not asset_data.thumbnail_small_url:
+                small_thumbnails.append((None, None))
+            else:
+                imgpath = os.path.join(tempdir, asset_data.thumbnail_small)
+                small_thumbnails.append((imgpath, asset_data.thumbnail_small_url))
+        return small_thumbnails
 
     def _get_asset_type_from_ui(self) -> AssetType:
         uiprops = getattr(bpy.context.window_manager, HANA3D_UI)
         return uiprops.asset_type_search.lower()
 
-    async def _load_thumbnails(
+    async def _load_thumbnails(  # noqa: WPS210,WPS231
         self,
-        small_thumbnails: List[Tuple],
-        large_thumbnails: List[Tuple],
+        small_thumbnails: List[Thumbnail],
         asset_type: AssetType,
         result_field: List[AssetData],
     ):
-        for small, large in zip(small_thumbnails, large_thumbnails):
-            imgpath, url = small
-            imgpath_large, url_large = large
-            if imgpath is not None and not os.path.exists(imgpath):
+        start_index = self.next_index
+        self.next_index = start_index + len(small_thumbnails)
+        semaphore = asyncio.Semaphore(Preferences().get().thumbnail_concurrency)
+        started_at = time.monotonic()
+        loaded_count = 0
+
+        async def fetch(thumbnail: Thumbnail):
+            imgpath, url = thumbnail
+            if imgpath is None or ThumbnailCache().contains(imgpath):
+                return
+            async with semaphore:
                 await download_thumbnail(imgpath, url)
-            if imgpath_large is not None and not os.path.exists(imgpath_large):
-                await download_thumbnail(imgpath_large, url_large)
-            current_asset_type = self._get_asset_type_from_ui()
-            if current_asset_type == asset_type:
-                load_preview(asset_type, result_field[self.next_index], self.next_index)
-            self.next_index += 1
+
+        async def fetch_and_load(position: int):
+            nonlocal loaded_count
+            await fetch(small_thumbnails[position])
+            index = start_index + position
+            if index >= len(result_field) or self._get_asset_type_from_ui() != asset_type:
+                return
+            PreviewWindow().load(asset_type, index)
+            if loaded_count == 0:
+                elapsed = time.monotonic() - started_at
+                logging.info(f'First thumbnail loaded in {elapsed:.3f}s')
+            loaded_count += 1
+
+        order = self._visible_order(start_index, len(small_thumbnails))
+        # semaphore waiters are served in order, so visible rows are requested first
+        tasks = [fetch_and_load(position) for position in order]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logging.warning(f'Could not fetch thumbnail: {result}')
+        logging.info(
+            f'Loaded {loaded_count} thumbnails in {time.monotonic() - started_at:.3f}s',
+        )
+
+    def _visible_order(self, start_index: int, count: int) -> List[int]:
+        """Order thumbnails so the rows shown in the asset bar are fetched first.
+
+        Parameters:
+            start_index: index of the first thumbnail in the search results
+            count: number of thumbnails
+
+        Returns:
+            List[int]: positions of the thumbnails, in fetch order
+        """
+        scroll_offset = getattr(bpy.context.window_manager, HANA3D_UI).scrolloffset
+        first_visible = max(scroll_offset - start_index, 0)
+        return list(range(first_visible, count)) + list(range(first_visible))
 
 
 classes = (
@@ -0,0 +1,176 @@
+"""Previews of the search results around the rows shown in the asset bar."""
+import logging
+import time
+from typing import Dict, Optional, Set, Tuple
+
+import bpy
+
+from .search import get_search_results, load_preview
+from ..asset.asset_type import AssetType
+from ..metaclasses.singleton import Singleton
+from ..preferences.preferences import Preferences
+from ..ui.thumbnail_textures import ThumbnailTextures
+from ... import utils
+from ...config import HANA3D_UI
+
+PREFETCH_ROWS = 1  # rows above and below the visible ones whose previews are loaded
+RELEASE_ROWS = 4  # rows above and below the visible ones whose previews are kept in memory
+
+WindowState = Tuple[int, int, int]
+
+
+class PreviewWindow(object, metaclass=Singleton):  # noqa: WPS214
+    """Load previews only for the visible asset bar rows and release the ones far out of view.
+
+    Previews of the asset types that are not shown stay loaded, within a memory budget, so
+    switching between them does not load anything again.
+    """
+
+    def __init__(self) -> None:
+        """Create the PreviewWindow instance."""
+        self._loaded: Dict[AssetType, Set[int]] = {}
+        self._state: Dict[AssetType, WindowState] = {}
+        self._scroll_offsets: Dict[AssetType, int] = {}
+        self._last_used: Dict[AssetType, float] = {}
+        self._active_type: Optional[AssetType] = None
+
+    def load(self, asset_type: AssetType, index: int) -> None:
+        """Load the preview of a result if it is in the window.
+
+        Parameters:
+            asset_type: type of the assets searched
+            index: index of the result
+        """
+        first, last = self._bounds(asset_type, PREFETCH_ROWS)
+        search_results = get_search_results(asset_type)
+        if not first <= index < min(last, len(search_results)):
+            return
+        load_preview(asset_type, search_results[index], index)
+        self._loaded.setdefault(asset_type, set()).add(index)
+
+    def switch(self, asset_type: AssetType) -> None:
+        """Show the results of another asset type, restoring where its asset bar was scrolled.
+
+        Parameters:
+            asset_type: type of the assets now shown
+        """
+        ui_props = getattr(bpy.context.window_manager, HANA3D_UI)
+        if self._active_type is not None and self._active_type != asset_type:
+            self._scroll_offsets[self._active_type] = ui_props.scrolloffset
+        saved_offset = self._scroll_offsets.get(asset_type, 0)
+        ui_props.scrolloffset = min(saved_offset, len(get_search_results(asset_type)))
+        self._active_type = asset_type
+        self.update(asset_type)
+
+    def warm(self, asset_type: AssetType) -> None:
+        """Load the first rows of an asset type that is not shown, so switching to it is instant.
+
+        Parameters:
+            asset_type: type of the assets searched in the background
+        """
+        search_results = get_search_results(asset_type)
+        first, last = self._bounds(asset_type, PREFETCH_ROWS)
+        loaded = self._loaded.setdefault(asset_type, set())
+        for index in range(first, min(last, len(search_results))):
+            if index not in loaded:
+                load_preview(asset_type, search_results[index], index)
+                loaded.add(index)
+        self._last_used.setdefault(asset_type, 0)
+        self._enforce_budget(asset_type)
+
+    def update(self, asset_type: AssetType, force: bool = False) -> None:
+        """Load the previews that scrolled into the window and release the far away ones.
+
+        Parameters:
+            asset_type: type of the assets searched
+            force: update even if the asset bar did not scroll
+        """
+        self._active_type = asset_type
+        self._last_used[asset_type] = time.monotonic()
+        search_results = get_search_results(asset_type)
+        ui_props = getattr(bpy.context.window_manager, HANA3D_UI)
+        state = (ui_props.scrolloffset, ui_props.total_count, len(search_results))
+        if not force and self._state.get(asset_type) == state:
+            return
+        self._state[asset_type] = state
+
+        loaded = self._loaded.setdefault(asset_type, set())
+        first, last = self._bounds(asset_type, PREFETCH_ROWS)
+        for index in range(first, min(last, len(search_results))):
+            if index not in loaded:
+                load_preview(asset_type, search_results[index], index)
+                loaded.add(index)
+
+        keep_first, keep_last = self._bounds(asset_type, RELEASE_ROWS)
+        far_away = [index for index in loaded if not keep_first <= index < keep_last]
+        for index in far_away:
+            self._release(asset_type, index)
+        if far_away:
+            logging.debug(f'Released {len(far_away)} {asset_type} previews out of view')
+        self._enforce_budget(asset_type)
+
+    def reset(self, asset_type: AssetType) -> None:
+        """Release every preview, when the results they show are replaced.
+
+        Parameters:
+            asset_type: type of the assets searched
+        """
+        for index in list(self._loaded.get(asset_type, ())):
+            self._release(asset_type, index)
+        self._state.pop(asset_type, None)
+        if asset_type != self._active_type:
+            self._scroll_offsets[asset_type] = 0
+
+    def _bounds(self, asset_type: AssetType, margin_rows: int) -> Tuple[int, int]:
+        ui_props = getattr(bpy.context.window_manager, HANA3D_UI)
+        if asset_type == ui_props.asset_type_search.lower():
+            scroll_offset = ui_props.scrolloffset
+        else:
+            scroll_offset = self._scroll_offsets.get(asset_type, 0)
+        margin = ui_props.wcount * margin_rows
+        first = max(scroll_offset - margin, 0)
+        last = scroll_offset + max(ui_props.total_count, 1) + margin
+        return first, last
+
+    def _enforce_budget(self, keep_type: AssetType) -> None:
+        """Release previews of the least recently shown asset types while over the budget.
+
+        Previews of the asset type shown in the asset bar are never released here, and do not
+        count against the budget.
+
+        Parameters:
+            keep_type: other asset type whose previews should be kept
+        """
+        budget = Preferences().get().preview_memory_budget * 1024 * 1024
+        if budget <= 0:
+            return
+        by_last_use = sorted(self._last_used, key=self._last_used.get)
+        for asset_type in by_last_use:
+            if self._loaded_bytes() <= budget:
+                return
+            if asset_type in {keep_type, self._active_type} or not self._loaded.get(asset_type):
+                continue
+            logging.debug(f'Preview memory over budget, releasing {asset_type} previews')
+            self.reset(asset_type)
+
+    def _loaded_bytes(self) -> int:
+        total = 0
+        for asset_type, indexes in self._loaded.items():
+            if asset_type == self._active_type:
+                continue
+            for index in indexes:
+                image_name = utils.previmg_name(asset_type, index)
+                total += ThumbnailTextures().loaded_bytes(image_name)
+                image = bpy.data.images.get(image_name)
+                if image is not None:
+                    total += image.size[0] * image.size[1] * image.channels
+        return total
+
+    def _release(self, asset_type: AssetType, index: int) -> None:
+        self._loaded.get(asset_type, set()).discard(index)
+        for fullsize in (False, True):
+            image_name = utils.previmg_name(asset_type, index, fullsize=fullsize)
+            ThumbnailTextures().release(image_name)
+            image: Optional[bpy.types.Image] = bpy.data.images.get(image_name)
+            if image is not None:
+                bpy.data.images.remove(image)
@@ -1,49 +1,237 @@
 """Auxiliary search functions."""
+import copy
 import logging
 import os
-from dataclasses import asdict, dataclass, field
-from typing import Dict, List, Tuple
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import bpy
 
 from ..asset.asset_type import AssetType
+from ..cache.thumbnail_cache import ThumbnailCache
 from ..metaclasses.singleton import Singleton
+from ..ui.thumbnail_textures import ThumbnailTextures
 from ... import paths, utils
 from ...config import (
     HANA3D_MATERIALS,
     HANA3D_MODELS,
-    HANA3D_NAME,
     HANA3D_SCENES,
     HANA3D_UI,
 )
 
 
-@dataclass
-class AssetData(object):
-    """Hana3D search result."""
-
-    thumbnail: str
-    thumbnail_small: str
-    download_url: str
-    id: str  # noqa: WPS125
-    view_id: str
-    name: str
-    asset_type: AssetType
-    tooltip: str
-    tags: List[str]
-    verification_status: str
-    author_id: str
-    description: str
-    render_jobs: List[str]
-    workspace: str
-    downloaded: float = 0
-    metadata: Dict = field(default_factory=dict)
-    created: str = ''
-    revision: str = ''
-    libraries: List[Dict] = field(default_factory=list)
-    bbox_min: Tuple[float, float, float] = (-0.5, -0.5, 0.0)
-    bbox_max: Tuple[float, float, float] = (0.5, 0.5, 1.0)
-    file_name: str = ''
+def _intern(text_value):
+    if isinstance(text_value, str):
+        return sys.intern(text_value)
+    return text_value
+
+
+def _intern_dict(dict_value: Dict) -> Dict:
+    return {_intern(key): _intern(item_value) for key, item_value in dict_value.items()}
+
+
+class AssetData(object):  # noqa: WPS214,WPS230
+    """Hana3D search result.
+
+    Thousands of results are kept for each asset type, so instances use `__slots__`,
+    repeated strings such as tags and library names are interned, and `metadata` and
+    `tooltip` are only built when they are first read.
+    """
+
+    __slots__ = (
+        'thumbnail',
+        'thumbnail_small',
+        'download_url',
+        'id',
+        'view_id',
+        'name',
+        'asset_type',
+        'tags',
+        'verification_status',
+        'author_id',
+        'description',
+        'render_jobs',
+        'workspace',
+        'downloaded',
+        'created',
+        'revision',
+        'libraries',
+        'bbox_min',
+        'bbox_max',
+        'file_name',
+        'thumbnail_url',
+        'thumbnail_small_url',
+        '_tooltip',
+        '_metadata',
+    )
+
+    def __init__(  # noqa: WPS211
+        self,
+        thumbnail: str,
+        thumbnail_small: str,
+        download_url: str,
+        id: str,  # noqa: WPS125
+        view_id: str,
+        name: str,
+        asset_type: AssetType,
+        tooltip: str = '',
+        tags: Iterable[str] = (),
+        verification_status: str = '',
+        author_id: str = '',
+        description: str = '',
+        render_jobs: Iterable[str] = (),
+        workspace: str = '',
+        downloaded: float = 0,
+        metadata: Optional[Dict] = None,
+        created: str = '',
+        revision: str = '',
+        libraries: Iterable[Dict] = (),
+        bbox_min: Tuple[float, float, float] = (-0.5, -0.5, 0.0),
+        bbox_max: Tuple[float, float, float] = (0.5, 0.5, 1.0),
+        file_name: str = '',
+        thumbnail_url: str = '',
+        thumbnail_small_url: str = '',
+    ):
+        """Create an AssetData object.
+
+        Parameters:
+            thumbnail: file name of the large thumbnail
+            thumbnail_small: file name of the small thumbnail
+            download_url: url of the blend file
+            id: asset id
+            view_id: view id
+            name: asset name
+            asset_type: asset type
+            tooltip: tooltip text, generated from name and description when empty
+            tags: asset tags
+            verification_status: verification status
+            author_id: author id
+            description: asset description
+            render_jobs: render jobs of the asset
+            workspace: workspace id
+            downloaded: download progress
+            metadata: asset metadata
+            created: creation date
+            revision: revision date
+            libraries: libraries of the asset
+            bbox_min: minimum corner of the bounding box
+            bbox_max: maximum corner of the bounding box
+            file_name: path of the downloaded file
+            thumbnail_url: url of the large thumbnail
+            thumbnail_small_url: url of the small thumbnail
+        """
+        self.thumbnail = thumbnail
+        self.thumbnail_small = thumbnail_small
+        self.download_url = download_url
+        self.id = id  # noqa: WPS125
+        self.view_id = view_id
+        self.name = name
+        self.asset_type = _intern(asset_type)
+        self._tooltip = tooltip
+        self.tags = [_intern(tag) for tag in tags]
+        self.verification_status = _intern(verification_status)
+        self.author_id = _intern(author_id)
+        self.description = description
+        self.render_jobs = list(render_jobs)
+        self.workspace = _intern(workspace)
+        self.downloaded = downloaded
+        self._metadata = metadata or None
+        self.created = created
+        self.revision = revision
+        self.libraries = [_intern_dict(library) for library in libraries]
+        self.bbox_min = tuple(bbox_min)
+        self.bbox_max = tuple(bbox_max)
+        self.file_name = file_name
+        self.thumbnail_url = thumbnail_url
+        self.thumbnail_small_url = thumbnail_small_url
+
+    def __repr__(self) -> str:
+        """Represent the object like a dataclass would.
+
+        Returns:
+            str: representation of the fields
+        """
+        fields = self.to_dict().items()
+        field_values = ', '.join(f'{name}={field_value!r}' for name, field_value in fields)
+        return f'AssetData({field_values})'
+
+    def __eq__(self, other) -> bool:
+        """Compare two search results field by field.
+
+        Parameters:
+            other: object to compare with
+
+        Returns:
+            bool: True if all fields are equal
+        """
+        if not isinstance(other, AssetData):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None  # type: ignore
+
+    @property
+    def tooltip(self) -> str:
+        """Tooltip shown in the asset bar.
+
+        Returns:
+            str: tooltip text
+        """
+        if not self._tooltip:
+            self._tooltip = utils.generate_tooltip(self.name, self.description)
+        return self._tooltip
+
+    @tooltip.setter
+    def tooltip(self, tooltip: str) -> None:
+        self._tooltip = tooltip
+
+    @property
+    def metadata(self) -> Dict:
+        """Metadata of the asset, most results have none.
+
+        Returns:
+            Dict: metadata
+        """
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, metadata: Dict) -> None:
+        self._metadata = metadata
+
+    def to_dict(self) -> Dict:
+        """Get the fields as plain Python objects, to be stored in ID properties or as JSON.
+
+        Returns:
+            Dict: field values by name
+        """
+        return {
+            'thumbnail': self.thumbnail,
+            'thumbnail_small': self.thumbnail_small,
+            'download_url': self.download_url,
+            'id': self.id,
+            'view_id': self.view_id,
+            'name': self.name,
+            'asset_type': self.asset_type,
+            'tooltip': self.tooltip,
+            'tags': list(self.tags),
+            'verification_status': self.verification_status,
+            'author_id': self.author_id,
+            'description': self.description,
+            'render_jobs': copy.deepcopy(self.render_jobs),
+            'workspace': self.workspace,
+            'downloaded': self.downloaded,
+            'metadata': copy.deepcopy(self._metadata or {}),
+            'created': self.created,
+            'revision': self.revision,
+            'libraries': copy.deepcopy(self.libraries),
+            'bbox_min': self.bbox_min,
+            'bbox_max': self.bbox_max,
+            'file_name': self.file_name,
+            'thumbnail_url': self.thumbnail_url,
+            'thumbnail_small_url': self.thumbnail_small_url,
+        }
 
     def copy(self):
         """Create copy of object.
@@ -51,7 +239,7 @@ class AssetData(object):
         Returns:
             AssetData: copied object
         """
-        return AssetData(**asdict(self))
+        return AssetData(**self.to_dict())
 
 
 class SearchData(object, metaclass=Singleton):
@@ -74,9 +262,30 @@ class SearchData(object, metaclass=Singleton):
         }
 
 
+def get_thumbnail_path(asset_data: AssetData) -> str:
+    """Get the best thumbnail of a search result that is already on disk.
+
+    Large thumbnails are only downloaded on hover, so the small one is used when it is missing.
+
+    Parameters:
+        asset_data: search result
+
+    Returns:
+        str: path of the thumbnail in the search directory
+    """
+    directory = paths.get_temp_dir(f'{asset_data.asset_type}_search')
+    thumbnail_path = os.path.join(directory, asset_data.thumbnail.split(os.sep)[-1])
+    if ThumbnailCache().contains(thumbnail_path) or not asset_data.thumbnail_small:
+        return thumbnail_path
+    return os.path.join(directory, asset_data.thumbnail_small.split(os.sep)[-1])
+
+
 def load_preview(asset_type: AssetType, search_result: AssetData, index: int):
     """Load small preview thumbnails for search results.
 
+    Thumbnails are decoded in worker threads into GPU textures when Blender supports it,
+    otherwise they are loaded as Image datablocks.
+
     Parameters:
         asset_type: type of the asset
         search_result: asset data
@@ -97,18 +306,27 @@ def load_preview(asset_type: AssetType, search_result: AssetData, index: int):
     image_name = utils.previmg_name(asset_type, index)
     logging.debug(f'Loading {image_name} in {thumbnail_path}')
 
-    if os.path.exists(thumbnail_path):  # sometimes we are unlucky...
+    thumbnail_textures = ThumbnailTextures()
+    if thumbnail_textures.available(thumbnail_path) and ThumbnailCache().contains(thumbnail_path):
+        thumbnail_textures.request(image_name, thumbnail_path)
+        return
+
+    if ThumbnailCache().contains(thumbnail_path):  # sometimes we are unlucky...
         img = bpy.data.images.get(image_name)
-        if img is None:
-            img = bpy.data.images.load(thumbnail_path)
-            img.name = image_name
-        elif img.filepath != thumbnail_path:
-            # had to add this check for autopacking files...
-            if img.packed_file is not None:
-                img.unpack(method='USE_ORIGINAL')
-            img.filepath = thumbnail_path
-            img.reload()
-        img.colorspace_settings.name = 'Linear'
+        try:
+            if img is None:
+                img = bpy.data.images.load(thumbnail_path)
+                img.name = image_name
+            elif img.filepath != thumbnail_path:
+                # had to add this check for autopacking files...
+                if img.packed_file is not None:
+                    img.unpack(method='USE_ORIGINAL')
+                img.filepath = thumbnail_path
+                img.reload()
+            img.colorspace_settings.name = 'Linear'
+        except RuntimeError as error:
+            logging.error(f'Could not load {thumbnail_path}: {error}')
+            ThumbnailCache().discard(thumbnail_path)
 
     img = bpy.data.images.get(image_name)
     if img is None or img.size[0] == 0 or img.size[1] == 0:
@@ -209,17 +427,18 @@ def get_search_props(asset_type: AssetType = None):
         return getattr(bpy.context.window_manager, HANA3D_MATERIALS)
 
 
-def run_operator(get_next=False):
+def run_operator(get_next=False, debounce=False) -> bool:
     """Run search operator.
 
     Parameters:
         get_next: get next batch of results
+        debounce: wait until the user stops typing before searching
+
+    Returns:
+        bool: False if the request for the next page was dropped, as a search is running
     """
-    search_props = get_search_props()
-    if not search_props.is_searching:
-        logging.debug(f'Running search operator with get_next = {get_next}')
-        search_op = getattr(bpy.ops.view3d, f'{HANA3D_NAME}_search')
-        search_op(get_next=get_next)
+    from .controller import SearchController  # noqa: WPS433
+    return SearchController().request(get_next=get_next, debounce=debounce)
 
 
 def _get_asset_type_from_ui() -> AssetType:
@@ -0,0 +1,133 @@
+"""In-memory cache of search responses, revalidated with ETags."""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .query import Query
+from ..metaclasses.singleton import Singleton
+from ..preferences.preferences import Preferences
+
+MAX_ENTRIES = 64
+MAX_STALE_LIFETIMES = 4  # past this age a stale response is fetched again, not served
+
+
+@dataclass
+class CachedSearch(object):
+    """Search response kept in the cache."""
+
+    response: Dict
+    etag: str
+    fetched_at: float
+    revalidation: Optional[asyncio.Future] = None
+
+    def age(self) -> float:
+        """Time since the response was fetched or revalidated.
+
+        Returns:
+            float: age in seconds
+        """
+        return time.monotonic() - self.fetched_at
+
+
+class SearchCache(object, metaclass=Singleton):
+    """Search responses keyed by query, workspace and page url."""
+
+    def __init__(self) -> None:
+        """Create the SearchCache instance."""
+        self._entries: Dict[str, CachedSearch] = {}
+        self.shown_key = ''
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: Query, url: str) -> str:
+        """Build the cache key of a search page.
+
+        Parameters:
+            query: search query
+            url: url of the requested page
+
+        Returns:
+            str: normalized key
+        """
+        query_dict = {
+            name: query_value
+            for name, query_value in query.to_dict().items()
+            if name != 'context'
+        }
+        return json.dumps(
+            {'query': query_dict, 'workspace': query.workspace, 'url': url},
+            sort_keys=True,
+            default=str,
+        )
+
+    def enabled(self) -> bool:
+        """Check if search responses should be cached.
+
+        Returns:
+            bool: True if the cache lifetime is not zero
+        """
+        return Preferences().get().search_cache_ttl > 0
+
+    def get(self, key: str) -> Optional[CachedSearch]:
+        """Get a cached response, fresh or stale, and count the hit or miss.
+
+        Parameters:
+            key: cache key
+
+        Returns:
+            Optional[CachedSearch]: cached response, None if the page was never fetched or
+            is too old to be shown while it is revalidated
+        """
+        entry = self._entries.get(key)
+        max_age = Preferences().get().search_cache_ttl * MAX_STALE_LIFETIMES
+        if entry is not None and entry.age() >= max_age:
+            self._entries.pop(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        logging.debug(f'Search cache {self.hits} hits, {self.misses} misses')
+        return entry
+
+    def is_fresh(self, entry: CachedSearch) -> bool:
+        """Check if a cached response can be used without revalidating it.
+
+        Parameters:
+            entry: cached response
+
+        Returns:
+            bool: True if the response is younger than the cache lifetime
+        """
+        return entry.age() < Preferences().get().search_cache_ttl
+
+    def store(self, key: str, response: Dict, etag: str) -> None:
+        """Cache a search response, evicting the oldest one when the cache is full.
+
+        Parameters:
+            key: cache key
+            response: search response
+            etag: ETag header of the response
+        """
+        self._entries.pop(key, None)
+        self._entries[key] = CachedSearch(response, etag, time.monotonic())
+        while len(self._entries) > MAX_ENTRIES:
+            self._entries.pop(next(iter(self._entries)))
+
+    def touch(self, key: str) -> None:
+        """Mark a cached response as fresh after the server confirmed it did not change.
+
+        Parameters:
+            key: cache key
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.fetched_at = time.monotonic()
+
+    def clear(self) -> None:
+        """Drop every cached response, after assets were created, edited or deleted."""
+        self._entries.clear()
@@ -0,0 +1,234 @@
+"""Texture atlas holding the images of the asset bar, drawn with a single batch."""
+import logging
+from collections import OrderedDict
+from typing import Any, List, Optional, Set, Tuple
+
+import bgl
+import bpy
+import gpu
+from gpu_extras.batch import batch_for_shader
+from mathutils import Matrix
+
+from . import bgl_helper
+from .bgl_helper import Drawable
+from .ui_types import Color
+from ..metaclasses.singleton import Singleton
+
+ATLAS_SIZE = 2048
+MIN_SLOT_SIZE = 16
+
+SourceKey = Tuple[Any, ...]
+Quad = Tuple[float, float, float, float, int]
+
+
+class Slot(object):
+    """Square of the atlas and the image copied into it."""
+
+    __slots__ = ('index', 'source')
+
+    def __init__(self, index: int, source: Drawable) -> None:
+        """Create a Slot.
+
+        Parameters:
+            index: position of the slot in the atlas, row by row
+            source: image copied into the slot, kept so its texture is not freed
+        """
+        self.index = index
+        self.source = source
+
+
+def _source_key(image: Drawable, crop: Color) -> SourceKey:
+    if isinstance(image, bpy.types.Image):
+        return ('image', image.as_pointer(), image.filepath, tuple(crop))
+    return ('texture', id(image), tuple(crop))
+
+
+class TextureAtlas(object, metaclass=Singleton):  # noqa: WPS214
+    """Images of the asset bar packed into one offscreen texture.
+
+    Each image is copied into a square slot once, and the quads of a frame are drawn with one
+    batch that is only rebuilt when the layout or the images change.
+    """
+
+    def __init__(self) -> None:
+        """Create the TextureAtlas instance."""
+        self._offscreen: Optional[gpu.types.GPUOffScreen] = None
+        self._slot_size = 0
+        self._slots: 'OrderedDict[SourceKey, Slot]' = OrderedDict()
+        self._free: List[int] = []
+        self._used: Set[int] = set()
+        self._quads: List[Quad] = []
+        self._batch = None
+        self._batch_key: Tuple[Quad, ...] = ()
+        self._failed = False
+
+    def begin(self, slot_size: int) -> bool:
+        """Start collecting the images of a frame.
+
+        Parameters:
+            slot_size: size in pixels of the slots, usually the asset bar thumbnail size
+
+        Returns:
+            bool: False if the atlas can not be used, so images must be drawn one by one
+        """
+        self._quads = []
+        self._used = set()
+        if self._failed:
+            return False
+        slot_size = max(int(slot_size), MIN_SLOT_SIZE)
+        if slot_size != self._slot_size or self._offscreen is None:
+            self._reset(slot_size)
+        return self._offscreen is not None
+
+    def add(  # noqa: WPS211
+        self,
+        x: float,  # noqa: WPS111
+        y: float,  # noqa: WPS111
+        width: float,
+        height: float,
+        image: Drawable,
+        crop: Color = (0, 0, 1, 1),
+    ) -> bool:
+        """Queue an image to be drawn by the batch of this frame.
+
+        Parameters:
+            x: Bottom-left x-coordinate
+            y: Bottom-left y-coordinate
+            width: Width of the image
+            height: Height of the image
+            image: Image or texture
+            crop: Tuple describing how the image should be cropped
+
+        Returns:
+            bool: False if the image has no slot, so it must be drawn by itself
+        """
+        if self._offscreen is None:
+            return False
+        slot_index = self._slot_for(image, crop)
+        if slot_index is None:
+            return False
+        self._quads.append((x, y, width, height, slot_index))
+        return True
+
+    def draw(self) -> None:
+        """Draw the images queued in this frame."""
+        if self._offscreen is None or not self._quads:
+            return
+        quads = tuple(self._quads)
+        shader = gpu.shader.from_builtin('2D_IMAGE')
+        if self._batch is None or quads != self._batch_key:
+            self._batch = self._build_batch(shader, quads)
+            self._batch_key = quads
+
+        bgl.glEnable(bgl.GL_BLEND)
+        shader.bind()
+        if hasattr(self._offscreen, 'texture_color'):  # noqa: WPS421
+            shader.uniform_sampler('image', self._offscreen.texture_color)
+        else:
+            bgl.glActiveTexture(bgl.GL_TEXTURE0)
+            bgl.glBindTexture(bgl.GL_TEXTURE_2D, self._offscreen.color_texture)
+            shader.uniform_int('image', 0)
+        self._batch.draw(shader)
+
+    def clear(self) -> None:
+        """Free the atlas."""
+        if self._offscreen is not None:
+            self._offscreen.free()
+        self._offscreen = None
+        self._slot_size = 0
+        self._slots.clear()
+        self._free = []
+        self._batch = None
+        self._batch_key = ()
+
+    def _reset(self, slot_size: int) -> None:
+        self.clear()
+        try:
+            self._offscreen = gpu.types.GPUOffScreen(ATLAS_SIZE, ATLAS_SIZE)
+        except (RuntimeError, ValueError) as error:
+            logging.warning(f'Could not create asset bar atlas, drawing images one by one: {error}')
+            self._failed = True
+            return
+        self._slot_size = slot_size
+        slots_per_row = ATLAS_SIZE // slot_size
+        self._free = list(reversed(range(slots_per_row * slots_per_row)))
+        logging.debug(f'Created asset bar atlas with {len(self._free)} slots of {slot_size}px')
+
+    def _slot_for(self, image: Drawable, crop: Color) -> Optional[int]:
+        key = _source_key(image, crop)
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._slots.move_to_end(key)
+            self._used.add(slot.index)
+            return slot.index
+
+        slot_index = self._allocate()
+        if slot_index is None:
+            return None
+        try:
+            self._copy(slot_index, image, crop)
+        except Exception as error:
+            logging.debug(f'Could not copy image into the asset bar atlas: {error}')
+            self._free.append(slot_index)
+            return None
+        self._slots[key] = Slot(slot_index, image)
+        self._used.add(slot_index)
+        return slot_index
+
+    def _allocate(self) -> Optional[int]:
+        if self._free:
+            return self._free.pop()
+        for key, slot in self._slots.items():
+            if slot.index not in self._used:
+                self._slots.pop(key)
+                return slot.index
+        return None
+
+    def _slot_origin(self, slot_index: int) -> Tuple[int, int]:
+        slots_per_row = ATLAS_SIZE // self._slot_size
+        row, column = divmod(slot_index, slots_per_row)
+        return column * self._slot_size, row * self._slot_size
+
+    def _copy(self, slot_index: int, image: Drawable, crop: Color) -> None:
+        x, y = self._slot_origin(slot_index)  # noqa: WPS111
+        projection = Matrix.Translation((-1, -1, 0)) @ Matrix.Diagonal(
+            (2 / ATLAS_SIZE, 2 / ATLAS_SIZE, 1, 1),
+        )
+        viewport = bgl.Buffer(bgl.GL_INT, 4)
+        bgl.glGetIntegerv(bgl.GL_VIEWPORT, viewport)
+        try:
+            with self._offscreen.bind():
+                bgl.glViewport(0, 0, ATLAS_SIZE, ATLAS_SIZE)
+                with gpu.matrix.push_pop(), gpu.matrix.push_pop_projection():
+                    gpu.matrix.load_identity()
+                    gpu.matrix.load_projection_matrix(projection)
+                    bgl_helper.draw_image(
+                        x,
+                        y,
+                        self._slot_size,
+                        self._slot_size,
+                        image,
+                        1,
+                        crop=crop,
+                        blend=False,
+                    )
+        finally:
+            bgl.glViewport(*viewport)
+
+    def _build_batch(self, shader: gpu.types.GPUShader, quads: Tuple[Quad, ...]):
+        coords = []
+        uvs = []
+        indices = []
+        half_texel = 0.5 / ATLAS_SIZE
+        slot_uv_size = self._slot_size / ATLAS_SIZE
+        for x, y, width, height, slot_index in quads:  # noqa: WPS111
+            origin_x, origin_y = self._slot_origin(slot_index)
+            left = origin_x / ATLAS_SIZE + half_texel
+            bottom = origin_y / ATLAS_SIZE + half_texel
+            right = left + slot_uv_size - 2 * half_texel
+            top = bottom + slot_uv_size - 2 * half_texel
+            first = len(coords)
+            coords.extend(((x, y), (x + width, y), (x, y + height), (x + width, y + height)))
+            uvs.extend(((left, bottom), (right, bottom), (left, top), (right, top)))
+            indices.extend(((first, first + 1, first + 2), (first + 2, first + 1, first + 3)))
+        return batch_for_shader(shader, 'TRIS', {'pos': coords, 'texCoord': uvs}, indices=indices)
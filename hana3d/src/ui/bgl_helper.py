@@ -16,7 +16,7 @@
 #
 # ##### END GPL LICENSE BLOCK #####
 """Module containing helper methods for drawing using bgl."""
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 
 import bgl
 import blf
@@ -27,6 +27,8 @@ from mathutils import Euler, Vector
 
 from .ui_types import BlenderSequence, Color
 
+Drawable = Union[bpy.types.Image, gpu.types.GPUTexture]
+
 
 def draw_rect(
     x: float,  # noqa: WPS111
@@ -114,14 +116,29 @@ def draw_rect3d(coords: Tuple[Vector, Vector, Vector, Vector], color: Color) ->
     batch.draw(shader)
 
 
+def image_size(image: Drawable) -> Tuple[int, int]:
+    """Get the size of an image or texture.
+
+    Parameters:
+        image: Image or texture
+
+    Returns:
+        Tuple[int, int]: width and height in pixels
+    """
+    if isinstance(image, bpy.types.Image):
+        return image.size[0], image.size[1]
+    return image.width, image.height
+
+
 def draw_image(  # noqa: WPS210, WPS211
     x: float,  # noqa: WPS111
     y: float,  # noqa: WPS111
     width: float,
     height: float,
-    image: bpy.types.Image,
+    image: Drawable,
     transparency: float,
     crop: Color = (0, 0, 1, 1),
+    blend: bool = True,
 ) -> None:
     """Draw a image on the screen.
 
@@ -130,9 +147,10 @@ def draw_image(  # noqa: WPS210, WPS211
         y: Bottom-left y-coordinate
         width: Width of the image
         height: Height of the image
-        image: Image to be drawn
+        image: Image, or texture from ThumbnailTextures, to be drawn
         transparency: Image transparency
         crop: Tuple describing how the image should be cropped
+        blend: Blend with what is already drawn, instead of replacing it
 
     Raises:
         Exception: Failed to load into an OpenGL texture
@@ -156,26 +174,43 @@ def draw_image(  # noqa: WPS210, WPS211
     shader = gpu.shader.from_builtin('2D_IMAGE')
     batch = batch_for_shader(shader, 'TRIS', {'pos': coords, 'texCoord': uvs}, indices=indices)
 
+    # in case someone disabled it before
+    if blend:
+        bgl.glEnable(bgl.GL_BLEND)
+    else:
+        bgl.glDisable(bgl.GL_BLEND)
+
+    shader.bind()
+    bind_image(shader, image)
+    batch.draw(shader)
+
+    bgl.glDisable(bgl.GL_TEXTURE_2D)
+
+
+def bind_image(shader: gpu.types.GPUShader, image: Drawable) -> None:
+    """Bind an image or texture to the `image` sampler of a bound shader.
+
+    Parameters:
+        shader: Shader with an `image` sampler, already bound
+        image: Image or texture
+
+    Raises:
+        Exception: Failed to load into an OpenGL texture
+    """
+    if not isinstance(image, bpy.types.Image):
+        shader.uniform_sampler('image', image)
+        return
+
     # send image to gpu if it isn't there already
     if image.gl_load():
         raise Exception()
 
-    # texture identifier on gpu
-    texture_id = image.bindcode
-
-    # in case someone disabled it before
-    bgl.glEnable(bgl.GL_BLEND)
-
     # bind texture to image unit 0
     bgl.glActiveTexture(bgl.GL_TEXTURE0)
-    bgl.glBindTexture(bgl.GL_TEXTURE_2D, texture_id)
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, image.bindcode)
 
-    shader.bind()
     # tell shader to use the image that is bound to image unit 0
     shader.uniform_int('image', 0)
-    batch.draw(shader)
-
-    bgl.glDisable(bgl.GL_TEXTURE_2D)
 
 
 def draw_text(
@@ -1,17 +1,26 @@
 """Asset bar callbacks."""
 import datetime
+import logging
 import math
 import os
+import time
 from contextlib import suppress
 
 import bpy
 
 from .. import bgl_helper
+from ..atlas import TextureAtlas
+from ..thumbnail_textures import ThumbnailTextures
+from ...cache.thumbnail_cache import ThumbnailCache
 from ...preferences.preferences import Preferences
 from ...search import search
 from .... import paths, utils
 from ....config import HANA3D_NAME, HANA3D_UI
 
+FRAME_TIME_SAMPLES = 120  # frames averaged by each frame time log
+
+frame_times = []
+
 verification_icons = {
     'ready': 'vs_ready.png',
     'deleted': 'vs_deleted.png',
@@ -64,11 +73,12 @@ def draw_tooltip(   # noqa: WPS211
 
     texth = line_height * nlines + nameline_height * 2
 
-    max_dim = max(img.size[0], img.size[1])
+    img_width, img_height = bgl_helper.image_size(img)
+    max_dim = max(img_width, img_height)
     if max_dim == 0:
         return
-    isizex = int(512 * scale * img.size[0] / max_dim)
-    isizey = int(512 * scale * img.size[1] / max_dim)
+    isizex = int(512 * scale * img_width / max_dim)
+    isizey = int(512 * scale * img_height / max_dim)
 
     estimated_height = 2 * ttipmargin + textmargin + isizey  # noqa: WPS204
 
@@ -83,8 +93,8 @@ def draw_tooltip(   # noqa: WPS211
         lines = text.split('\n')
 
         texth = line_height * nlines + nameline_height * 2 + line_height
-        isizex = int(512 * scale * img.size[0] / max_dim)
-        isizey = int(512 * scale * img.size[1] / max_dim)
+        isizex = int(512 * scale * img_width / max_dim)
+        isizey = int(512 * scale * img_height / max_dim)
 
     name_height = int(18 * scale)
 
@@ -240,26 +250,52 @@ def draw_tooltip(   # noqa: WPS211
         bgl_helper.draw_text(author_line, xtext, ytext, fsize, tcol)
 
 
+def _draw_image(batched: bool, x, y, width, height, img, crop=(0, 0, 1, 1)):  # noqa: WPS111
+    if not batched or not TextureAtlas().add(x, y, width, height, img, crop=crop):
+        bgl_helper.draw_image(x, y, width, height, img, 1, crop=crop)
+
+
+def _log_frame_time(elapsed: float, batched: bool):
+    frame_times.append(elapsed)
+    if len(frame_times) < FRAME_TIME_SAMPLES:
+        return
+    average = sum(frame_times) / len(frame_times) * 1000
+    mode = 'atlas batch' if batched else 'one draw per image'
+    logging.debug(f'Asset bar thumbnails drawn in {average:.3f}ms per frame ({mode})')
+    frame_times.clear()
+
+
+def _get_preview(image_name: str):
+    texture = ThumbnailTextures().get(image_name)
+    if texture is not None:
+        return texture
+    return bpy.data.images.get(image_name)
+
+
 def _load_tooltip_thumbnail(search_result: search.AssetData, active_index: int):
     asset_type = search_result.asset_type
     image_name = utils.previmg_name(asset_type, active_index, fullsize=True)
     directory = paths.get_temp_dir(f'{search_result.asset_type}_search')
     thumbnail_path = os.path.join(directory, search_result.thumbnail)
 
+    thumbnail_textures = ThumbnailTextures()
+    if thumbnail_textures.available(thumbnail_path):
+        if ThumbnailCache().contains(thumbnail_path):
+            thumbnail_textures.request(image_name, thumbnail_path)
+        texture = thumbnail_textures.get(image_name)
+        if texture is not None:
+            return texture
+        return _get_preview(utils.previmg_name(asset_type, active_index))
+
     img = bpy.data.images.get(image_name)
     if img is None or img.filepath != thumbnail_path:
-        if os.path.exists(thumbnail_path):
-            if img is None:
-                img = bpy.data.images.load(thumbnail_path)
-                img.name = image_name
-            elif img.filepath != thumbnail_path:
-                # TODO: replace imgs reloads with a method that forces unpack for thumbs.
-                if img.packed_file is not None:
-                    img.unpack(method='USE_ORIGINAL')
-                img.filepath = thumbnail_path
-                img.reload()
-                img.name = image_name
-        else:
+        try:
+            img = _load_cached_thumbnail(img, image_name, thumbnail_path)
+        except RuntimeError as error:
+            logging.debug(f'Could not load {thumbnail_path}: {error}')
+            ThumbnailCache().discard(thumbnail_path)
+            img = None
+        if img is None:
             image_name = utils.previmg_name(asset_type, active_index)
             img = bpy.data.images.get(image_name)
         with suppress(AttributeError):
@@ -268,6 +304,22 @@ def _load_tooltip_thumbnail(search_result: search.AssetData, active_index: int):
     return img
 
 
+def _load_cached_thumbnail(img, image_name: str, thumbnail_path: str):
+    if not ThumbnailCache().contains(thumbnail_path):
+        return None
+    if img is None:
+        img = bpy.data.images.load(thumbnail_path)
+        img.name = image_name
+    elif img.filepath != thumbnail_path:
+        # TODO: replace imgs reloads with a method that forces unpack for thumbs.
+        if img.packed_file is not None:
+            img.unpack(method='USE_ORIGINAL')
+        img.filepath = thumbnail_path
+        img.reload()
+        img.name = image_name
+    return img
+
+
 def _load_tooltip_author(search_result):
     gimg = None
     author_tooltip = ''
@@ -392,6 +444,10 @@ def draw_callback2d_search(self, context):
                     1,
                 )
 
+        started_at = time.perf_counter()
+        batched = Preferences().get().batched_asset_bar
+        batched = batched and TextureAtlas().begin(ui_props.thumb_size)
+        overlays = []
         for row in range(0, h_draw):
             w_draw = min(
                 ui_props.wcount,
@@ -409,48 +465,45 @@ def draw_callback2d_search(self, context):
 
                 index = column + ui_props.scrolloffset + row * ui_props.wcount
                 iname = utils.previmg_name(asset_type, index)
-                img = bpy.data.images.get(iname)
+                img = _get_preview(iname)
 
                 if img is None:
                     continue
 
-                max_size = max(img.size[0], img.size[1])
-                width = int(ui_props.thumb_size * img.size[0] / max_size)
-                height = int(ui_props.thumb_size * img.size[1] / max_size)
+                img_width, img_height = bgl_helper.image_size(img)
+                max_size = max(img_width, img_height)
+                if max_size == 0:
+                    continue
+                width = int(ui_props.thumb_size * img_width / max_size)
                 crop = (0, 0, 1, 1)
-                if img.size[0] > img.size[1]:
-                    offset = (1 - img.size[1] / img.size[0]) / 2  # noqa: WPS220, WPS221
+                if img_width > img_height:
+                    offset = (1 - img_height / img_width) / 2  # noqa: WPS220, WPS221
                     crop = (offset, 0, 1 - offset, 1)  # noqa: WPS220
-                if img is not None:
-                    bgl_helper.draw_image(x, y, width, width, img, 1, crop=crop)  # noqa: WPS220
-                    if index == ui_props.active_index:  # noqa: WPS220
-                        bgl_helper.draw_rect(  # noqa: WPS220
-                            x - ui_props.highlight_margin,
-                            y - ui_props.highlight_margin,
-                            width + 2 * ui_props.highlight_margin,
-                            width + 2 * ui_props.highlight_margin,
-                            highlight,
-                        )
-
-                else:
-                    bgl_helper.draw_rect(x, y, width, height, white)  # noqa: WPS220
+                _draw_image(batched, x, y, width, width, img, crop=crop)
+                if index == ui_props.active_index:
+                    overlays.append((
+                        x - ui_props.highlight_margin,
+                        y - ui_props.highlight_margin,
+                        width + 2 * ui_props.highlight_margin,
+                        width + 2 * ui_props.highlight_margin,
+                        highlight,
+                    ))
 
                 search_result = search_results[index]
                 if search_result.downloaded > 0:
                     width = int(width * search_result.downloaded / 100.0)  # noqa: WPS220
-                    bgl_helper.draw_rect(x, y - 2, width, 2, green)  # noqa: WPS220
+                    overlays.append((x, y - 2, width, 2, green))  # noqa: WPS220
 
                 v_icon = verification_icons[search_result.verification_status]  # noqa: E501
                 if v_icon is not None:
                     img = utils.get_thumbnail(v_icon)  # noqa: WPS220
-                    bgl_helper.draw_image(  # noqa: WPS220
-                        x + ui_props.thumb_size - 26,
-                        y + 2,
-                        24,
-                        24,
-                        img,
-                        1,
-                    )
+                    _draw_image(batched, x + ui_props.thumb_size - 26, y + 2, 24, 24, img)
+
+        if batched:
+            TextureAtlas().draw()
+        for overlay in overlays:
+            bgl_helper.draw_rect(*overlay)
+        _log_frame_time(time.perf_counter() - started_at, batched)
 
         if ui_props.draw_tooltip:
             if search_results is not None and -1 < ui_props.active_index < len(search_results):
@@ -480,7 +533,7 @@ def draw_callback2d_search(self, context):
     elif ui_props.dragging and (ui_props.draw_drag_image or ui_props.draw_snapped_bounds):
         if ui_props.active_index > -1:
             iname = utils.previmg_name(asset_type, ui_props.active_index)
-            img = bpy.data.images.get(iname)
+            img = _get_preview(iname)
             linelength = 35
             bgl_helper.draw_image(
                 ui_props.mouse_x + linelength,
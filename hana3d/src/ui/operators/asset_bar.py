@@ -15,6 +15,8 @@ from ...asset.asset_type import AssetType
 from ...edit_asset.edit import set_edit_props
 from ...preferences.preferences import Preferences
 from ...search import search
+from ...search.large_thumbnails import LargeThumbnailFetcher
+from ...search.preview_window import PreviewWindow
 from ...upload import upload
 from ..callbacks.asset_bar import draw_callback2d, draw_callback3d
 from ..main import UI
@@ -276,13 +278,30 @@ class AssetBarOperator(bpy.types.Operator):  # noqa: WPS338, WPS214
     def search_more(self, asset_type: AssetType):
         """Search more results."""
         original_search_results = search.get_original_search_results(asset_type)
-        if original_search_results is not None and original_search_results.get('next') is not None:
-            len_search = len(search.get_search_results())
-            image_name = utils.previmg_name(asset_type, len_search - 1)
-            img = bpy.data.images.get(image_name)
-            if img:
-                logging.debug(f'{image_name} has already loaded, will continue search')
-                search.run_operator(get_next=True)
+        if original_search_results is None:
+            return
+        next_url = original_search_results.get('next')
+        # a page that loaded replaces the url, one that failed is not requested on every event
+        if next_url is None or next_url == self._requested_next:
+            return
+        if search.run_operator(get_next=True):
+            logging.debug('Close to the end of the results, continuing search')
+            self._requested_next = next_url
+
+    def _near_end_of_results(self, ui_props, len_search: int) -> bool:
+        """Check if the asset bar was scrolled far enough to prefetch the next page.
+
+        Parameters:
+            ui_props: UI properties
+            len_search: number of loaded results
+
+        Returns:
+            bool: True if the last visible result is past the prefetch percentage
+        """
+        if len_search - ui_props.scrolloffset < ui_props.total_count + 10:  # noqa: WPS221,WPS204
+            return True
+        prefetch_at = len_search * Preferences().get().next_page_prefetch / 100
+        return ui_props.scrolloffset + ui_props.total_count >= prefetch_at
 
     def exit_modal(self):
         """Exit modal."""
@@ -398,11 +417,12 @@ class AssetBarOperator(bpy.types.Operator):  # noqa: WPS338, WPS214
         if search_results is None:
             return {'PASS_THROUGH'}
         len_search = len(search_results)
+        asset_type = ui_props.asset_type_search.lower()
         if ui_props.scrolloffset > len_search:
             ui_props.scrolloffset = 0
-        elif len_search - ui_props.scrolloffset < ui_props.total_count + 10:  # noqa: WPS221,WPS204
-            asset_type = ui_props.asset_type_search.lower()
+        elif self._near_end_of_results(ui_props, len_search):
             self.search_more(asset_type)
+        PreviewWindow().update(asset_type)
         if event.type in {'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 'TRACKPADPAN'}:
             # scrolling
             mx = event.mouse_region_x
@@ -438,6 +458,7 @@ class AssetBarOperator(bpy.types.Operator):  # noqa: WPS338, WPS214
                 if ui_props.scrolloffset < 0:
                     ui_props.scrolloffset = 0
 
+            PreviewWindow().update(asset_type)
             return {'RUNNING_MODAL'}
         if event.type == 'MOUSEMOVE':  # Apply
 
@@ -463,6 +484,7 @@ class AssetBarOperator(bpy.types.Operator):  # noqa: WPS338, WPS214
                 ui_props.draw_drag_image = False
                 ui_props.draw_snapped_bounds = False
                 ui_props.draw_tooltip = False
+                LargeThumbnailFetcher().leave()
                 bpy.context.window.cursor_set('DEFAULT')
                 return {'PASS_THROUGH'}
 
@@ -481,6 +503,7 @@ class AssetBarOperator(bpy.types.Operator):  # noqa: WPS338, WPS214
                 ui_props.active_index = asset_search_index
                 if asset_search_index > -1:
                     asset_data = search_results[asset_search_index]
+                    LargeThumbnailFetcher().hover(search_results, asset_search_index)
 
                     ui_props.sku.clear()
 
@@ -497,6 +520,7 @@ class AssetBarOperator(bpy.types.Operator):  # noqa: WPS338, WPS214
 
                 else:
                     ui_props.draw_tooltip = False
+                    LargeThumbnailFetcher().leave()
 
                 if mx > ui_props.bar_x + ui_props.bar_width - 50:
                     if original_search_results['count'] - ui_props.scrolloffset > ui_props.total_count + 1:  # noqa: E501
@@ -570,12 +594,14 @@ class AssetBarOperator(bpy.types.Operator):  # noqa: WPS338, WPS214
                             ui_props.scrolloffset + ui_props.total_count,
                             len_search - ui_props.total_count,
                         )
+                        PreviewWindow().update(asset_type)
                         return {'RUNNING_MODAL'}
                 if mx < ui_props.bar_x + 50 and ui_props.scrolloffset > 0:
                     ui_props.scrolloffset = max(
                         0,
                         ui_props.scrolloffset - ui_props.total_count,
                     )
+                    PreviewWindow().update(asset_type)
                     return {'RUNNING_MODAL'}
 
                 # Drag-drop interaction
@@ -741,6 +767,7 @@ class AssetBarOperator(bpy.types.Operator):  # noqa: WPS338, WPS214
 
         self.window = context.window
         self.area = context.area
+        self._requested_next = ''
         self.scene = bpy.context.scene
 
         self.has_quad_views = bool(bpy.context.area.spaces[0].region_quadviews)  # noqa: WPS219
@@ -6,6 +6,7 @@ import bpy
 from bpy.props import IntProperty
 
 from ...unified_props import Unified
+from ...upload.checkpoint import get_checkpoint_key, has_checkpoint
 from ...upload.upload import get_upload_props
 from ...validators import BaseValidator, Category, dummy_fix_function
 from ...validators.animated_meshes_check import animated_meshes_check
@@ -22,6 +23,7 @@ from ...validators.square_textures import square_textures
 from ...validators.textures_size import textures_size
 from ...validators.uv_check import uv_checker
 from ...validators.vertex_color_check import vertex_color_checker
+from .... import utils
 from ....config import HANA3D_DESCRIPTION, HANA3D_NAME, HANA3D_UI
 from ....report_tools import execute_wrapper
 
@@ -217,3 +219,15 @@ class ValidationPanel(bpy.types.Operator):  # noqa: WPS338, WPS214
             )
             op.asset_type = asset_type
             op.reupload = False
+
+        active_asset = utils.get_active_asset()
+        if active_asset is not None and not upload_props.uploading:
+            checkpoint_key = get_checkpoint_key(asset_type, active_asset.name, bpy.data.filepath)
+            if has_checkpoint(checkpoint_key):
+                op = row.operator(
+                    f'object.{HANA3D_NAME}_upload',
+                    text='Resume Upload',
+                    icon='FILE_REFRESH',
+                )
+                op.asset_type = asset_type
+                op.resume = True
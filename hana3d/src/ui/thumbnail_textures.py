@@ -0,0 +1,358 @@
+"""GPU textures of the search thumbnails, decoded in worker threads."""
+import functools
+import logging
+import os
+import struct
+import time
+import zlib
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import bpy
+import gpu
+import numpy
+
+from ..cache.thumbnail_cache import ThumbnailCache
+from ..metaclasses.singleton import Singleton
+from ..preferences.preferences import Preferences
+from ... import paths
+
+DECODE_WORKERS = 2
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}  # color type: channels, palette images are not handled
+PNG_FILTER_SUB = 1
+PNG_FILTER_UP = 2
+OPAQUE = 255
+
+PendingDecode = Tuple[str, Future]
+
+
+@dataclass
+class DecodedImage(object):
+    """RGBA pixels of an image as floats, bottom row first as textures expect them."""
+
+    width: int
+    height: int
+    pixels: Sequence[float]
+
+    def to_texture(self) -> gpu.types.GPUTexture:
+        """Upload the pixels to the GPU.
+
+        Returns:
+            gpu.types.GPUTexture: texture holding the image
+        """
+        buffer = gpu.types.Buffer('FLOAT', len(self.pixels), self.pixels)
+        return gpu.types.GPUTexture((self.width, self.height), format='RGBA8', data=buffer)
+
+
+@dataclass
+class TextureEntry(object):
+    """Texture of a thumbnail and the file it was decoded from."""
+
+    path: str
+    texture: gpu.types.GPUTexture
+    width: int
+    height: int
+
+
+def _unfilter(scanlines: numpy.ndarray, channels: int) -> numpy.ndarray:
+    """Undo the None, Sub and Up filters of the scanlines of a PNG with whole-array operations.
+
+    Sub rows are a running sum along the row. A run of Up rows is a running sum down the
+    column starting at the last row of another filter, so every Up row is the running sum of
+    all rows minus the running sum before that row.
+
+    Parameters:
+        scanlines: filter type byte followed by the filtered bytes, one row per scanline
+        channels: bytes per pixel
+
+    Returns:
+        numpy.ndarray: unfiltered rows
+    """
+    height = scanlines.shape[0]
+    filter_types = scanlines[:, 0]
+    rows = scanlines[:, 1:].copy()
+
+    sub_rows = filter_types == PNG_FILTER_SUB
+    if sub_rows.any():
+        pixels = rows[sub_rows].reshape(int(sub_rows.sum()), -1, channels)
+        running_sum = numpy.cumsum(pixels, axis=1, dtype=numpy.uint8)
+        rows[sub_rows] = running_sum.reshape(pixels.shape[0], -1)
+
+    up_rows = filter_types == PNG_FILTER_UP
+    if up_rows.any():
+        running_sum = numpy.cumsum(rows, axis=0, dtype=numpy.uint8)
+        row_indexes = numpy.arange(height)
+        run_starts = numpy.maximum.accumulate(numpy.where(up_rows, -1, row_indexes))
+        before_run = numpy.zeros_like(rows)
+        has_previous = run_starts > 0
+        before_run[has_previous] = running_sum[run_starts[has_previous] - 1]
+        before_run[run_starts < 0] = 0
+        rows = running_sum - before_run
+    return rows
+
+
+def _to_rgba(rows: numpy.ndarray, channels: int) -> numpy.ndarray:
+    pixels = rows.reshape(rows.shape[0], -1, channels)
+    if channels < 3:
+        color = numpy.repeat(pixels[:, :, :1], 3, axis=2)
+    else:
+        color = pixels[:, :, :3]
+    if channels in {2, 4}:
+        alpha = pixels[:, :, -1:]
+    else:
+        alpha = numpy.full(pixels.shape[:2] + (1,), OPAQUE, dtype=numpy.uint8)
+    return numpy.concatenate((color, alpha), axis=2)
+
+
+def decode_png(data: bytes) -> Optional[DecodedImage]:  # noqa: WPS210
+    """Decode an 8-bit, non-interlaced PNG into RGBA pixels.
+
+    Inflating and unfiltering are done by zlib and numpy, which release the GIL, so the main
+    thread keeps running while a worker decodes. Average and Paeth filters can not be undone
+    with whole-array operations, so PNGs using them are left to Blender.
+
+    Parameters:
+        data: content of the file
+
+    Returns:
+        Optional[DecodedImage]: pixels, None if the file is not a PNG this decoder handles
+
+    Raises:
+        ValueError: the PNG is broken
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return None
+    header = None
+    compressed = []
+    position = len(PNG_SIGNATURE)
+    while position < len(data):
+        length, chunk_type = struct.unpack('>I4s', data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        position += length + 12
+        if chunk_type == b'IHDR':
+            header = struct.unpack('>IIBBBBB', body)
+        elif chunk_type == b'IDAT':
+            compressed.append(body)
+        elif chunk_type == b'IEND':
+            break
+    if header is None:
+        raise ValueError('PNG has no header')
+    width, height, bit_depth, color_type, _, _, interlace = header  # noqa: WPS236
+    if bit_depth != 8 or interlace or color_type not in PNG_CHANNELS:
+        return None
+
+    channels = PNG_CHANNELS[color_type]
+    stride = width * channels
+    raw = numpy.frombuffer(zlib.decompress(b''.join(compressed)), dtype=numpy.uint8)
+    if raw.size < (stride + 1) * height:
+        raise ValueError('PNG data is truncated')
+    scanlines = raw[:(stride + 1) * height].reshape(height, stride + 1)
+    if numpy.any(scanlines[:, 0] > PNG_FILTER_UP):
+        return None
+
+    rgba = _to_rgba(_unfilter(scanlines, channels), channels)[::-1]
+    pixels = rgba.astype(numpy.float32).ravel()
+    pixels /= OPAQUE
+    return DecodedImage(width, height, pixels)
+
+
+def _decode_file(path: str) -> Optional[DecodedImage]:
+    with open(path, 'rb') as image_file:
+        return decode_png(image_file.read())
+
+
+def _decode_with_blender(path: str) -> DecodedImage:
+    """Decode an image the worker can not, such as a JPEG, with Blender.
+
+    The image datablock only lives while its pixels are copied, so it is never saved in the
+    user's file.
+
+    Parameters:
+        path: path of the image
+
+    Returns:
+        DecodedImage: pixels of the image
+
+    Raises:
+        ValueError: the image is empty
+    """
+    image = bpy.data.images.load(path, check_existing=False)
+    try:
+        width, height = image.size
+        if not width or not height:
+            raise ValueError(f'Empty image {path}')
+        pixels = array('f', [0]) * (width * height * 4)
+        image.pixels.foreach_get(pixels)
+    finally:
+        bpy.data.images.remove(image)
+    return DecodedImage(width, height, pixels)
+
+
+class ThumbnailTextures(object, metaclass=Singleton):  # noqa: WPS214
+    """Thumbnails as GPU textures, instead of Image datablocks decoded on the main thread.
+
+    PNGs are read and decoded by a worker pool; the textures are created on the main thread
+    the first time a decoded thumbnail is drawn. PNGs the workers can not decode are loaded
+    by Blender from a timer, never from the draw callback. Other files, such as the JPEGs of
+    the API, stay Image datablocks, as the workers would only hand them back to Blender.
+    """
+
+    def __init__(self) -> None:
+        """Create the ThumbnailTextures instance."""
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._textures: Dict[str, TextureEntry] = {}
+        self._pending: Dict[str, PendingDecode] = {}
+        self._blender_decodes: Dict[str, str] = {}
+
+    @staticmethod
+    def available(path: str) -> bool:
+        """Check if a thumbnail should be loaded as a texture.
+
+        Only PNGs are, when enabled in the preferences and textures can be created from Python
+        in this Blender.
+
+        Parameters:
+            path: path of the thumbnail
+
+        Returns:
+            bool: True if the thumbnail should be loaded as a texture
+        """
+        if not Preferences().get().thumbnail_textures:
+            return False
+        if os.path.splitext(path)[1].lower() != '.png':
+            return False
+        return hasattr(gpu.types, 'Buffer') and not bpy.app.background
+
+    def request(self, name: str, path: str) -> None:
+        """Start decoding a thumbnail, unless it is already loaded or being decoded.
+
+        Parameters:
+            name: name of the preview, from utils.previmg_name
+            path: path of the thumbnail
+        """
+        entry = self._textures.get(name)
+        if entry is not None and entry.path == path:
+            return
+        pending = self._pending.get(name)
+        if pending is not None and pending[0] == path:
+            return
+        if self._blender_decodes.get(name) == path:
+            return
+        self.release(name)
+        if os.path.splitext(path)[1].lower() != '.png':
+            self._decode_with_blender_later(name, path)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=DECODE_WORKERS,
+                thread_name_prefix='thumbnail_decode',
+            )
+        self._pending[name] = (path, self._executor.submit(_decode_file, path))
+
+    def get(self, name: str) -> Optional[gpu.types.GPUTexture]:
+        """Get the texture of a thumbnail, uploading it if it was just decoded.
+
+        Parameters:
+            name: name of the preview
+
+        Returns:
+            Optional[gpu.types.GPUTexture]: texture, None while it is not decoded
+        """
+        pending = self._pending.get(name)
+        if pending is not None and pending[1].done():
+            self._pending.pop(name)
+            self._finish_decode(name, *pending)
+        entry = self._textures.get(name)
+        return entry.texture if entry is not None else None
+
+    def is_loading(self, name: str) -> bool:
+        """Check if a thumbnail is being decoded.
+
+        Parameters:
+            name: name of the preview
+
+        Returns:
+            bool: True while the thumbnail is in the worker pool or waits for Blender
+        """
+        return name in self._pending or name in self._blender_decodes
+
+    def loaded_bytes(self, name: str) -> int:
+        """Get the GPU memory used by the texture of a thumbnail.
+
+        Parameters:
+            name: name of the preview
+
+        Returns:
+            int: bytes used, 0 if it is not loaded
+        """
+        entry = self._textures.get(name)
+        return entry.width * entry.height * 4 if entry is not None else 0
+
+    def release(self, name: str) -> None:
+        """Free the texture of a thumbnail and cancel its decoding.
+
+        Parameters:
+            name: name of the preview
+        """
+        self._textures.pop(name, None)
+        self._blender_decodes.pop(name, None)
+        pending = self._pending.pop(name, None)
+        if pending is not None:
+            pending[1].cancel()
+
+    def shutdown(self) -> None:
+        """Free every texture and stop the worker pool."""
+        for name in list(self._pending):
+            self.release(name)
+        self._textures.clear()
+        self._blender_decodes.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _finish_decode(self, name: str, path: str, future: Future) -> None:
+        try:
+            decoded = future.result()
+        except Exception as error:
+            self._failed(name, path, error)
+            return
+        if decoded is None:
+            self._decode_with_blender_later(name, path)
+            return
+        self._upload(name, path, decoded)
+
+    def _decode_with_blender_later(self, name: str, path: str) -> None:
+        self._blender_decodes[name] = path
+        bpy.app.timers.register(functools.partial(self._decode_with_blender, name, path))
+
+    def _decode_with_blender(self, name: str, path: str) -> None:
+        if self._blender_decodes.get(name) != path:
+            return
+        self._blender_decodes.pop(name)
+        try:
+            decoded = _decode_with_blender(path)
+        except Exception as error:
+            self._failed(name, path, error)
+            return
+        self._upload(name, path, decoded)
+
+    def _upload(self, name: str, path: str, decoded: DecodedImage) -> None:
+        started_at = time.monotonic()
+        try:
+            texture = decoded.to_texture()
+        except Exception as error:
+            self._failed(name, path, error)
+            return
+        self._textures[name] = TextureEntry(path, texture, decoded.width, decoded.height)
+        elapsed = time.monotonic() - started_at
+        logging.debug(f'Uploaded {name} ({decoded.width}x{decoded.height}) in {elapsed:.4f}s')
+
+    def _failed(self, name: str, path: str, error: Exception) -> None:
+        logging.error(f'Could not load {path}: {error}, will load placeholder')
+        ThumbnailCache().discard(path)
+        placeholder_path = paths.get_addon_thumbnail_path('thumbnail_notready.png')
+        if path != placeholder_path:
+            self.request(name, placeholder_path)
@@ -1,5 +1,7 @@
 """Upload assets module."""
 
+import asyncio
+import functools
 import json
 import logging
 import os
@@ -7,7 +9,7 @@ import pathlib
 import tempfile
 import uuid
 from contextlib import suppress
-from typing import List, Union
+from typing import Awaitable, List, Optional, Tuple, Union
 
 import bpy
 from bpy.props import BoolProperty, EnumProperty
@@ -21,15 +23,46 @@ from .async_functions import (
     get_upload_url,
     upload_file,
 )
-from .export_data import get_export_data
+from .checkpoint import (
+    STAGE_ASSET,
+    STAGE_BLEND_FILE,
+    STAGE_CONFIRMED,
+    UploadCheckpoint,
+    get_checkpoint_key,
+    load_checkpoint,
+    remove_checkpoint,
+    save_checkpoint,
+)
+from .export_data import get_export_data, get_export_datablocks
+from .multipart import MEGABYTE, MultipartUpload, should_use_multipart
+from .stage_timer import StageTimer
 from .upload import get_upload_props
+from .uploaded_hashes import (
+    get_replaced_blend_hash,
+    get_uploaded_hashes,
+    record_uploaded_hashes,
+    without_upload_ids,
+)
 from ..async_loop.async_mixin import AsyncModalOperatorMixin
+from ..cache.asset_cache import hash_file
+from ..search.local_index import LocalIndex
+from ..search.search_cache import SearchCache
 from ..ui.main import UI
 from ..unified_props import Unified
 from ... import hana3d_types, paths, utils
 from ...config import HANA3D_DESCRIPTION, HANA3D_NAME
 
 HANA3D_EXPORT_DATA_FILE = f'{HANA3D_NAME}_data.json'
+UPLOAD_ONLY_KEYS = frozenset(('id', 'viewId', 'id_parent'))  # not sent with the asset metadata
+STAGE_FAILURE_REPORTS = {  # stages whose errors stop the upload, the others can be resumed
+    'metadata': 'Failed to create asset',
+    'save_file': 'Failed to save asset file',
+    'content_hash': 'Failed to read asset file',
+    'export': 'Failed to create blend file',
+    'hash': 'Failed to read blend file',
+    'thumbnail_hash': 'Failed to read thumbnail',
+    'finish': 'Failed to finish asset creation',
+}
 
 
 asset_types = (
@@ -70,6 +103,13 @@ class UploadAssetOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa:
 
     main_file: BoolProperty(name='main file', default=False, options={'SKIP_SAVE'})  # type: ignore
 
+    resume: BoolProperty(  # type: ignore
+        name='resume',
+        description='resume an interrupted upload, skipping the stages already done',
+        default=False,
+        options={'SKIP_SAVE'},
+    )
+
     @classmethod
     def poll(cls, context):
         """Upload poll.
@@ -83,9 +123,12 @@ class UploadAssetOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa:
         props = get_upload_props()
         return bpy.context.view_layer.objects.active is not None and not props.uploading
 
-    async def async_execute(self, context):  # noqa: WPS217,WPS210
+    async def async_execute(self, context):  # noqa: WPS217,WPS210,WPS231
         """Upload async execute.
 
+        Each stage done is written to an UploadCheckpoint, so an interrupted upload can be
+        resumed by running the operator with `resume`, skipping the stages already done.
+
         Parameters:
             context: Blender context
 
@@ -96,72 +139,454 @@ class UploadAssetOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa:
         ui.add_report(text='Preparing upload')
 
         props, workspace, correlation_id, basename, ext, tempdir = self._get_basic_data()
+        checkpoint_key = self._get_checkpoint_key()
+        checkpoint = load_checkpoint(checkpoint_key) if self.resume else None
+        if self.resume and checkpoint is None:
+            ui.add_report(text='No interrupted upload to resume')
+            return {'CANCELLED'}
         props.uploading = True
 
-        upload_set = ['METADATA', 'MAINFILE', 'THUMBNAIL']
-        self._update_props(props, upload_set)
-
-        export_data, upload_data = get_export_data(props)
+        if checkpoint is None:
+            await self._discard_checkpoint(checkpoint_key)
+            upload_set = ['METADATA', 'MAINFILE', 'THUMBNAIL']
+            self._update_props(props, upload_set)
+            export_data, upload_data = get_export_data(props)
+            if self.reupload:
+                upload_data['id_parent'] = props.view_id
+            upload_data['viewId'] = str(uuid.uuid4())
+            checkpoint = UploadCheckpoint(
+                key=checkpoint_key,
+                correlation_id=correlation_id,
+                tempdir=tempdir,
+                upload_set=upload_set,
+                reupload=self.reupload,
+                view_id=upload_data['viewId'],
+                export_data=export_data,
+                upload_data=upload_data,
+            )
+        else:
+            ui.add_report(text='Resuming upload')
+            upload_set = checkpoint.upload_set
+            export_data = checkpoint.export_data
+            upload_data = checkpoint.upload_data
+            correlation_id = checkpoint.correlation_id
+            os.makedirs(checkpoint.tempdir, exist_ok=True)
 
         if not os.path.exists(export_data['thumbnail_path']):
             ui.add_report(text='Thumbnail not found')
             props.uploading = False
             return {'CANCELLED'}
 
+        timer = StageTimer()
         try:
-            asset_id = await create_asset(props, ui, props.id, upload_data, correlation_id)
-            props.id = asset_id  # noqa: WPS125
+            uploaded = await self._run_pipeline(timer, checkpoint, props, ext)
+            if uploaded and 'MAINFILE' in upload_set:
+                with timer.stage('finish', after=('confirm', 'thumbnail_upload')):
+                    await finish_asset_creation(props, ui, correlation_id, upload_data['id'])
+        except Exception as error:
+            logging.error(f'Upload failed in stage {timer.failed_stage}: {error}')
+            ui.add_report(text=STAGE_FAILURE_REPORTS.get(timer.failed_stage, 'Upload failed'))
+            if not checkpoint.done(STAGE_ASSET):
+                props.view_id = upload_data.get('id_parent', '')
+            props.uploading = False
+            return {'CANCELLED'}
+        finally:
+            timer.log()
 
-            if upload_set == ['METADATA']:
-                props.uploading = False
-                ui.add_report(text='Upload finished successfully')
-                props.view_workspace = workspace
-                return {'FINISHED'}
+        props.uploading = False
+        if not uploaded:
+            ui.add_report(text='Upload interrupted, it can be resumed')
+            return {'CANCELLED'}
+        remove_checkpoint(checkpoint_key)
 
-            if self.reupload:
-                upload_data['id_parent'] = props.view_id
-            props.view_id = str(uuid.uuid4())
-            upload_data['viewId'] = props.view_id
-            upload_data['id'] = props.id
-            filename = f'{upload_data["viewId"]}.blend'
+        props.view_workspace = workspace
+        SearchCache().clear()
+        LocalIndex().remove(props.id)
+        ui.add_report(text='Upload finished successfully')
+
+        return {'FINISHED'}
+
+    async def _run_pipeline(  # noqa: WPS210
+        self,
+        timer: StageTimer,
+        checkpoint: UploadCheckpoint,
+        props: hana3d_types.UploadProps,
+        ext: str,
+    ) -> bool:
+        """Run each stage of the upload as soon as the stages it depends on are done.
+
+        The asset is created while the blend file is saved, and the thumbnail is uploaded while
+        the blend file is exported. Each stage waits for::
+
+            thumbnail_url     metadata
+            thumbnail_upload  thumbnail_url
+            blend_url         metadata
+            content_hash      save_file
+            export            content_hash, metadata
+            blend_upload      blend_url, export
+            confirm           blend_upload
+
+        Files whose content hash matches the one last uploaded for the asset are not sent again.
+        The blend file is compared by the file the asset is exported from, written without the
+        ids that change with each upload, and is not exported if it did not change.
+
+        Parameters:
+            timer: StageTimer recording the stages
+            checkpoint: state of the upload
+            props: Hana3D upload props
+            ext: extension of the open blend file
+
+        Returns:
+            bool: True if the files were uploaded, False if an upload failed and can be resumed
+
+        Raises:
+            Exception: the asset could not be created or the blend file could not be exported
+        """
+        filename = f'{checkpoint.upload_data["viewId"]}.blend'
+        files = {
+            file_info['type']: file_info
+            for file_info in self._get_files_info(
+                checkpoint.upload_set,
+                checkpoint.export_data,
+                checkpoint.tempdir,
+                filename,
+            )
+        }
+
+        asset = asyncio.ensure_future(self._asset_stage(timer, checkpoint, props))
+        tasks = [asset]
+        if 'blend' in files:
+            export = None
+            if not await self._blend_file_ready(checkpoint):
+                export = asyncio.ensure_future(
+                    self._export_stage(timer, checkpoint, props, ext, filename, asset),
+                )
+                tasks.append(export)
+            tasks.append(
+                asyncio.ensure_future(
+                    self._blend_stage(timer, checkpoint, props, files['blend'], asset, export),
+                ),
+            )
+        if 'thumbnail' in files:
+            tasks.append(
+                asyncio.ensure_future(
+                    self._thumbnail_stage(timer, checkpoint, files['thumbnail'], asset),
+                ),
+            )
+
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return all(results)
+
+    async def _asset_stage(
+        self,
+        timer: StageTimer,
+        checkpoint: UploadCheckpoint,
+        props: hana3d_types.UploadProps,
+    ) -> bool:
+        if checkpoint.done(STAGE_ASSET):
+            props.id = checkpoint.asset_id  # noqa: WPS125
+            props.view_id = checkpoint.view_id
+            return True
+
+        upload_data = checkpoint.upload_data
+        metadata = {
+            key: upload_value
+            for key, upload_value in upload_data.items()
+            if key not in UPLOAD_ONLY_KEYS
+        }
+        with timer.stage('metadata'):
+            asset_id = await create_asset(
+                props,
+                UI(),
+                props.id,
+                metadata,
+                checkpoint.correlation_id,
+            )
+        props.id = asset_id  # noqa: WPS125
+        if 'MAINFILE' in checkpoint.upload_set:
+            props.view_id = checkpoint.view_id
+        upload_data['id'] = asset_id
+        checkpoint.asset_id = asset_id
+        checkpoint.mark_done(STAGE_ASSET)
+        return True
+
+    async def _export_stage(  # noqa: WPS211
+        self,
+        timer: StageTimer,
+        checkpoint: UploadCheckpoint,
+        props: hana3d_types.UploadProps,
+        ext: str,
+        filename: str,
+        asset: asyncio.Future,
+    ) -> bool:
+        """Export the blend file to upload, saving the asset while its metadata is sent.
+
+        The id of a new asset is only known once the metadata is sent, so it is written to the
+        data file of the background Blender, which sets it on the asset it exports. The asset is
+        saved without ids, so its hash tells if it changed since the view it replaces.
+
+        Parameters:
+            timer: StageTimer recording the stages
+            checkpoint: state of the upload
+            props: Hana3D upload props
+            ext: extension of the open blend file
+            filename: name of the blend file to upload
+            asset: task of the asset stage
 
-            source_filepath = self._save_blend_file(tempdir, ext)
+        Returns:
+            bool: True once the blend file is exported or found unchanged
+        """
+        tempdir = checkpoint.tempdir
+        with timer.stage('save_file'):
+            with without_upload_ids(props):
+                source_filepath = self._save_blend_file(tempdir, ext, checkpoint.export_data)
+        props.view_id = checkpoint.view_id
+        with timer.stage('content_hash', after=('save_file',)):
+            checkpoint.content_hash = await self._hash(source_filepath)
+
+        await asset
+        if self._get_previous_blend_hash(checkpoint) == checkpoint.content_hash:
+            return True
+        with timer.stage('export', after=('content_hash', 'metadata')):
             clean_file_path = paths.get_clean_filepath()
             datafile = self._write_json_file(
                 tempdir,
                 source_filepath,
                 clean_file_path,
-                export_data,
-                upload_data,
-                upload_set,
-                correlation_id,
+                checkpoint.export_data,
+                checkpoint.upload_data,
+                checkpoint.upload_set,
+                checkpoint.correlation_id,
             )
+            await create_blend_file(props, UI(), datafile, clean_file_path, filename)
+        with timer.stage('hash', after=('export',)):
+            checkpoint.blend_path = os.path.join(tempdir, filename)
+            checkpoint.blend_hash = await self._hash(checkpoint.blend_path)
+        checkpoint.mark_done(STAGE_BLEND_FILE)
+        return True
+
+    async def _thumbnail_stage(
+        self,
+        timer: StageTimer,
+        checkpoint: UploadCheckpoint,
+        file_info: dict,
+        asset: asyncio.Future,
+    ) -> bool:
+        file_upload = checkpoint.file_upload(file_info['type'])
+        if file_upload['sent']:
+            await asset
+            return True
+        with timer.stage('thumbnail_hash'):
+            content_hash = await self._hash(file_info['file_path'])
+        await asset
+        if get_uploaded_hashes(checkpoint.asset_id).get('thumbnail') == content_hash:
+            logging.info('Thumbnail did not change since it was uploaded, skipping it')
+            return True
+        url_ready = await self._attempt(
+            self._request_url_stage(
+                timer,
+                checkpoint,
+                file_upload,
+                file_info,
+                ('metadata', 'thumbnail_hash'),
+            ),
+        )
+        sent = url_ready and await self._attempt(
+            self._send_stage(timer, checkpoint, file_upload, file_info, ('thumbnail_url',)),
+        )
+        if sent:
+            record_uploaded_hashes(checkpoint.asset_id, thumbnail=content_hash)
+        return sent
+
+    async def _blend_stage(  # noqa: WPS211,WPS231
+        self,
+        timer: StageTimer,
+        checkpoint: UploadCheckpoint,
+        props: hana3d_types.UploadProps,
+        file_info: dict,
+        asset: asyncio.Future,
+        export: Optional[asyncio.Future],
+    ) -> bool:
+        """Upload the blend file and confirm it, unless it is the same as the last one uploaded.
 
-            await create_blend_file(props, ui, datafile, clean_file_path, filename)
+        The upload url is requested while the file is exported, except when the file may turn
+        out unchanged, which is only known once it is exported and hashed.
 
-            files = self._get_files_info(upload_set, export_data, tempdir, filename)
+        Parameters:
+            timer: StageTimer recording the stages
+            checkpoint: state of the upload
+            props: Hana3D upload props
+            file_info: File information
+            asset: task of the asset stage
+            export: task of the export stage, None if the file of a previous attempt is used
 
-            uploaded = await self._upload_files(
-                context, files, correlation_id, upload_data, export_data, props,
+        Returns:
+            bool: False if the upload failed and can be resumed
+        """
+        await asset
+        file_upload = checkpoint.file_upload(file_info['type'])
+        if not file_upload['sent']:
+            previous_hash = self._get_previous_blend_hash(checkpoint)
+            request_url = functools.partial(
+                self._request_url_stage,
+                timer,
+                checkpoint,
+                file_upload,
+                file_info,
             )
-            if not uploaded:
-                props.uploading = False
-                return {'CANCELLED'}
+            if previous_hash is None and not await self._attempt(request_url()):
+                return False
+            if export is not None:
+                await export
+            if previous_hash == checkpoint.content_hash:
+                self._keep_previous_view(checkpoint, props, file_upload)
+                return True
+            if previous_hash is not None and not await self._attempt(request_url()):
+                return False
+            sent = await self._attempt(
+                self._send_stage(timer, checkpoint, file_upload, file_info, ('blend_url', 'hash')),
+            )
+            if not sent:
+                return False
+        if checkpoint.done(STAGE_CONFIRMED):
+            return True
+        return await self._attempt(self._confirm_stage(timer, checkpoint, props, file_upload))
 
-            if 'MAINFILE' in upload_set:
-                await finish_asset_creation(props, ui, correlation_id, upload_data['id'])
+    def _get_previous_blend_hash(self, checkpoint: UploadCheckpoint) -> Optional[str]:
+        return get_replaced_blend_hash(
+            checkpoint.asset_id,
+            checkpoint.upload_data.get('id_parent'),
+        )
 
-            props.view_workspace = workspace
-            props.uploading = False
-            ui.add_report(text='Upload finished successfully')
+    def _keep_previous_view(
+        self,
+        checkpoint: UploadCheckpoint,
+        props: hana3d_types.UploadProps,
+        file_upload: dict,
+    ):
+        view_id = checkpoint.upload_data['id_parent']
+        logging.info(f'Blend file did not change since view {view_id} was uploaded, skipping it')
+        UI().add_report(text='Asset file did not change, skipping its upload')
+        props.view_id = view_id
+        checkpoint.view_id = view_id
+        file_upload['sent'] = True
+        checkpoint.mark_done(STAGE_CONFIRMED)
+
+    async def _request_url_stage(  # noqa: WPS211
+        self,
+        timer: StageTimer,
+        checkpoint: UploadCheckpoint,
+        file_upload: dict,
+        file_info: dict,
+        after: Tuple[str, ...] = ('metadata',),
+    ) -> None:
+        with timer.stage(f'{file_info["type"]}_url', after=after):
+            await self._prepare_file_upload(UI(), checkpoint, file_upload, file_info)
+
+    async def _send_stage(  # noqa: WPS211
+        self,
+        timer: StageTimer,
+        checkpoint: UploadCheckpoint,
+        file_upload: dict,
+        file_info: dict,
+        after: Tuple[str, ...],
+    ) -> None:
+        with timer.stage(f'{file_info["type"]}_upload', after=after):
+            uploaded = await self._send_file(UI(), checkpoint, file_upload, file_info)
+        if not uploaded:
+            raise Exception('Failed to send file')
+        file_upload['sent'] = True
+        save_checkpoint(checkpoint)
+
+    async def _confirm_stage(
+        self,
+        timer: StageTimer,
+        checkpoint: UploadCheckpoint,
+        props: hana3d_types.UploadProps,
+        file_upload: dict,
+    ) -> None:
+        with timer.stage('confirm', after=('blend_upload',)):
+            await confirm_upload(
+                checkpoint.correlation_id,
+                file_upload['id'],
+                props.skip_post_process,
+                props.draco_compression,
+            )
+        checkpoint.mark_done(STAGE_CONFIRMED)
+        record_uploaded_hashes(
+            checkpoint.asset_id,
+            blend=checkpoint.content_hash,
+            view_id=checkpoint.view_id,
+        )
+
+    async def _attempt(self, stage: Awaitable) -> bool:
+        """Run a stage that transfers files, which can be retried by resuming the upload.
+
+        Parameters:
+            stage: coroutine of the stage
+
+        Returns:
+            bool: False if the stage failed
+        """
+        try:
+            await stage
+        except Exception as err:
+            logging.error(err)
+            UI().add_report(text=str(err))
+            return False
+        return True
+
+    def _get_checkpoint_key(self) -> str:
+        active_asset = utils.get_active_asset()
+        return get_checkpoint_key(self.asset_type, active_asset.name, bpy.data.filepath)
 
-            return {'FINISHED'}
+    async def _discard_checkpoint(self, checkpoint_key: str):
+        """Cancel the uploads of an interrupted upload that a new one replaces.
 
+        Parameters:
+            checkpoint_key: key of the checkpoint
+        """
+        checkpoint = load_checkpoint(checkpoint_key)
+        if checkpoint is None:
+            return
+        for file_upload in checkpoint.uploads.values():
+            if file_upload['id'] and not file_upload['sent']:
+                await self._cancel_quietly(checkpoint.correlation_id, file_upload['id'])
+        remove_checkpoint(checkpoint_key)
+
+    async def _cancel_quietly(self, correlation_id: str, upload_id: str):
+        try:
+            await cancel_upload(correlation_id, upload_id)
         except Exception as error:
-            logging.error(error)
-            ui.add_report(text='Failed to create blend file')
-            props.uploading = False
-            return {'CANCELLED'}
+            logging.warning(f'Could not cancel upload {upload_id}: {error}')
+
+    async def _blend_file_ready(self, checkpoint: UploadCheckpoint) -> bool:
+        """Check if the blend file of a previous attempt can be uploaded as is.
+
+        Parameters:
+            checkpoint: state of the upload
+
+        Returns:
+            bool: True if the blend file exists and did not change since it was created
+        """
+        if not checkpoint.done(STAGE_BLEND_FILE) or not os.path.isfile(checkpoint.blend_path):
+            return False
+        if await self._hash(checkpoint.blend_path) == checkpoint.blend_hash:
+            logging.info(f'Reusing blend file {checkpoint.blend_path}')
+            return True
+        logging.info(f'Blend file {checkpoint.blend_path} changed, creating it again')
+        checkpoint.stages.remove(STAGE_BLEND_FILE)
+        checkpoint.uploads.pop('blend', None)
+        save_checkpoint(checkpoint)
+        return False
+
+    async def _hash(self, file_path: str) -> str:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, hash_file, file_path)
 
     def _get_basic_data(self):  # noqa: WPS210
         unified_props = Unified(bpy.context).props
@@ -187,8 +612,42 @@ class UploadAssetOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa:
             props.view_id = ''
             props.id = ''   # noqa: WPS125
 
-    def _save_blend_file(self, tempdir: Union[str, pathlib.Path], ext: str) -> str:
+    def _save_blend_file(
+        self,
+        tempdir: Union[str, pathlib.Path],
+        ext: str,
+        export_data: dict,
+    ) -> str:
+        """Write the file the background Blender appends the asset from.
+
+        Only the datablocks of the asset and their dependencies are written, falling back to a
+        copy of the whole open file if that fails.
+
+        Parameters:
+            tempdir: directory of the upload files
+            ext: extension of the open blend file
+            export_data: export data from get_export_data
+
+        Returns:
+            str: path of the file written
+        """
         source_filepath = os.path.join(tempdir, f'export_hana3d{ext}')
+        try:
+            bpy.data.libraries.write(
+                source_filepath,
+                get_export_datablocks(export_data),
+                path_remap='ABSOLUTE',
+                compress=False,
+            )
+        except Exception as error:
+            logging.warning(f'Could not write the asset datablocks, saving the whole file: {error}')
+            self._save_main_file(source_filepath)
+            return source_filepath
+
+        self._report_bytes_avoided(source_filepath)
+        return source_filepath
+
+    def _save_main_file(self, source_filepath: str):
         autopack = bpy.data.use_autopack is True
         if autopack:
             bpy.ops.file.autopack_toggle()
@@ -197,7 +656,21 @@ class UploadAssetOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa:
             with suppress(RuntimeError):
                 bpy.ops.file.autopack_toggle()
 
-        return source_filepath
+    def _report_bytes_avoided(self, source_filepath: str):
+        """Report how much smaller the export is than the open file saved on disk.
+
+        Parameters:
+            source_filepath: path of the file with the asset datablocks
+        """
+        if not os.path.isfile(bpy.data.filepath):
+            return
+        written = os.path.getsize(source_filepath)
+        avoided = os.path.getsize(bpy.data.filepath) - written
+        logging.info(f'Wrote {written} bytes of asset datablocks, {avoided} less than the file')
+        if avoided > 0:
+            UI().add_report(
+                text=f'Exported only the asset, {avoided / MEGABYTE:.1f}MB less to write and read',
+            )
 
     def _write_json_file(   # noqa: WPS211
         self,
@@ -253,40 +726,57 @@ class UploadAssetOperator(AsyncModalOperatorMixin, bpy.types.Operator):  # noqa:
             )
         return files
 
-    async def _upload_files(  # noqa: WPS211
+    async def _prepare_file_upload(
         self,
-        context,
-        files: list,
-        correlation_id: str,
-        upload_data: dict,
-        export_data: dict,
-        props: hana3d_types.UploadProps,
+        ui: UI,
+        checkpoint: UploadCheckpoint,
+        file_upload: dict,
+        file_info: dict,
     ):
-        ui = UI()
-        upload = {}
-        try:
-            for file_info in files:
-                upload = await get_upload_url(ui, correlation_id, upload_data, file_info)
-                uploaded = await upload_file(ui, file_info, upload['s3UploadUrl'])
-                if not uploaded:
-                    raise Exception('Failed to send file')
-                if file_info['type'] == 'blend':
-                    skip_post_process = props.skip_post_process
-                    compression = props.draco_compression
-                    await confirm_upload(
-                        correlation_id,
-                        upload['id'],
-                        skip_post_process,
-                        compression,
-                    )
-            return True
-        except Exception as err:
-            logging.error(err)
-            ui.add_report(text=str(err))
-            upload_id = upload.get('id')
-            if upload_id is not None:
-                await cancel_upload(correlation_id, upload_id)
-            return False
+        """Get an upload url, unless a multipart upload of a previous attempt can go on.
+
+        Parameters:
+            ui: UI object
+            checkpoint: state of the upload
+            file_upload: upload state of the file
+            file_info: File information
+        """
+        if file_upload['id'] and file_upload['parts']:
+            return
+        if file_upload['id']:
+            await self._cancel_quietly(checkpoint.correlation_id, file_upload['id'])
+        upload = await get_upload_url(
+            ui,
+            checkpoint.correlation_id,
+            checkpoint.upload_data,
+            file_info,
+        )
+        file_upload.update(id=upload['id'], url=upload['s3UploadUrl'], parts=[])
+        file_upload.pop('part_size', None)
+        file_upload.pop('multipart_id', None)
+        save_checkpoint(checkpoint)
+
+    async def _send_file(
+        self,
+        ui: UI,
+        checkpoint: UploadCheckpoint,
+        file_upload: dict,
+        file_info: dict,
+    ):
+        if should_use_multipart(file_info['file_path']):
+            multipart_upload = MultipartUpload(
+                ui,
+                checkpoint.correlation_id,
+                file_upload['id'],
+                file_info,
+                upload_state=file_upload,
+                on_part_done=functools.partial(save_checkpoint, checkpoint),
+            )
+            uploaded = await multipart_upload.run()
+            if uploaded is not None:
+                return uploaded
+            logging.info('Sending the file in a single request')
+        return await upload_file(ui, file_info, file_upload['url'])
 
 
 classes = (
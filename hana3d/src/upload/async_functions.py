@@ -1,9 +1,9 @@
 """Auxiliary upload async functions."""
+import asyncio
 import json
 import logging
 import os
 import subprocess  # noqa: S404
-import time
 from typing import Set, Union
 
 import bpy
@@ -15,6 +15,8 @@ from ... import hana3d_types, paths
 from ...config import HANA3D_NAME
 
 CHUNK_SIZE = 1024 * 1024 * 2
+MAX_UPLOAD_ATTEMPTS = 5
+RETRY_DELAY = 1  # seconds before the first retry, doubled on each attempt
 
 
 async def create_asset(
@@ -161,25 +163,23 @@ async def upload_file(ui: UI, file_info: dict, upload_url: str) -> bool:
     """
     ui.add_report(text='Uploading file')
     request = Request()
-    uploaded = False
-    for index in range(0, 5):
-        if not uploaded:
-            try:
-                upload_response = await request.put(
-                    upload_url,
-                    data=UploadInChunks(file_info['file_path'], CHUNK_SIZE, file_info['type']),
-                    stream=True,
-                )
-
-                if upload_response.status_code == 200:  # noqa: WPS432
-                    uploaded = True
-                else:
-                    logging.error(upload_response.text)
-            except Exception as error:
-                logging.error(f'{index}: {error}')
-                time.sleep(1)
-
-    return uploaded
+    for index in range(MAX_UPLOAD_ATTEMPTS):
+        try:
+            upload_response = await request.put(
+                upload_url,
+                data=UploadInChunks(file_info['file_path'], CHUNK_SIZE, file_info['type']),
+                stream=True,
+            )
+
+            if upload_response.status_code == 200:  # noqa: WPS432
+                return True
+            logging.error(upload_response.text)
+        except Exception as error:
+            logging.error(f'{index}: {error}')
+        if index + 1 < MAX_UPLOAD_ATTEMPTS:
+            await asyncio.sleep(RETRY_DELAY * 2 ** index)
+
+    return False
 
 
 async def cancel_upload(   # noqa: WPS210
@@ -0,0 +1,192 @@
+"""Bookkeeping for interrupted uploads that can be resumed."""
+import functools
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..preferences.preferences import Preferences
+from ... import paths
+
+CHECKPOINTS_DIR = 'upload_checkpoints'
+
+# stages of an upload, in the order they are done
+STAGE_ASSET = 'asset'
+STAGE_BLEND_FILE = 'blend_file'
+STAGE_CONFIRMED = 'confirmed'
+
+_known_keys: Optional[Tuple[str, Set[str]]] = None  # global directory and its checkpoint keys
+
+
+@dataclass
+class UploadCheckpoint(object):  # noqa: WPS230
+    """State of an upload, written after each stage so a failed upload can be resumed.
+
+    `uploads` keeps, by file type, the upload id of the backend, whether the file was sent and,
+    for multipart uploads, the multipart upload id, the part size and the
+    `{'partNumber', 'etag'}` of each part sent.
+    """
+
+    key: str
+    correlation_id: str
+    tempdir: str
+    upload_set: List[str]
+    reupload: bool
+    asset_id: str = ''
+    view_id: str = ''
+    export_data: Dict = field(default_factory=dict)
+    upload_data: Dict = field(default_factory=dict)
+    blend_path: str = ''
+    blend_hash: str = ''
+    content_hash: str = ''
+    stages: List[str] = field(default_factory=list)
+    uploads: Dict[str, Dict] = field(default_factory=dict)
+
+    def done(self, stage: str) -> bool:
+        """Check if a stage of the upload is done.
+
+        Parameters:
+            stage: name of the stage
+
+        Returns:
+            bool: True if the stage was done by a previous attempt
+        """
+        return stage in self.stages
+
+    def mark_done(self, stage: str) -> None:
+        """Record that a stage is done and write the checkpoint.
+
+        Parameters:
+            stage: name of the stage
+        """
+        if stage not in self.stages:
+            self.stages.append(stage)
+        save_checkpoint(self)
+
+    def file_upload(self, file_type: str) -> Dict:
+        """Get the upload state of a file, creating it if needed.
+
+        Parameters:
+            file_type: type of the file, from the upload file info
+
+        Returns:
+            Dict: upload state of the file, modified in place by the upload
+        """
+        return self.uploads.setdefault(file_type, {'id': '', 'sent': False, 'parts': []})
+
+
+@functools.lru_cache(maxsize=64)
+def get_checkpoint_key(asset_type: str, asset_name: str, blend_path: str) -> str:
+    """Get the key of the checkpoint of an asset.
+
+    Parameters:
+        asset_type: type of the asset uploaded
+        asset_name: name of the datablock uploaded
+        blend_path: path of the file the asset is uploaded from
+
+    Returns:
+        str: key of the checkpoint
+    """
+    identity = json.dumps([asset_type, asset_name, blend_path])
+    return hashlib.sha1(identity.encode()).hexdigest()  # noqa: S303
+
+
+def get_checkpoint_path(key: str) -> str:
+    """Get the path of a checkpoint.
+
+    Parameters:
+        key: key of the checkpoint
+
+    Returns:
+        str: path of the checkpoint file
+    """
+    return os.path.join(paths.get_temp_dir(CHECKPOINTS_DIR), f'{key}.json')
+
+
+def has_checkpoint(key: str) -> bool:
+    """Check if an upload can be resumed.
+
+    Parameters:
+        key: key of the checkpoint
+
+    Returns:
+        bool: True if there is a checkpoint for the key
+    """
+    return key in _checkpoint_keys()
+
+
+def _checkpoint_keys() -> Set[str]:
+    """Get the keys of the checkpoints on disk, listed once as the upload panel asks each redraw.
+
+    Returns:
+        Set[str]: keys of the checkpoints
+    """
+    global _known_keys  # noqa: WPS420
+    global_dir = Preferences().get().global_dir
+    if _known_keys is None or _known_keys[0] != global_dir:
+        checkpoints_dir = paths.get_temp_dir(CHECKPOINTS_DIR)
+        keys = set()
+        if checkpoints_dir is not None:
+            keys = {
+                os.path.splitext(file_name)[0]
+                for file_name in os.listdir(checkpoints_dir)
+                if file_name.endswith('.json')
+            }
+        _known_keys = (global_dir, keys)
+    return _known_keys[1]
+
+
+def load_checkpoint(key: str) -> Optional[UploadCheckpoint]:
+    """Load the checkpoint of an interrupted upload.
+
+    Parameters:
+        key: key of the checkpoint
+
+    Returns:
+        UploadCheckpoint | None: checkpoint, if there is a valid one
+    """
+    checkpoint_path = get_checkpoint_path(key)
+    if not os.path.isfile(checkpoint_path):
+        return None
+    try:
+        with open(checkpoint_path, 'r') as checkpoint_file:
+            return UploadCheckpoint(**json.load(checkpoint_file))
+    except (OSError, TypeError, ValueError) as error:
+        logging.warning(f'Ignoring corrupted upload checkpoint {checkpoint_path}: {error}')
+        remove_checkpoint(key)
+        return None
+
+
+def save_checkpoint(checkpoint: UploadCheckpoint) -> None:
+    """Write a checkpoint.
+
+    Parameters:
+        checkpoint: state of the upload
+    """
+    checkpoint_path = get_checkpoint_path(checkpoint.key)
+    tmp_checkpoint_path = f'{checkpoint_path}_tmp'
+    try:
+        with open(tmp_checkpoint_path, 'w') as checkpoint_file:
+            json.dump(asdict(checkpoint), checkpoint_file)
+        os.replace(tmp_checkpoint_path, checkpoint_path)
+    except OSError as error:
+        logging.warning(f'Could not write upload checkpoint {checkpoint_path}: {error}')
+        return
+    _checkpoint_keys().add(checkpoint.key)
+
+
+def remove_checkpoint(key: str) -> None:
+    """Remove the checkpoint of an upload.
+
+    Parameters:
+        key: key of the checkpoint
+    """
+    _checkpoint_keys().discard(key)
+    checkpoint_path = get_checkpoint_path(key)
+    if os.path.isfile(checkpoint_path):
+        try:
+            os.remove(checkpoint_path)
+        except OSError as error:
+            logging.warning(f'Could not remove {checkpoint_path}: {error}')
@@ -1,5 +1,5 @@
 """Auxiliary data manipulation functions."""
-from typing import Tuple
+from typing import Set, Tuple
 
 import bpy
 
@@ -59,6 +59,29 @@ def get_export_data(props: hana3d_types.UploadProps) -> Tuple[dict, dict]:
     return export_data, upload_data
 
 
+def get_export_datablocks(export_data: dict) -> Set[bpy.types.ID]:
+    """Get the datablocks of the asset, to be written without the rest of the open file.
+
+    Their dependencies, such as meshes, materials and images, are written along with them.
+
+    Arguments:
+        export_data: export data from get_export_data
+
+    Returns:
+        Set[bpy.types.ID]: datablocks of the asset
+
+    Raises:
+        KeyError: a datablock of the asset is not in the open file anymore
+    """
+    if export_data['type'] == 'MODEL':
+        return {bpy.data.objects[name] for name in export_data['models']}
+    if export_data['type'] == 'SCENE':
+        return {bpy.data.scenes[export_data['scene']]}
+    if export_data['type'] == 'MATERIAL':
+        return {bpy.data.materials[export_data['material']]}
+    return set()
+
+
 def _get_model_data(export_data: dict, props: hana3d_types.UploadProps) -> Tuple[dict, dict]:
     mainmodel = utils.get_active_model(bpy.context)
 
@@ -0,0 +1,248 @@
+"""Upload of large files in parts sent in parallel to presigned URLs."""
+import asyncio
+import logging
+import math
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from ..preferences.preferences import Preferences
+from ..requests_async.requests_async import Request
+from ..ui.main import UI
+from ... import paths
+
+MAX_PART_ATTEMPTS = 5
+RETRY_DELAY = 1  # seconds before the first retry of a part, doubled on each attempt
+PROGRESS_REPORT_INTERVAL = 1  # seconds between progress reports
+MEGABYTE = 1000 * 1000
+MEBIBYTE = 1024 * 1024  # unit of part sizes
+MIN_PART_SIZE = 5 * MEBIBYTE  # every part but the last one must be at least this large
+
+
+def should_use_multipart(file_path: str) -> bool:
+    """Check if a file is large enough to be uploaded in parts.
+
+    Parameters:
+        file_path: path of the file
+
+    Returns:
+        bool: True if the file should be uploaded in parts
+    """
+    threshold = Preferences().get().multipart_upload_threshold * MEGABYTE
+    return threshold > 0 and os.path.getsize(file_path) >= threshold
+
+
+class MultipartUpload(object):  # noqa: WPS214
+    """Upload a file in parts, a few at a time, each one retried on its own."""
+
+    def __init__(  # noqa: WPS211
+        self,
+        ui: UI,
+        correlation_id: str,
+        upload_id: str,
+        file_info: dict,
+        upload_state: Optional[Dict] = None,
+        on_part_done: Optional[Callable[[], None]] = None,
+    ):
+        """Create a MultipartUpload object.
+
+        Parameters:
+            ui: UI object
+            correlation_id: Correlation ID
+            upload_id: ID of the upload process
+            file_info: File information
+            upload_state: upload state from an UploadCheckpoint; the parts it lists are not sent
+                again if the backend still has their multipart upload, and the parts sent are
+                added to it
+            on_part_done: called whenever upload_state changes, to save it
+        """
+        self.ui = ui
+        self.correlation_id = correlation_id
+        self.upload_id = upload_id
+        self.file_path = file_info['file_path']
+        self.file_type = file_info['type']
+        self.resumable = upload_state is not None
+        self.upload_state = upload_state if upload_state is not None else {'parts': []}
+        self.on_part_done = on_part_done
+
+        preferences = Preferences().get()
+        self.file_size = os.path.getsize(self.file_path)
+        if self.upload_state.get('part_size', MIN_PART_SIZE) < MIN_PART_SIZE:
+            self._restart()
+            self.upload_state.pop('part_size')
+        self.part_size = self.upload_state.setdefault(
+            'part_size',
+            preferences.upload_part_size * MEBIBYTE,
+        )
+        self.part_count = max(math.ceil(self.file_size / self.part_size), 1)
+        self.concurrency = preferences.max_concurrent_part_uploads
+
+        self._uploaded_parts = len(self.upload_state['parts'])
+        self._uploaded_bytes = min(self._uploaded_parts * self.part_size, self.file_size)
+        self._started_at = 0.0
+        self._last_report = 0.0
+
+    async def run(self) -> Optional[bool]:
+        """Upload the file.
+
+        Returns:
+            Optional[bool]: True if the upload finished, False if it failed, None if the server
+            does not offer multipart uploads and the file should be sent in one request
+        """
+        part_urls = await self._start()
+        if part_urls is None:
+            return None
+
+        logging.info(
+            f'Uploading {self.file_path} in {self.part_count} parts, '
+            f'{self.concurrency} at a time',
+        )
+        if self._uploaded_parts:
+            logging.info(f'Resuming multipart upload, {self._uploaded_parts} parts already sent')
+        self.ui.add_report(text=f'Uploading {self.file_type} file in {self.part_count} parts')
+        self._started_at = time.monotonic()
+        sent_parts = {part['partNumber'] for part in self.upload_state['parts']}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.ensure_future(self._upload_part(semaphore, part_number, url))
+            for part_number, url in enumerate(part_urls, start=1)
+            if part_number not in sent_parts
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except Exception as error:
+            logging.error(f'Part upload failed: {error}')
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if not self.resumable:
+                await self._abort()
+            return False
+        parts = sorted(self.upload_state['parts'], key=lambda part: part['partNumber'])
+        return await self._complete(parts)
+
+    async def _start(self) -> Optional[List[str]]:
+        """Get the urls of the parts, continuing the multipart upload of a previous attempt.
+
+        The parts sent by a previous attempt are only kept if the backend answers with the same
+        multipart upload; otherwise they belong to an upload that is gone and are sent again.
+
+        Returns:
+            Optional[List[str]]: url of each part, None if multipart uploads are not available
+        """
+        multipart_id = self.upload_state.get('multipart_id', '')
+        if self.upload_state['parts'] and not multipart_id:
+            self._restart()
+        request = Request()
+        headers = request.get_headers(self.correlation_id)
+        url = paths.get_api_url('uploads', self.upload_id, 'multipart')
+        upload_info = {'partSize': self.part_size, 'partCount': self.part_count}
+        if self.upload_state['parts']:
+            upload_info['multipartUploadId'] = multipart_id
+        response = await request.post(url, json=upload_info, headers=headers)
+        if not response.ok:
+            logging.info(f'Multipart upload not available ({response.status_code})')
+            return None
+        response_json = response.json()
+        part_urls = [part['url'] for part in response_json['parts']]
+        if len(part_urls) != self.part_count:
+            logging.error(f'Expected {self.part_count} part urls, got {len(part_urls)}')
+            await self._abort()
+            return None
+
+        new_multipart_id = response_json.get('multipartUploadId', '')
+        if self.upload_state['parts'] and new_multipart_id != multipart_id:
+            logging.info('Multipart upload of the previous attempt is gone, sending every part')
+            self._restart()
+        self.upload_state['multipart_id'] = new_multipart_id
+        if self.on_part_done is not None:
+            self.on_part_done()
+        return part_urls
+
+    def _restart(self) -> None:
+        """Forget the parts of a previous attempt, so they are all sent again."""
+        self.upload_state['parts'] = []
+        self.upload_state.pop('multipart_id', None)
+        self._uploaded_parts = 0
+        self._uploaded_bytes = 0
+
+    async def _upload_part(self, semaphore: asyncio.Semaphore, part_number: int, url: str) -> Dict:
+        async with semaphore:
+            loop = asyncio.get_event_loop()
+            part_data = await loop.run_in_executor(None, self._read_part, part_number)
+            request = Request()
+            for attempt in range(MAX_PART_ATTEMPTS):
+                started_at = time.monotonic()
+                try:
+                    response = await request.put(url, data=part_data)
+                except Exception as error:
+                    logging.warning(f'Part {part_number} attempt {attempt + 1} failed: {error}')
+                else:
+                    if response.ok:
+                        part = {'partNumber': part_number, 'etag': response.headers.get('ETag')}
+                        self._part_done(part, len(part_data), started_at)
+                        return part
+                    logging.warning(
+                        f'Part {part_number} attempt {attempt + 1} answered '
+                        f'{response.status_code}: {response.text}',
+                    )
+                if attempt + 1 < MAX_PART_ATTEMPTS:
+                    await asyncio.sleep(RETRY_DELAY * 2 ** attempt)
+        raise Exception(f'Could not upload part {part_number} after {MAX_PART_ATTEMPTS} attempts')
+
+    def _read_part(self, part_number: int) -> bytes:
+        with open(self.file_path, 'rb') as upload_file:
+            upload_file.seek((part_number - 1) * self.part_size)
+            return upload_file.read(self.part_size)
+
+    def _part_done(self, part: Dict, part_bytes: int, started_at: float) -> None:
+        self.upload_state['parts'].append(part)
+        if self.on_part_done is not None:
+            self.on_part_done()
+
+        now = time.monotonic()
+        part_rate = part_bytes / max(now - started_at, 1e-6) / MEGABYTE  # noqa: WPS432
+        self._uploaded_bytes += part_bytes
+        self._uploaded_parts += 1
+        logging.debug(
+            f'Uploaded part {part["partNumber"]} ({part_bytes} bytes) at {part_rate:.1f}MB/s',
+        )
+
+        finished = self._uploaded_parts == self.part_count
+        if not finished and now - self._last_report < PROGRESS_REPORT_INTERVAL:
+            return
+        self._last_report = now
+        percent = int(100 * self._uploaded_bytes / max(self.file_size, 1))
+        elapsed = max(now - self._started_at, 1e-6)  # noqa: WPS432
+        total_rate = self._uploaded_bytes / elapsed / MEGABYTE
+        self.ui.add_report(
+            text=(
+                f'Uploading {self.file_type} file: {percent}% '
+                f'({self._uploaded_parts}/{self.part_count} parts, '
+                f'last part {part_rate:.1f}MB/s, average {total_rate:.1f}MB/s)'
+            ),
+            timeout=2,
+        )
+
+    async def _complete(self, parts: List[Dict]) -> bool:
+        request = Request()
+        headers = request.get_headers(self.correlation_id)
+        url = paths.get_api_url('uploads', self.upload_id, 'multipart', 'complete')
+        complete_info = {'parts': parts}
+        if self.upload_state.get('multipart_id'):
+            complete_info['multipartUploadId'] = self.upload_state['multipart_id']
+        response = await request.post(url, json=complete_info, headers=headers)
+        if not response.ok:
+            return False
+        elapsed = time.monotonic() - self._started_at
+        logging.info(f'Uploaded {self.file_size} bytes in {self.part_count} parts ({elapsed:.1f}s)')
+        return True
+
+    async def _abort(self) -> None:
+        request = Request()
+        headers = request.get_headers(self.correlation_id)
+        url = paths.get_api_url('uploads', self.upload_id, 'multipart')
+        try:
+            await request.delete(url, headers=headers)
+        except Exception as error:
+            logging.warning(f'Could not abort multipart upload: {error}')
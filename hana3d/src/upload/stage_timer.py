@@ -0,0 +1,95 @@
+"""Timing of the stages of an upload, to find its critical path."""
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class StageTiming(object):
+    """When a stage ran, in seconds since the upload started, and the stages it waited for."""
+
+    start: float
+    end: float
+    after: Tuple[str, ...]
+
+    @property
+    def duration(self) -> float:
+        """Time the stage took.
+
+        Returns:
+            float: seconds between the start and the end of the stage
+        """
+        return self.end - self.start
+
+
+class StageTimer(object):
+    """Record the start and end of the stages of an upload, which may run concurrently."""
+
+    def __init__(self) -> None:
+        """Create a StageTimer, starting the clock."""
+        self._started_at = time.monotonic()
+        self._stages: Dict[str, StageTiming] = {}
+        self.failed_stage: Optional[str] = None  # first stage that raised an error
+
+    @contextmanager
+    def stage(self, name: str, after: Sequence[str] = ()) -> Iterator[None]:
+        """Time a stage.
+
+        Parameters:
+            name: name of the stage
+            after: names of the stages it depends on; the ones that did not run are ignored
+
+        Yields:
+            None
+        """
+        start = time.monotonic() - self._started_at
+        try:
+            yield
+        except Exception:
+            if self.failed_stage is None:
+                self.failed_stage = name
+            raise
+        finally:
+            end = time.monotonic() - self._started_at
+            self._stages[name] = StageTiming(start, end, tuple(after))
+
+    def critical_path(self) -> List[str]:
+        """Get the chain of stages that decided how long the upload took.
+
+        Starting from the stage that ended last, each step goes to the dependency that ended last.
+
+        Returns:
+            List[str]: names of the stages, first to last
+        """
+        path: List[str] = []
+        current = self._last(self._stages)
+        while current is not None:
+            path.append(current)
+            dependencies = {
+                name: self._stages[name]
+                for name in self._stages[current].after
+                if name in self._stages
+            }
+            current = self._last(dependencies)
+        return list(reversed(path))
+
+    def log(self) -> None:
+        """Log the duration of each stage and the critical path."""
+        if not self._stages:
+            return
+        by_start = sorted(self._stages.items(), key=lambda stage: stage[1].start)
+        lines = [
+            f'  {name}: {timing.start:.2f}s -> {timing.end:.2f}s ({timing.duration:.2f}s)'
+            for name, timing in by_start
+        ]
+        total = time.monotonic() - self._started_at
+        logging.info('Upload stages:\n{0}'.format('\n'.join(lines)))
+        logging.info(f'Upload critical path ({total:.2f}s): {" -> ".join(self.critical_path())}')
+
+    @staticmethod
+    def _last(stages: Dict[str, StageTiming]) -> Optional[str]:
+        if not stages:
+            return None
+        return max(stages, key=lambda name: stages[name].end)
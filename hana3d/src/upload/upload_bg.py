@@ -89,6 +89,12 @@ if __name__ == '__main__':
                 matname=matname,
             )
 
+        # the id of a new asset is only known after its file was saved for this export
+        asset_props = getattr(main_source, HANA3D_NAME, None)
+        if asset_props is not None:
+            asset_props.id = upload_data['id']  # noqa: WPS125
+            asset_props.view_id = upload_data['viewId']
+
         bpy.ops.file.pack_all()
 
         fpath = os.path.join(data_file['temp_dir'], FILENAME)
@@ -0,0 +1,99 @@
+"""Record of the content uploaded for each asset, to skip sending files that did not change."""
+import json
+import logging
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from ... import hana3d_types, paths
+
+UPLOADED_HASHES_FILENAME = 'uploaded_hashes.json'
+UPLOAD_ID_PROPS = ('id', 'view_id')  # change with each upload, not with the content of the asset
+
+
+def _get_record_path() -> str:
+    return os.path.join(paths.get_temp_dir(), UPLOADED_HASHES_FILENAME)
+
+
+def _load_record() -> Dict[str, Dict[str, str]]:
+    record_path = _get_record_path()
+    if not os.path.isfile(record_path):
+        return {}
+    try:
+        with open(record_path, 'r') as record_file:
+            return json.load(record_file)
+    except (OSError, ValueError) as error:
+        logging.warning(f'Ignoring corrupted record of uploaded files {record_path}: {error}')
+        return {}
+
+
+def get_uploaded_hashes(asset_id: str) -> Dict[str, str]:
+    """Get the content hashes of the files last uploaded for an asset.
+
+    Parameters:
+        asset_id: ID of the asset
+
+    Returns:
+        Dict[str, str]: sha256 digest by file type, and the view_id of the last blend file
+    """
+    if not asset_id:
+        return {}
+    return _load_record().get(asset_id, {})
+
+
+def get_replaced_blend_hash(asset_id: str, id_parent: Optional[str]) -> Optional[str]:
+    """Get the content hash of the blend file of the view a reupload replaces, if it is known.
+
+    Parameters:
+        asset_id: ID of the asset
+        id_parent: view_id of the view replaced, None if the asset is new
+
+    Returns:
+        Optional[str]: sha256 digest, None if the view replaced was not uploaded from here
+    """
+    uploaded_hashes = get_uploaded_hashes(asset_id)
+    if not id_parent or uploaded_hashes.get('view_id') != id_parent:
+        return None
+    return uploaded_hashes.get('blend') or None
+
+
+@contextmanager
+def without_upload_ids(props: hana3d_types.UploadProps) -> Iterator[None]:
+    """Blank the ids of an asset while its file is written, so the file only depends on its content.
+
+    The background Blender sets the ids of the upload on the asset it exports.
+
+    Parameters:
+        props: Hana3D upload props of the asset
+
+    Yields:
+        None: once the ids are blank, restoring them when done
+    """
+    upload_ids = {prop_name: getattr(props, prop_name) for prop_name in UPLOAD_ID_PROPS}
+    for prop_name in UPLOAD_ID_PROPS:
+        setattr(props, prop_name, '')
+    try:
+        yield
+    finally:
+        for prop_name, upload_id in upload_ids.items():
+            setattr(props, prop_name, upload_id)
+
+
+def record_uploaded_hashes(asset_id: str, **hashes: str) -> None:
+    """Record the content hashes of files uploaded for an asset.
+
+    Parameters:
+        asset_id: ID of the asset
+        hashes: sha256 digest by file type, and the view_id of a blend file
+            (the blend digest is of the file written without ids, see `without_upload_ids`)
+    """
+    record = _load_record()
+    record.setdefault(asset_id, {}).update(hashes)
+    record_path = _get_record_path()
+    tmp_record_path = f'{record_path}_tmp'
+    try:
+        with open(tmp_record_path, 'w') as record_file:
+            json.dump(record, record_file)
+        os.replace(tmp_record_path, record_path)
+    except OSError as error:
+        logging.warning(f'Could not write record of uploaded files {record_path}: {error}')
@@ -0,0 +1,154 @@
+"""Compare the memory used by 10k search results stored as dataclasses and as AssetData.
+
+Run inside Blender with the addon installed:
+    HANA3D_ENV=dev blender -b -P scripts/benchmarks/asset_data_memory.py -noaudio
+"""
+import gc
+import importlib
+import json
+import os
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+addon = f"hana3d_{os.getenv('HANA3D_ENV', 'dev')}"
+search = importlib.import_module(f'{addon}.src.search.search')
+utils = importlib.import_module(f'{addon}.utils')
+
+RESULTS = 10000
+PAGE_SIZE = 100
+TAGS = [f'tag_{index}' for index in range(200)]
+LIBRARIES = [
+    {'id': f'library-{index}', 'name': f'Library {index}', 'slug': f'library_{index}'}
+    for index in range(20)
+]
+
+
+@dataclass
+class DataclassAssetData(object):  # noqa: WPS230
+    """Search result as it was stored before AssetData used slots."""
+
+    thumbnail: str
+    thumbnail_small: str
+    download_url: str
+    id: str  # noqa: WPS125
+    view_id: str
+    name: str
+    asset_type: str
+    tooltip: str
+    tags: List[str]
+    verification_status: str
+    author_id: str
+    description: str
+    render_jobs: List[str]
+    workspace: str
+    downloaded: float = 0
+    metadata: Dict = field(default_factory=dict)
+    created: str = ''
+    revision: str = ''
+    libraries: List[Dict] = field(default_factory=list)
+    bbox_min: Tuple[float, float, float] = (-0.5, -0.5, 0.0)
+    bbox_max: Tuple[float, float, float] = (0.5, 0.5, 1.0)
+    file_name: str = ''
+    thumbnail_url: str = ''
+    thumbnail_small_url: str = ''
+
+
+def make_page(page: int) -> str:
+    """Build a search response page as the API would send it.
+
+    Parameters:
+        page: page number
+
+    Returns:
+        str: JSON response
+    """
+    rng = random.Random(page)
+    results = []
+    for index in range(page * PAGE_SIZE, (page + 1) * PAGE_SIZE):
+        results.append({
+            'id': f'asset-{index}',
+            'viewId': f'view-{index}',
+            'name': f'Asset {index}',
+            'description': f'Description of asset {index}',
+            'assetType': 'model',
+            'tags': rng.sample(TAGS, 5),
+            'verificationStatus': 'validated',
+            'author': {'id': rng.randint(1, 50)},
+            'workspace': 'workspace-1',
+            'libraries': rng.sample(LIBRARIES, 2),
+            'metadata': None,
+        })
+    return json.dumps({'results': results})
+
+
+def build_dataclass(response: Dict) -> DataclassAssetData:  # noqa: D103
+    return DataclassAssetData(
+        'thumbnail.jpg',
+        'thumbnail_small.jpg',
+        'https://example.com/file.blend',
+        response['id'],
+        response['viewId'],
+        response['name'],
+        response['assetType'],
+        utils.generate_tooltip(response['name'], response['description']),
+        response['tags'],
+        response['verificationStatus'],
+        str(response['author']['id']),
+        response['description'],
+        [],
+        response['workspace'],
+        libraries=response['libraries'],
+    )
+
+
+def build_compact(response: Dict):  # noqa: D103
+    return search.AssetData(
+        'thumbnail.jpg',
+        'thumbnail_small.jpg',
+        'https://example.com/file.blend',
+        response['id'],
+        response['viewId'],
+        response['name'],
+        response['assetType'],
+        tags=response['tags'],
+        verification_status=response['verificationStatus'],
+        author_id=str(response['author']['id']),
+        description=response['description'],
+        workspace=response['workspace'],
+        metadata=response['metadata'],
+        libraries=response['libraries'],
+    )
+
+
+def measure(name: str, build, pages: List[str]) -> None:
+    """Build all results page by page, dropping each response like the search operator does.
+
+    Parameters:
+        name: name of the representation
+        build: function creating a result from a response dict
+        pages: JSON responses
+    """
+    gc.collect()
+    tracemalloc.start()
+    results = []
+    for page in pages:
+        results.extend(build(response) for response in json.loads(page)['results'])
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started_at = time.perf_counter()
+    gc.collect()
+    gc_time = time.perf_counter() - started_at
+    print(  # noqa: WPS421
+        f'{name:>10}: {current / 1024 / 1024:7.2f} MiB for {len(results)} results, '
+        f'full collection in {gc_time * 1000:.1f} ms',
+    )
+
+
+if __name__ == '__main__':
+    pages = [make_page(page) for page in range(RESULTS // PAGE_SIZE)]
+    measure('dataclass', build_dataclass, pages)
+    measure('slots', build_compact, pages)
@@ -0,0 +1,129 @@
+"""Stand-ins for the Blender modules, so the add-on code that does not draw can run in plain Python.
+
+Import this module before any `hana3d` module. The `hana3d` package and the packages of
+operators are registered without running their `__init__`, which needs a running Blender,
+and the add-on preferences are a plain namespace that tests can change.
+"""
+import os
+import re
+import sys
+import tempfile
+import types
+from unittest.mock import MagicMock
+
+ADDON_NAME = 'hana3d'
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ADDON_DIR = os.path.join(REPOSITORY_DIR, ADDON_NAME)
+
+BLENDER_MODULES = (
+    'addon_utils',
+    'bpy',
+    'bpy.types',
+    'bpy.props',
+    'bpy.utils',
+    'bpy.app',
+    'bpy.app.handlers',
+    'bpy_extras',
+    'bpy_extras.view3d_utils',
+    'bgl',
+    'blf',
+    'gpu',
+    'gpu_extras',
+    'gpu_extras.batch',
+    'idprop',
+    'idprop.types',
+    'mathutils',
+    'sentry_sdk',  # installed from the bundled wheels by the real config module
+)
+
+
+def default_preferences() -> types.SimpleNamespace:
+    """Build add-on preferences with the defaults of the add-on.
+
+    Returns:
+        SimpleNamespace: preferences, with a new temporary global directory
+    """
+    return types.SimpleNamespace(
+        global_dir=tempfile.mkdtemp(prefix='hana3d_test_'),
+        api_key='',
+        cache_size_limit=0,
+        thumbnail_cache_size=0,
+        max_concurrent_downloads=2,
+        multipart_upload_threshold=100,
+        upload_part_size=16,
+        max_concurrent_part_uploads=4,
+        search_cache_ttl=300,
+        http_pool_size=10,
+        http_idle_timeout=60,
+        preview_memory_budget=256,
+        thumbnail_textures=False,
+    )
+
+
+class _BlenderTypes(types.ModuleType):
+    """`bpy.types` whose members are plain classes, so operators and panels keep their methods."""
+
+    def __getattr__(self, name: str) -> type:
+        if name.startswith('__'):
+            raise AttributeError(name)
+        blender_type = type(name, (object,), {})
+        setattr(self, name, blender_type)
+        return blender_type
+
+
+def _install_blender_modules() -> MagicMock:
+    sys.modules.setdefault('bpy.types', _BlenderTypes('bpy.types'))
+    for module_name in BLENDER_MODULES:
+        sys.modules.setdefault(module_name, MagicMock())
+    bpy = sys.modules['bpy']
+    bpy.types = sys.modules['bpy.types']
+    bpy.path.abspath = lambda path: path
+    bpy.data.libraries = []
+    return bpy
+
+
+def _install_packages() -> None:
+    # these packages register operators when imported, their modules are imported on their own
+    package_names = (
+        ADDON_NAME,
+        f'{ADDON_NAME}.src',
+        f'{ADDON_NAME}.src.download',
+        f'{ADDON_NAME}.src.upload',
+    )
+    for package_name in package_names:
+        package = types.ModuleType(package_name)
+        package.__path__ = [os.path.join(REPOSITORY_DIR, *package_name.split('.'))]
+        sys.modules.setdefault(package_name, package)
+
+    # the real config module installs the bundled wheels, only its names are needed here
+    config = types.ModuleType(f'{ADDON_NAME}.config')
+    with open(os.path.join(ADDON_DIR, 'config', '__init__.py')) as config_file:
+        names = re.findall(r'^(HANA3D_\w+) =', config_file.read(), re.MULTILINE)
+    for name in names:
+        setattr(config, name, ADDON_NAME)
+    sys.modules.setdefault(config.__name__, config)
+
+
+def set_preferences(preferences: types.SimpleNamespace) -> None:
+    """Make the add-on read the given preferences.
+
+    Parameters:
+        preferences: add-on preferences
+    """
+    addon = MagicMock()
+    addon.preferences = preferences
+    sys.modules['bpy'].context.preferences.addons = {ADDON_NAME: addon}
+
+
+def reset_singletons() -> None:
+    """Forget the instances of every singleton, so each test starts from a clean state."""
+    from hana3d.src.metaclasses.singleton import Singleton  # noqa: WPS433
+
+    Singleton._instances.clear()  # noqa: WPS437
+
+
+if REPOSITORY_DIR not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIR)
+_install_blender_modules()
+_install_packages()
+set_preferences(default_preferences())
@@ -0,0 +1,47 @@
+"""Asset bar operator tests."""
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import stubs
+
+from hana3d.src.search import search
+from hana3d.src.search.controller import SearchController
+from hana3d.src.ui.operators.asset_bar import AssetBarOperator
+
+
+class TestSearchMore(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new search controller and an asset bar whose results have a next page."""
+        stubs.reset_singletons()
+        self.controller = SearchController()
+        patcher = patch.object(self.controller, '_run_operator')
+        self.run_operator = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.results = {'next': 'https://api.example.com/search?page=2'}
+        patcher = patch.object(search, 'get_original_search_results', lambda _: self.results)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.operator = AssetBarOperator()
+        self.operator._requested_next = ''  # noqa: WPS437
+
+    def test_requests_next_page_once(self):
+        """Test that the next page is requested once, however many events ask for it."""
+        self.operator.search_more('model')
+        self.operator.search_more('model')
+        self.run_operator.assert_called_once_with(True)  # noqa: WPS425
+
+    def test_scroll_during_load(self):
+        """Test that a next page dropped while a search runs is requested when it finishes."""
+        running = Future()
+        self.controller._running = running  # noqa: WPS437
+        self.operator.search_more('model')
+        self.run_operator.assert_not_called()
+
+        running.set_result(None)
+        self.operator.search_more('model')
+        self.run_operator.assert_called_once_with(True)  # noqa: WPS425
+
+
+if __name__ == '__main__':
+    unittest.main()
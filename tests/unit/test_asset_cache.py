@@ -0,0 +1,118 @@
+"""Asset cache tests."""
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+import stubs
+
+from hana3d.src.cache.asset_cache import AssetCache, hash_file
+
+
+def _asset(view_id: str, url: str = '') -> SimpleNamespace:
+    return SimpleNamespace(name=view_id, view_id=view_id, download_url=url)
+
+
+class TestAssetCache(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new global directory and cache."""
+        self.preferences = stubs.default_preferences()
+        stubs.set_preferences(self.preferences)
+        stubs.reset_singletons()
+        sys.modules['bpy'].data.libraries = []
+        self.cache = AssetCache()
+
+    def _download(self, file_name: str, content: bytes) -> str:
+        file_path = os.path.join(self.preferences.global_dir, file_name)
+        with open(file_path, 'wb') as downloaded_file:
+            downloaded_file.write(content)
+        return file_path
+
+    def _store(self, view_id: str, content: bytes) -> str:
+        file_path = self._download(f'{view_id}.blend', content)
+        return self.cache.store(_asset(view_id), file_path, hash_file(file_path))
+
+    def test_store_moves_file(self):
+        """Test that the downloaded file becomes the blob."""
+        file_path = self._download('chair.blend', b'chair')
+        blob_path = self.cache.store(_asset('chair'), file_path, hash_file(file_path))
+        self.assertFalse(os.path.exists(file_path))
+        self.assertTrue(os.path.isfile(blob_path))
+        self.assertEqual(self.cache.lookup(_asset('chair')), blob_path)
+
+    def test_store_duplicate(self):
+        """Test that identical files of different views share one blob."""
+        first_blob = self._store('chair', b'same content')
+        second_file = self._download('table.blend', b'same content')
+        second_blob = self.cache.store(_asset('table'), second_file, hash_file(second_file))
+        self.assertEqual(first_blob, second_blob)
+        self.assertFalse(os.path.exists(second_file))
+        self.assertEqual(self.cache.lookup(_asset('table')), first_blob)
+
+    def test_store_blob_again(self):
+        """Test that storing the blob itself keeps it."""
+        blob_path = self._store('chair', b'chair')
+        self.cache.store(_asset('chair'), blob_path, hash_file(blob_path))
+        self.assertTrue(os.path.isfile(blob_path))
+
+    def test_lookup_by_url(self):
+        """Test that a file is found by its url when the view id changes."""
+        file_path = self._download('chair.blend', b'chair')
+        asset = _asset('chair', 'https://cdn.example.com/chair.blend?signature=1')
+        blob_path = self.cache.store(asset, file_path, hash_file(file_path))
+        other_view = _asset('', 'https://cdn.example.com/chair.blend?signature=2')
+        self.assertEqual(self.cache.lookup(other_view), blob_path)
+
+    def test_lookup_missing_blob(self):
+        """Test that a blob deleted from disk is dropped from the index."""
+        blob_path = self._store('chair', b'chair')
+        os.remove(blob_path)
+        self.assertIsNone(self.cache.lookup(_asset('chair')))
+        self.assertIsNone(self.cache.lookup(_asset('chair')))
+
+    def test_evict_least_recently_used(self):
+        """Test that the least recently used blobs go first."""
+        self.preferences.cache_size_limit = 1
+        old_blob = self._store('old', b'old')
+        new_blob = self._store('new', b'new')
+        self.cache._blobs[hash_file(old_blob)]['size'] = 6 * 10 ** 8  # noqa: WPS437
+        self.cache._blobs[hash_file(new_blob)]['size'] = 6 * 10 ** 8  # noqa: WPS437
+        freed = self.cache.evict()
+        self.assertEqual(freed, 6 * 10 ** 8)
+        self.assertFalse(os.path.exists(old_blob))
+        self.assertTrue(os.path.isfile(new_blob))
+
+    def test_evict_keeps_protected(self):
+        """Test that kept blobs and blobs used by libraries are not evicted."""
+        self.preferences.cache_size_limit = 1
+        linked_blob = self._store('linked', b'linked')
+        kept_blob = self._store('kept', b'kept')
+        for blob_path in (linked_blob, kept_blob):
+            self.cache._blobs[hash_file(blob_path)]['size'] = 6 * 10 ** 8  # noqa: WPS437
+        sys.modules['bpy'].data.libraries = [SimpleNamespace(filepath=linked_blob)]
+        freed = self.cache.evict(keep={hash_file(kept_blob)})
+        self.assertEqual(freed, 0)
+        self.assertTrue(os.path.isfile(linked_blob))
+        self.assertTrue(os.path.isfile(kept_blob))
+
+    def test_evict_keeps_hard_linked(self):
+        """Test that a blob hard linked into a project is not evicted."""
+        self.preferences.cache_size_limit = 1
+        blob_path = self._store('linked', b'linked')
+        self._store('other', b'other')
+        self.cache._blobs[hash_file(blob_path)]['size'] = 2 * 10 ** 9  # noqa: WPS437
+        project_copy = os.path.join(self.preferences.global_dir, 'project.blend')
+        os.link(blob_path, project_copy)
+        sys.modules['bpy'].data.libraries = [SimpleNamespace(filepath=project_copy)]
+        self.cache.evict()
+        self.assertTrue(os.path.isfile(blob_path))
+
+    def test_index_is_saved(self):
+        """Test that a new instance finds the stored files."""
+        blob_path = self._store('chair', b'chair')
+        stubs.reset_singletons()
+        self.assertEqual(AssetCache().lookup(_asset('chair')), blob_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Asset bar texture atlas tests."""
+import unittest
+from unittest.mock import MagicMock, patch
+
+import stubs
+
+from hana3d.src.ui import atlas
+from hana3d.src.ui.atlas import ATLAS_SIZE, TextureAtlas
+
+SLOT_SIZE = ATLAS_SIZE // 2  # 4 slots
+
+
+class TestTextureAtlas(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new atlas whose copies and batches are recorded instead of drawn."""
+        stubs.reset_singletons()
+        self.offscreen = MagicMock()
+        self.copies = []
+        self.atlas = TextureAtlas()
+        self.batch_for_shader = MagicMock()
+        for patcher in (
+            patch.object(atlas.gpu.types, 'GPUOffScreen', return_value=self.offscreen),
+            patch.object(atlas, 'batch_for_shader', self.batch_for_shader),
+            patch.object(self.atlas, '_copy', self._copy),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.textures = [object() for _ in range(6)]
+
+    def _copy(self, slot_index: int, image: object, crop: tuple):
+        if image is None:
+            raise RuntimeError('No texture')
+        self.copies.append((slot_index, self.textures.index(image)))
+
+    def _frame(self, *texture_indexes: int, slot_size: int = SLOT_SIZE) -> list:
+        self.assertTrue(self.atlas.begin(slot_size))
+        added = [
+            self.atlas.add(0, 0, slot_size, slot_size, self.textures[index])
+            for index in texture_indexes
+        ]
+        self.atlas.draw()
+        return added
+
+    def test_copied_once(self):
+        """Test that images are copied into a slot once and drawn with one batch per layout."""
+        self.assertEqual(self._frame(0, 1), [True, True])
+        self._frame(0, 1)
+        self.assertEqual(self.copies, [(0, 0), (1, 1)])
+        self.assertEqual(self.batch_for_shader.call_count, 1)
+        self._frame(1, 0)
+        self.assertEqual(self.batch_for_shader.call_count, 2)
+
+    def test_full(self):
+        """Test that images that do not fit must be drawn by themselves."""
+        self.assertEqual(self._frame(0, 1, 2, 3, 4), [True, True, True, True, False])
+
+    def test_evicts_least_recently_used(self):
+        """Test that a new image takes the slot of the image unused for longest."""
+        self._frame(0, 1, 2, 3)
+        self._frame(3, 2, 0)
+        self._frame(4)
+        self.assertEqual(self.copies[-1], (1, 4))
+        self._frame(1)
+        self.assertEqual(self.copies[-1], (3, 1))
+
+    def test_slot_size_change(self):
+        """Test that a new thumbnail size creates the atlas again."""
+        self._frame(0)
+        self._frame(0, slot_size=SLOT_SIZE // 2)
+        self.offscreen.free.assert_called_once()
+        self.assertEqual(len(self.copies), 2)
+
+    def test_copy_failed(self):
+        """Test that an image that can not be copied leaves its slot free."""
+        self.textures[5] = None
+        self.assertEqual(self._frame(5, 0), [False, True])
+        self.assertEqual(self.copies, [(0, 0)])
+
+    def test_no_offscreen(self):
+        """Test that images are drawn one by one if the atlas can not be created."""
+        with patch.object(atlas.gpu.types, 'GPUOffScreen', side_effect=RuntimeError('No GPU')):
+            with self.assertLogs(level='WARNING'):
+                self.assertFalse(self.atlas.begin(SLOT_SIZE))
+        self.assertFalse(self.atlas.begin(SLOT_SIZE))
+        self.assertFalse(self.atlas.add(0, 0, SLOT_SIZE, SLOT_SIZE, self.textures[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
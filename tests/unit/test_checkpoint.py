@@ -0,0 +1,81 @@
+"""Upload checkpoint tests."""
+import os
+import unittest
+
+import stubs
+
+from hana3d.src.upload import checkpoint
+from hana3d.src.upload.checkpoint import (
+    STAGE_ASSET,
+    STAGE_BLEND_FILE,
+    UploadCheckpoint,
+    get_checkpoint_key,
+    get_checkpoint_path,
+    has_checkpoint,
+    load_checkpoint,
+    remove_checkpoint,
+    save_checkpoint,
+)
+
+
+class TestUploadCheckpoint(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new global directory."""
+        stubs.set_preferences(stubs.default_preferences())
+        self.key = get_checkpoint_key('model', 'Chair', '/projects/chair.blend')
+        self.checkpoint = UploadCheckpoint(
+            key=self.key,
+            correlation_id='correlation',
+            tempdir='/tmp/upload',
+            upload_set=['MAIN_FILE', 'THUMBNAIL'],
+            reupload=False,
+        )
+
+    def test_key(self):
+        """Test that the key depends on the asset and the file it is uploaded from."""
+        self.assertEqual(self.key, get_checkpoint_key('model', 'Chair', '/projects/chair.blend'))
+        self.assertNotEqual(self.key, get_checkpoint_key('model', 'Chair', '/projects/room.blend'))
+        self.assertNotEqual(self.key, get_checkpoint_key('scene', 'Chair', '/projects/chair.blend'))
+
+    def test_round_trip(self):
+        """Test that a saved checkpoint loads with its stages and file uploads."""
+        self.checkpoint.asset_id = 'asset'
+        upload_state = self.checkpoint.file_upload('blend')
+        upload_state['multipart_id'] = 'multipart'
+        upload_state['parts'].append({'partNumber': 1, 'etag': 'etag'})
+        self.checkpoint.mark_done(STAGE_ASSET)
+
+        loaded = load_checkpoint(self.key)
+        self.assertEqual(loaded, self.checkpoint)
+        self.assertTrue(loaded.done(STAGE_ASSET))
+        self.assertFalse(loaded.done(STAGE_BLEND_FILE))
+        self.assertEqual(loaded.file_upload('blend')['multipart_id'], 'multipart')
+
+    def test_has_checkpoint(self):
+        """Test that saving and removing a checkpoint updates the known keys."""
+        self.assertFalse(has_checkpoint(self.key))
+        save_checkpoint(self.checkpoint)
+        self.assertTrue(has_checkpoint(self.key))
+        remove_checkpoint(self.key)
+        self.assertFalse(has_checkpoint(self.key))
+        self.assertIsNone(load_checkpoint(self.key))
+
+    def test_checkpoints_on_disk(self):
+        """Test that checkpoints written by a previous session are found."""
+        save_checkpoint(self.checkpoint)
+        checkpoint._known_keys = None  # noqa: WPS437
+        self.assertTrue(has_checkpoint(self.key))
+
+    def test_corrupted(self):
+        """Test that an unreadable checkpoint is removed."""
+        save_checkpoint(self.checkpoint)
+        with open(get_checkpoint_path(self.key), 'w') as checkpoint_file:
+            checkpoint_file.write('{"key": ')
+        with self.assertLogs(level='WARNING'):
+            self.assertIsNone(load_checkpoint(self.key))
+        self.assertFalse(os.path.exists(get_checkpoint_path(self.key)))
+        self.assertFalse(has_checkpoint(self.key))
+
+
+if __name__ == '__main__':
+    unittest.main()
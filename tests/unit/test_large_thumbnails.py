@@ -0,0 +1,109 @@
+"""Large thumbnail fetching tests."""
+import asyncio
+import os
+import unittest
+from concurrent.futures import Future
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import stubs
+
+from hana3d import paths
+from hana3d.src.cache.thumbnail_cache import ThumbnailCache
+from hana3d.src.search import large_thumbnails
+from hana3d.src.search.large_thumbnails import LargeThumbnailFetcher
+
+
+def _asset(index: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        view_id=f'view{index}',
+        asset_type='model',
+        thumbnail=f'thumbnail{index}.jpg',
+        thumbnail_url=f'https://example.com/thumbnail{index}.jpg',
+    )
+
+
+class TestLargeThumbnailFetcher(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new fetcher whose fetches are recorded instead of run."""
+        self.preferences = stubs.default_preferences()
+        self.preferences.prefetch_thumbnail_neighbours = False
+        stubs.set_preferences(self.preferences)
+        stubs.reset_singletons()
+        self.results = [_asset(index) for index in range(4)]
+        self.fetches = {}
+        patcher = patch.object(large_thumbnails, 'run_async_function', self._run_async_function)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.fetcher = LargeThumbnailFetcher()
+
+    def _run_async_function(self, function, done_callback, path: str, url: str) -> Future:
+        task = Future()
+        task.add_done_callback(done_callback)
+        self.fetches[url] = task
+        return task
+
+    def _pending(self) -> list:
+        return sorted(url[-14:] for url, task in self.fetches.items() if not task.done())
+
+    def test_hovered_asset(self):
+        """Test that the hovered asset is fetched once, and moving on cancels it."""
+        self.fetcher.hover(self.results, 1)
+        self.fetcher.hover(self.results, 1)
+        self.assertEqual(self._pending(), ['thumbnail1.jpg'])
+        self.fetcher.hover(self.results, 2)
+        self.assertEqual(self._pending(), ['thumbnail2.jpg'])
+        self.fetcher.leave()
+        self.assertEqual(self._pending(), [])
+
+    def test_neighbours(self):
+        """Test that neighbours are prefetched, and kept when the pointer moves to one of them."""
+        self.preferences.prefetch_thumbnail_neighbours = True
+        self.fetcher.hover(self.results, 0)
+        self.assertEqual(self._pending(), ['thumbnail0.jpg', 'thumbnail1.jpg'])
+        neighbour = self.fetches['https://example.com/thumbnail1.jpg']
+        self.fetcher.hover(self.results, 1)
+        self.assertEqual(self._pending(), ['thumbnail0.jpg', 'thumbnail1.jpg', 'thumbnail2.jpg'])
+        self.assertIs(self.fetches['https://example.com/thumbnail1.jpg'], neighbour)
+
+    def test_not_fetched(self):
+        """Test that cached thumbnails and assets without large thumbnail are not fetched."""
+        directory = paths.get_temp_dir('model_search')
+        cached_path = os.path.join(directory, self.results[0].thumbnail)
+        with open(cached_path, 'wb') as thumbnail_file:
+            thumbnail_file.write(b'jpeg')
+        ThumbnailCache().add(cached_path)
+        self.results[1].thumbnail_url = ''
+        self.fetcher.hover(self.results, 0)
+        self.fetcher.hover(self.results, 1)
+        self.assertEqual(self.fetches, {})
+
+    def test_finished_fetch_forgotten(self):
+        """Test that a finished fetch can be made again once its thumbnail is evicted."""
+        self.fetcher.hover(self.results, 0)
+        self.fetches.pop('https://example.com/thumbnail0.jpg').set_result(None)
+        self.fetcher.leave()
+        self.fetcher.hover(self.results, 0)
+        self.assertEqual(self._pending(), ['thumbnail0.jpg'])
+
+    def test_waits_for_pointer_to_rest(self):
+        """Test that nothing is downloaded if the pointer moves on before the hover delay."""
+        download = AsyncMock()
+
+        async def fetch():  # noqa: WPS430
+            task = asyncio.ensure_future(self.fetcher._fetch('path', 'url'))  # noqa: WPS437
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with patch.object(large_thumbnails, 'download_thumbnail', download):
+            asyncio.run(fetch())
+            download.assert_not_called()
+            with patch.object(large_thumbnails, 'HOVER_DELAY', 0):
+                asyncio.run(self.fetcher._fetch('path', 'url'))  # noqa: WPS437
+        download.assert_called_once_with('path', 'url')
+
+
+if __name__ == '__main__':
+    unittest.main()
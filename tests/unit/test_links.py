@@ -0,0 +1,73 @@
+"""File placement tests."""
+import errno
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import stubs  # noqa: F401
+
+from hana3d.src.download import links
+from hana3d.src.download.links import link_file
+
+
+def _unsupported(source: str, target: str):
+    raise OSError(errno.ENOTSUP, 'not supported')
+
+
+class TestLinkFile(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Create a source file in a new directory."""
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, 'source.blend')
+        self.target = os.path.join(self.directory, 'target.blend')
+        with open(self.source, 'wb') as source_file:
+            source_file.write(b'blend content')
+
+    def _strategies(self, *supported: str):
+        """Keep the strategies in their order, making the ones not named fail."""
+        strategies = [
+            (strategy, place_file if strategy in supported else _unsupported)
+            for strategy, place_file in links.STRATEGIES
+        ]
+        return patch.object(links, 'STRATEGIES', strategies)
+
+    def _assert_placed(self):
+        with open(self.target, 'rb') as target_file:
+            self.assertEqual(target_file.read(), b'blend content')
+        self.assertEqual(sorted(os.listdir(self.directory)), ['source.blend', 'target.blend'])
+
+    def test_first_strategy_that_works(self):
+        """Test that the first strategy that works is used."""
+        with self._strategies('hardlink', 'symlink', 'copy'):
+            self.assertEqual(link_file(self.source, self.target), 'hardlink')
+        self._assert_placed()
+        self.assertTrue(os.path.samefile(self.source, self.target))
+
+    def test_replaces_target(self):
+        """Test that an existing target is replaced."""
+        with open(self.target, 'wb') as target_file:
+            target_file.write(b'old content')
+        with self._strategies('copy'):
+            self.assertEqual(link_file(self.source, self.target), 'copy')
+        self._assert_placed()
+        self.assertFalse(os.path.samefile(self.source, self.target))
+
+    def test_no_symlink(self):
+        """Test that symlinks are skipped for sources that may be deleted."""
+        with self._strategies('symlink', 'copy'):
+            self.assertEqual(link_file(self.source, self.target, allow_symlink=False), 'copy')
+            self.assertEqual(link_file(self.source, self.target), 'symlink')
+        self._assert_placed()
+        self.assertTrue(os.path.islink(self.target))
+
+    def test_all_fail(self):
+        """Test that an error is raised when the file can not even be copied."""
+        with self._strategies():
+            with self.assertRaises(OSError):
+                link_file(self.source, self.target)
+        self.assertEqual(os.listdir(self.directory), ['source.blend'])
+
+
+if __name__ == '__main__':
+    unittest.main()
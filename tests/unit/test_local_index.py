@@ -0,0 +1,107 @@
+"""Local search index tests."""
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+import stubs
+
+from hana3d.src.search.local_index import LocalIndex
+from hana3d.src.search.search import AssetData
+
+
+def _asset(asset_id: str, view_id: str, name: str, **kwargs) -> AssetData:
+    return AssetData('', '', '', asset_id, view_id, name, 'model', **kwargs)
+
+
+def _query(search_term: str = '', **kwargs) -> SimpleNamespace:
+    query = {
+        'asset_type': 'model',
+        'view_id': '',
+        'search_term': search_term,
+        'verification_status': '',
+        'public': False,
+        'workspace': '',
+        'tags': '',
+        'libraries': '',
+    }
+    query.update(kwargs)
+    return SimpleNamespace(**query)
+
+
+class TestLocalIndex(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new global directory and index."""
+        stubs.set_preferences(stubs.default_preferences())
+        stubs.reset_singletons()
+        self.index = LocalIndex()
+        self.addCleanup(self.index.close)
+        self._record([
+            _asset('chair', 'chair_view', 'Wooden chair', tags=['wood', 'seat'], workspace='team'),
+            _asset(
+                'table',
+                'table_view',
+                'Table',
+                description='Oak dining table',
+                libraries=[{'id': 'furniture', 'name': 'Furniture'}],
+            ),
+        ])
+
+    def _record(self, search_results, public: bool = False):
+        asyncio.run(self.index.record_async(search_results, public=public))
+
+    def _view_ids(self, query) -> list:
+        return sorted(asset_data.view_id for asset_data in self.index.search(query))
+
+    def test_text_search(self):
+        """Test that words match names and descriptions by prefix."""
+        self.assertEqual(self._view_ids(_query('wood')), ['chair_view'])
+        self.assertEqual(self._view_ids(_query('din')), ['table_view'])
+        self.assertEqual(self._view_ids(_query('')), ['chair_view', 'table_view'])
+        self.assertEqual(self._view_ids(_query('sofa')), [])
+
+    def test_filters(self):
+        """Test the filters of the query."""
+        self.assertEqual(self._view_ids(_query(tags='seat')), ['chair_view'])
+        self.assertEqual(self._view_ids(_query(libraries='furniture')), ['table_view'])
+        self.assertEqual(self._view_ids(_query(workspace='team')), ['chair_view'])
+        self.assertEqual(self._view_ids(_query(view_id='table_view')), ['table_view'])
+        self.assertEqual(self._view_ids(_query(asset_type='material')), [])
+
+    def test_public(self):
+        """Test that public-only queries only match assets seen in public searches."""
+        self.assertEqual(self._view_ids(_query(public=True)), [])
+        self._record([_asset('table', 'table_view', 'Table')], public=True)
+        self.assertEqual(self._view_ids(_query(public=True)), ['table_view'])
+        self._record([_asset('table', 'table_view', 'Table')])
+        self.assertEqual(self._view_ids(_query(public=True)), ['table_view'])
+
+    def test_update(self):
+        """Test that a result seen again replaces the previous one."""
+        self._record([_asset('chair', 'chair_view', 'Metal chair')])
+        self.assertEqual(self._view_ids(_query('wood')), [])
+        self.assertEqual(self._view_ids(_query('metal')), ['chair_view'])
+
+    def test_downloaded(self):
+        """Test that downloads are remembered when the result is seen again."""
+        self.index.mark_downloaded('chair_view')
+        self._record([_asset('chair', 'chair_view', 'Wooden chair')])
+        downloaded = {
+            asset_data.view_id: asset_data.downloaded for asset_data in self.index.search(_query())
+        }
+        self.assertEqual(downloaded, {'chair_view': 100, 'table_view': 0})
+
+    def test_remove(self):
+        """Test that every view of an edited or deleted asset is removed."""
+        self._record([_asset('chair', 'chair_view_2', 'Wooden chair')])
+        self.index.remove('chair')
+        self.assertEqual(self._view_ids(_query()), ['table_view'])
+        self.assertEqual(self._view_ids(_query('wood')), [])
+
+    def test_clear(self):
+        """Test that clearing the index on logout forgets every asset."""
+        self.index.clear()
+        self.assertEqual(self._view_ids(_query()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
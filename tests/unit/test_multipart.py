@@ -0,0 +1,120 @@
+"""Multipart upload tests."""
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import stubs
+
+from hana3d.src.upload.multipart import MEBIBYTE, MIN_PART_SIZE, MultipartUpload
+
+
+def _response(status_code: int = 200, json_data=None, headers=None) -> MagicMock:
+    response = MagicMock()
+    response.ok = status_code < 400
+    response.status_code = status_code
+    response.json.return_value = json_data
+    response.headers = headers or {}
+    return response
+
+
+class TestMultipartUpload(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Create a file of 12 MiB and parts of 5 MiB."""
+        self.preferences = stubs.default_preferences()
+        self.preferences.upload_part_size = 5
+        stubs.set_preferences(self.preferences)
+        self.file_path = os.path.join(tempfile.mkdtemp(), 'asset.blend')
+        with open(self.file_path, 'wb') as upload_file:
+            upload_file.write(os.urandom(12 * MEBIBYTE))
+
+        self.request = MagicMock()
+        self.request.post = AsyncMock()
+        self.request.put = AsyncMock(return_value=_response(headers={'ETag': 'etag'}))
+        self.request.delete = AsyncMock()
+        for target, replacement in (('Request', lambda: self.request), ('paths', MagicMock())):
+            patcher = patch(f'hana3d.src.upload.multipart.{target}', replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _upload(self, upload_state=None) -> MultipartUpload:
+        file_info = {'file_path': self.file_path, 'type': 'blend'}
+        return MultipartUpload(MagicMock(), 'correlation', 'upload', file_info, upload_state)
+
+    def _part_urls(self, count: int, multipart_id: str = 'multipart'):
+        parts = [{'url': f'https://bucket.example.com/{number}'} for number in range(count)]
+        return _response(json_data={'parts': parts, 'multipartUploadId': multipart_id})
+
+    def test_part_math(self):
+        """Test that parts are sized in MiB and the last one holds the rest."""
+        upload = self._upload()
+        self.assertEqual(upload.part_size, 5 * MEBIBYTE)
+        self.assertEqual(upload.part_count, 3)
+        self.assertEqual(len(upload._read_part(1)), 5 * MEBIBYTE)  # noqa: WPS437
+        self.assertEqual(len(upload._read_part(3)), 2 * MEBIBYTE)  # noqa: WPS437
+
+    def test_stored_part_size(self):
+        """Test that a resumed upload keeps its part size, unless it is too small."""
+        upload = self._upload({'parts': [], 'part_size': 6 * MEBIBYTE})
+        self.assertEqual(upload.part_count, 2)
+
+        upload_state = {'parts': [{'partNumber': 1, 'etag': 'etag'}], 'part_size': MEBIBYTE}
+        upload = self._upload(upload_state)
+        self.assertEqual(upload.part_size, MIN_PART_SIZE)
+        self.assertEqual(upload_state['parts'], [])
+
+    def test_upload(self):
+        """Test that every part is sent and the upload is completed in order."""
+        self.request.post.side_effect = [self._part_urls(3), _response()]
+        upload_state = {'parts': []}
+        self.assertTrue(asyncio.run(self._upload(upload_state).run()))
+        self.assertEqual(self.request.put.await_count, 3)
+        complete_info = self.request.post.await_args.kwargs['json']
+        self.assertEqual([part['partNumber'] for part in complete_info['parts']], [1, 2, 3])
+        self.assertEqual(complete_info['multipartUploadId'], 'multipart')
+        self.assertEqual(upload_state['multipart_id'], 'multipart')
+
+    def test_resume(self):
+        """Test that parts of the same multipart upload are not sent again."""
+        self.request.post.side_effect = [self._part_urls(3), _response()]
+        upload_state = {
+            'parts': [{'partNumber': 2, 'etag': 'etag'}],
+            'part_size': 5 * MEBIBYTE,
+            'multipart_id': 'multipart',
+        }
+        self.assertTrue(asyncio.run(self._upload(upload_state).run()))
+        self.assertEqual(self.request.put.await_count, 2)
+        start_info = self.request.post.await_args_list[0].kwargs['json']
+        self.assertEqual(start_info['multipartUploadId'], 'multipart')
+
+    def test_resume_gone(self):
+        """Test that every part is sent again when the previous multipart upload is gone."""
+        self.request.post.side_effect = [self._part_urls(3, 'new'), _response()]
+        upload_state = {
+            'parts': [{'partNumber': 2, 'etag': 'etag'}],
+            'part_size': 5 * MEBIBYTE,
+            'multipart_id': 'multipart',
+        }
+        self.assertTrue(asyncio.run(self._upload(upload_state).run()))
+        self.assertEqual(self.request.put.await_count, 3)
+        self.assertEqual(upload_state['multipart_id'], 'new')
+
+    def test_not_available(self):
+        """Test that a backend without multipart uploads falls back to one request."""
+        self.request.post.return_value = _response(404)
+        self.assertIsNone(asyncio.run(self._upload().run()))
+        self.request.put.assert_not_awaited()
+
+    @patch('hana3d.src.upload.multipart.RETRY_DELAY', 0)
+    def test_failed_part(self):
+        """Test that a part failing every attempt aborts an upload that can not be resumed."""
+        self.request.post.return_value = self._part_urls(3)
+        self.request.put.return_value = _response(500)
+        with self.assertLogs(level='WARNING'):
+            self.assertFalse(asyncio.run(self._upload().run()))
+        self.request.delete.assert_awaited_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
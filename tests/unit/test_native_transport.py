@@ -0,0 +1,134 @@
+"""Asyncio HTTP transport parsing tests."""
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+import stubs  # noqa: F401
+from requests.structures import CaseInsensitiveDict
+
+from hana3d.src.requests_async.native_transport import NativeResponse, _read_head
+
+
+def _reader(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+def _response(data: bytes, headers: dict, status_code: int = 200) -> NativeResponse:
+    connection = MagicMock()
+    connection.reader = _reader(data)
+    return NativeResponse(
+        'GET',
+        'https://api.example.com/',
+        status_code,
+        'OK',
+        CaseInsensitiveDict(headers),
+        connection,
+        keep_alive=False,
+    )
+
+
+class TestReadHead(unittest.TestCase):  # noqa: D101
+    def _read_head(self, data: bytes):
+        async def read():  # noqa: WPS430
+            return await _read_head(_reader(data), timeout=1)
+        return asyncio.run(read())
+
+    def test_status_and_headers(self):
+        """Test parsing of the status line and headers."""
+        status_code, reason, headers, http_version = self._read_head(
+            b'HTTP/1.1 404 Not Found\r\n'
+            b'Content-Type: application/json\r\n'
+            b'Set-Cookie: a=1\r\n'
+            b'set-cookie: b=2\r\n'
+            b'\r\n',
+        )
+        self.assertEqual(status_code, 404)
+        self.assertEqual(reason, 'Not Found')
+        self.assertEqual(http_version, 'HTTP/1.1')
+        self.assertEqual(headers['content-type'], 'application/json')
+        self.assertEqual(headers['Set-Cookie'], 'a=1, b=2')
+
+    def test_skips_continue(self):
+        """Test that interim 100 Continue responses are skipped."""
+        status_code, reason, _, _ = self._read_head(
+            b'HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 201 Created\r\nContent-Length: 0\r\n\r\n',
+        )
+        self.assertEqual(status_code, 201)
+        self.assertEqual(reason, 'Created')
+
+    def test_no_reason(self):
+        """Test a status line without reason phrase."""
+        status_code, reason, _, _ = self._read_head(b'HTTP/1.1 204\r\n\r\n')
+        self.assertEqual(status_code, 204)
+        self.assertEqual(reason, '')
+
+    def test_malformed_status_line(self):
+        """Test that a response that is not HTTP is rejected."""
+        with self.assertRaises(ValueError):
+            self._read_head(b'SSH-2.0-OpenSSH\r\n\r\n')
+        with self.assertRaises(ValueError):
+            self._read_head(b'HTTP/1.1 OK\r\n\r\n')
+
+    def test_connection_closed(self):
+        """Test that a connection closed before the response is reported."""
+        with self.assertRaises(ConnectionResetError):
+            self._read_head(b'')
+
+
+class TestResponseBody(unittest.TestCase):  # noqa: D101
+    def _read(self, data: bytes, headers: dict) -> NativeResponse:
+        async def read():  # noqa: WPS430
+            response = _response(data, headers)
+            await response.read()
+            return response
+        return asyncio.run(read())
+
+    def test_chunked(self):
+        """Test decoding of a chunked body with extensions and trailers."""
+        response = self._read(
+            b'5;name=value\r\nhello\r\n6\r\n world\r\n0\r\nExpires: never\r\n\r\n',
+            {'Transfer-Encoding': 'chunked'},
+        )
+        self.assertEqual(response.content, b'hello world')
+
+    def test_chunked_malformed(self):
+        """Test that a bad chunk size is a ChunkedEncodingError."""
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            self._read(b'zz\r\nhello\r\n', {'Transfer-Encoding': 'chunked'})
+
+    def test_content_length(self):
+        """Test that the body stops at its length."""
+        response = self._read(b'{"count": 1}extra', {'Content-Length': '12'})
+        self.assertEqual(response.json(), {'count': 1})
+
+    def test_truncated(self):
+        """Test that a body shorter than its length is a ConnectionError."""
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self._read(b'short', {'Content-Length': '10'})
+
+    def test_until_close(self):
+        """Test that a body without length is read until the connection closes."""
+        response = self._read(b'all of it', {})
+        self.assertEqual(response.content, b'all of it')
+
+    def test_no_body(self):
+        """Test that a 304 response has an empty body without reading."""
+        async def create():  # noqa: WPS430
+            return _response(b'', {'Content-Length': '10'}, status_code=304)
+        self.assertEqual(asyncio.run(create()).content, b'')
+
+    def test_streamed_not_read(self):
+        """Test that the content of a streamed response is not available before reading it."""
+        async def create():  # noqa: WPS430
+            return _response(b'body', {'Content-Length': '4'})
+        response = asyncio.run(create())
+        with self.assertRaises(RuntimeError):
+            response.content  # noqa: WPS428
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Partial download bookkeeping tests."""
+import json
+import os
+import tempfile
+import unittest
+
+import stubs  # noqa: F401
+
+from hana3d.src.download.partial import (
+    PartialDownload,
+    get_sidecar_path,
+    has_partial,
+    load_partial,
+    remove_partial,
+    save_partial,
+)
+
+URL = 'https://cdn.example.com/asset.blend'
+
+
+class TestPartialDownload(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Create the path of a partial download."""
+        self.file_name = os.path.join(tempfile.mkdtemp(), 'asset.blend')
+        self.tmp_file_name = f'{self.file_name}_tmp'
+
+    def _write(self, content: bytes):
+        with open(self.tmp_file_name, 'wb') as tmp_file:
+            tmp_file.write(content)
+
+    def test_resume_single_stream(self):
+        """Test that the size of the file on disk is where a single stream resumes."""
+        self._write(b'0123456789')
+        save_partial(self.tmp_file_name, PartialDownload(URL, 'etag', bytes_written=4))
+        partial = load_partial(self.tmp_file_name, URL)
+        self.assertEqual(partial.bytes_written, 10)
+        self.assertEqual(partial.etag, 'etag')
+        self.assertTrue(has_partial(self.file_name))
+
+    def test_resume_segments(self):
+        """Test that segmented downloads count the bytes written in each segment."""
+        self._write(bytes(100))
+        segments = [[0, 49, 20], [50, 99, 50]]
+        save_partial(
+            self.tmp_file_name,
+            PartialDownload(URL, 'etag', bytes_written=0, size=100, segments=segments),
+        )
+        partial = load_partial(self.tmp_file_name, URL)
+        self.assertEqual(partial.bytes_written, 70)
+        self.assertEqual(partial.segments, segments)
+
+    def test_presigned_query_is_ignored(self):
+        """Test that a new signature of the same url resumes the download."""
+        self._write(b'0123')
+        save_partial(self.tmp_file_name, PartialDownload(f'{URL}?signature=1', '', 0))
+        self.assertIsNotNone(load_partial(self.tmp_file_name, f'{URL}?signature=2'))
+
+    def test_other_url(self):
+        """Test that a partial download of another file is discarded."""
+        self._write(b'0123')
+        save_partial(self.tmp_file_name, PartialDownload(URL, '', 0))
+        self.assertIsNone(load_partial(self.tmp_file_name, 'https://cdn.example.com/other.blend'))
+        self.assertFalse(os.path.exists(self.tmp_file_name))
+        self.assertFalse(has_partial(self.file_name))
+
+    def test_wrong_preallocated_size(self):
+        """Test that a segmented download whose file was truncated is discarded."""
+        self._write(bytes(60))
+        save_partial(
+            self.tmp_file_name,
+            PartialDownload(URL, '', 0, size=100, segments=[[0, 99, 60]]),
+        )
+        self.assertIsNone(load_partial(self.tmp_file_name, URL))
+        self.assertFalse(os.path.exists(self.tmp_file_name))
+
+    def test_corrupted_sidecar(self):
+        """Test that an unreadable sidecar discards the partial download."""
+        self._write(b'0123')
+        with open(get_sidecar_path(self.tmp_file_name), 'w') as sidecar_file:
+            json.dump({'url': URL}, sidecar_file)
+        with self.assertLogs(level='WARNING'):
+            self.assertIsNone(load_partial(self.tmp_file_name, URL))
+        self.assertFalse(os.path.exists(get_sidecar_path(self.tmp_file_name)))
+
+    def test_empty_file(self):
+        """Test that an empty single stream download starts over."""
+        self._write(b'')
+        save_partial(self.tmp_file_name, PartialDownload(URL, '', 0))
+        self.assertIsNone(load_partial(self.tmp_file_name, URL))
+
+    def test_remove_keep_file(self):
+        """Test that only the sidecar can be removed."""
+        self._write(b'0123')
+        save_partial(self.tmp_file_name, PartialDownload(URL, '', 0))
+        remove_partial(self.tmp_file_name, keep_file=True)
+        self.assertTrue(os.path.isfile(self.tmp_file_name))
+        self.assertFalse(has_partial(self.file_name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""Asset bar preview window tests."""
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import stubs
+
+from hana3d.src.search import preview_window
+from hana3d.src.search.preview_window import PreviewWindow
+
+PREVIEW_BYTES = 100 * 1000
+
+
+class FakeTextures(object):
+    """Thumbnail textures whose previews all use the same memory until released."""
+
+    def __init__(self):
+        """Create FakeTextures."""
+        self.released = set()
+
+    def loaded_bytes(self, name: str) -> int:  # noqa: D102
+        return 0 if name in self.released else PREVIEW_BYTES
+
+    def release(self, name: str):  # noqa: D102
+        self.released.add(name)
+
+
+class TestPreviewWindow(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Show 2 rows of 2 model previews, out of 20 results of each asset type."""
+        self.preferences = stubs.default_preferences()
+        stubs.set_preferences(self.preferences)
+        stubs.reset_singletons()
+        self.ui_props = SimpleNamespace(
+            scrolloffset=0,
+            total_count=4,
+            wcount=2,
+            asset_type_search='MODEL',
+        )
+        bpy = sys.modules['bpy']
+        bpy.context.window_manager.hana3d = self.ui_props
+        bpy.data.images = {}
+        self.results = {
+            asset_type: [f'{asset_type}{index}' for index in range(20)]
+            for asset_type in ('model', 'material', 'scene')
+        }
+        self.loads = []
+        self.textures = FakeTextures()
+        for patcher in (
+            patch.object(preview_window, 'get_search_results', self.results.get),
+            patch.object(preview_window, 'load_preview', self._load_preview),
+            patch.object(preview_window, 'ThumbnailTextures', lambda: self.textures),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.window = PreviewWindow()
+
+    def _load_preview(self, asset_type: str, asset_data: str, index: int):
+        self.loads.append(asset_data)
+        self.textures.released.discard(f'.hana3d_{asset_type}_preview_{str(index).zfill(2)}')
+
+    def _loaded(self, asset_type: str) -> list:
+        return sorted(self.window._loaded.get(asset_type, ()))  # noqa: WPS437
+
+
+class TestScroll(TestPreviewWindow):  # noqa: D101
+    def test_visible_rows(self):
+        """Test that the visible rows and one row around them are loaded."""
+        self.ui_props.scrolloffset = 4
+        self.window.update('model')
+        self.assertEqual(self._loaded('model'), list(range(2, 10)))
+        self.window.update('model')
+        self.assertEqual(len(self.loads), 8)
+
+    def test_far_away_released(self):
+        """Test that previews far out of view are released and the ones near it are kept."""
+        self.ui_props.scrolloffset = 4
+        self.window.update('model')
+        self.ui_props.scrolloffset = 12
+        self.window.update('model')
+        self.assertEqual(self._loaded('model'), list(range(4, 18)))
+        self.assertIn('.hana3d_model_preview_02', self.textures.released)
+        self.assertNotIn('.hana3d_model_preview_04', self.textures.released)
+
+    def test_load_outside_window(self):
+        """Test that previews requested outside of the window are not loaded."""
+        self.window.load('model', 5)
+        self.window.load('model', 6)
+        self.window.load('model', 25)
+        self.assertEqual(self.loads, ['model5'])
+
+    def test_reset(self):
+        """Test that new results release every preview and load again."""
+        self.window.update('model')
+        self.window.reset('model')
+        self.assertEqual(self._loaded('model'), [])
+        self.window.update('model')
+        self.assertEqual(len(self.loads), 12)
+
+
+class TestAssetTypes(TestPreviewWindow):  # noqa: D101
+    def test_switch_restores_scroll(self):
+        """Test that each asset type keeps where its asset bar was scrolled."""
+        self.window.switch('model')
+        self.ui_props.scrolloffset = 6
+        self.ui_props.asset_type_search = 'MATERIAL'
+        self.window.switch('material')
+        self.assertEqual(self.ui_props.scrolloffset, 0)
+        self.ui_props.asset_type_search = 'MODEL'
+        self.window.switch('model')
+        self.assertEqual(self.ui_props.scrolloffset, 6)
+
+    def test_warm(self):
+        """Test that the first rows of a type that is not shown are loaded once."""
+        self.ui_props.scrolloffset = 8
+        self.window.update('model')
+        self.window.warm('material')
+        self.window.warm('material')
+        self.assertEqual(self._loaded('material'), list(range(6)))
+        self.assertEqual(self.loads.count('material0'), 1)
+
+    def test_budget(self):
+        """Test that the least recently warmed type is released over budget, never the shown one."""
+        self.preferences.preview_memory_budget = 1
+        self.window.update('model')
+        self.window.warm('material')
+        self.assertEqual(self._loaded('material'), list(range(6)))
+        self.window.warm('scene')
+        self.assertEqual(self._loaded('material'), [])
+        self.assertEqual(self._loaded('scene'), list(range(6)))
+        self.assertEqual(self._loaded('model'), list(range(6)))
+
+    def test_no_budget(self):
+        """Test that a budget of 0 keeps every preview."""
+        self.preferences.preview_memory_budget = 0
+        self.window.update('model')
+        self.window.warm('material')
+        self.window.warm('scene')
+        self.assertEqual(self._loaded('material'), list(range(6)))
+
+
+if __name__ == '__main__':
+    unittest.main()
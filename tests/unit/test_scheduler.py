@@ -0,0 +1,116 @@
+"""Download scheduler tests."""
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import stubs
+
+from hana3d.src.download import scheduler
+from hana3d.src.download.scheduler import DownloadPriority, DownloadScheduler
+
+
+class FakeDownloader(object):
+    """Download that records when it starts and finishes when told to."""
+
+    def __init__(self, view_id: str, started: list):
+        """Create a FakeDownloader.
+
+        Parameters:
+            view_id: view id of the asset
+            started: list the view id is appended to when the download starts
+        """
+        self.asset_data = SimpleNamespace(view_id=view_id, name=view_id)
+        self.queued = False
+        self.cancelled = False
+        self._started = started
+        self._done_callback = None
+
+    def mark_queued(self):  # noqa: D102
+        self.queued = True
+
+    def stopped(self) -> bool:  # noqa: D102
+        return self.cancelled
+
+    def start(self, done_callback):  # noqa: D102
+        self._started.append(self.asset_data.view_id)
+        self._done_callback = done_callback
+
+    def is_alive(self) -> bool:  # noqa: D102
+        return self._done_callback is not None
+
+    def finish(self):
+        """Finish the download, freeing its transfer slot."""
+        done_callback = self._done_callback
+        self._done_callback = None
+        done_callback(None)
+
+
+class TestDownloadScheduler(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new scheduler with one transfer slot, on a clock that moves when told to."""
+        self.preferences = stubs.default_preferences()
+        self.preferences.max_concurrent_downloads = 1
+        stubs.set_preferences(self.preferences)
+        stubs.reset_singletons()
+        self.now = 0.0
+        patcher = patch.object(scheduler.time, 'monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduler = DownloadScheduler()
+        self.started = []
+
+    def _submit(self, view_id: str, priority: DownloadPriority) -> FakeDownloader:
+        downloader = FakeDownloader(view_id, self.started)
+        self.scheduler.submit(downloader, priority)
+        return downloader
+
+    def test_priority_order(self):
+        """Test that higher priorities start first, in the order they were queued."""
+        first = self._submit('first', DownloadPriority.batch)
+        self._submit('batch', DownloadPriority.batch)
+        self._submit('user', DownloadPriority.user)
+        self._submit('other_user', DownloadPriority.user)
+        self.assertEqual(self.scheduler.queue_depth(), 3)
+        first.finish()
+        self.assertEqual(self.started, ['first', 'user'])
+        self.assertEqual(self.scheduler.active_count(), 1)
+
+    def test_user_never_waits_behind_batch(self):
+        """Test that a user download goes before a batch, however long the batch waited."""
+        batch = [self._submit(f'batch{index}', DownloadPriority.batch) for index in range(20)]
+        self.now += 600
+        self._submit('user', DownloadPriority.user)
+        batch[0].finish()
+        self.assertEqual(self.started, ['batch0', 'user'])
+        self.assertEqual(self.scheduler.average_wait_time(), 0)
+
+    def test_reprioritize(self):
+        """Test that a queued download can be promoted but not demoted."""
+        first = self._submit('first', DownloadPriority.user)
+        self._submit('batch', DownloadPriority.batch)
+        self._submit('dragged', DownloadPriority.batch)
+        user = self._submit('user', DownloadPriority.user)
+        self.assertFalse(self.scheduler.reprioritize('user', DownloadPriority.batch))
+        self.assertTrue(self.scheduler.reprioritize('dragged', DownloadPriority.user))
+        self.assertEqual(self.scheduler.wait_time('dragged'), 0)
+        first.finish()
+        self.assertEqual(self.started, ['first', 'user'])
+        user.finish()
+        self.assertEqual(self.started, ['first', 'user', 'dragged'])
+
+    def test_cancel(self):
+        """Test that cancelled and stopped downloads never start."""
+        first = self._submit('first', DownloadPriority.user)
+        self._submit('cancelled', DownloadPriority.user)
+        stopped = self._submit('stopped', DownloadPriority.user)
+        self._submit('last', DownloadPriority.user)
+        self.scheduler.cancel('cancelled')
+        stopped.cancelled = True
+        self.assertFalse(self.scheduler.is_queued('cancelled'))
+        first.finish()
+        self.assertEqual(self.started, ['first', 'last'])
+        self.assertEqual(self.scheduler.queue_depth(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Search response cache tests."""
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import stubs
+
+from hana3d.src.search import search_cache
+from hana3d.src.search.search_cache import MAX_ENTRIES, SearchCache
+
+
+def _query(search_term: str, workspace: str = '') -> SimpleNamespace:
+    query_dict = {'context': object(), 'search_term': search_term, 'workspace': workspace}
+    return SimpleNamespace(workspace=workspace, to_dict=lambda: query_dict)
+
+
+class TestSearchCache(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new cache, on a clock that only moves when told to."""
+        self.preferences = stubs.default_preferences()
+        self.preferences.search_cache_ttl = 10
+        stubs.set_preferences(self.preferences)
+        stubs.reset_singletons()
+        self.now = 100.0
+        patcher = patch.object(search_cache.time, 'monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = SearchCache()
+
+    def test_key(self):
+        """Test that keys tell apart queries, workspaces and pages."""
+        url = 'https://api.example.com/search'
+        key = SearchCache.key(_query('chair'), url)
+        self.assertEqual(key, SearchCache.key(_query('chair'), url))
+        self.assertNotEqual(key, SearchCache.key(_query('table'), url))
+        self.assertNotEqual(key, SearchCache.key(_query('chair', 'workspace'), url))
+        self.assertNotEqual(key, SearchCache.key(_query('chair'), f'{url}?page=2'))
+
+    def test_fresh_and_stale(self):
+        """Test that responses are fresh during the lifetime, then stale for a few lifetimes."""
+        self.cache.store('key', {'count': 1}, 'etag')
+        entry = self.cache.get('key')
+        self.assertTrue(self.cache.is_fresh(entry))
+
+        self.now += 15
+        entry = self.cache.get('key')
+        self.assertEqual(entry.response, {'count': 1})
+        self.assertFalse(self.cache.is_fresh(entry))
+
+        self.now += 30
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_touch(self):
+        """Test that a revalidated response is fresh again."""
+        self.cache.store('key', {'count': 1}, 'etag')
+        self.now += 15
+        self.cache.touch('key')
+        self.assertTrue(self.cache.is_fresh(self.cache.get('key')))
+
+    def test_oldest_evicted(self):
+        """Test that the cache keeps at most MAX_ENTRIES responses."""
+        for index in range(MAX_ENTRIES + 1):
+            self.cache.store(f'key{index}', {}, '')
+        self.assertIsNone(self.cache.get('key0'))
+        self.assertIsNotNone(self.cache.get(f'key{MAX_ENTRIES}'))
+
+    def test_disabled(self):
+        """Test that a lifetime of zero disables the cache."""
+        self.assertTrue(self.cache.enabled())
+        self.preferences.search_cache_ttl = 0
+        self.assertFalse(self.cache.enabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Search controller tests."""
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import stubs
+
+from hana3d.src.search import controller
+from hana3d.src.search.controller import SearchController
+
+DEBOUNCE_DELAY = 0.02
+
+
+class TestSearchController(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new controller with a short delay, whose searches are recorded instead of run."""
+        stubs.reset_singletons()
+        self.search_props = SimpleNamespace(is_searching=False)
+        self.searches = []
+        self.controller = SearchController()
+        for patcher in (
+            patch.object(controller, 'DEBOUNCE_DELAY', DEBOUNCE_DELAY),
+            patch.object(controller, 'get_search_props', lambda: self.search_props),
+            patch.object(controller, 'run_async_function', self._run_async_function),
+            patch.object(self.controller, '_run_operator', self.searches.append),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run_async_function(self, function, **kwargs) -> asyncio.Future:
+        return asyncio.ensure_future(function(**kwargs))
+
+    def test_generation(self):
+        """Test that only the latest search may show its results, and it sets `is_searching`."""
+        first = self.controller.begin(None)
+        self.assertTrue(self.search_props.is_searching)
+        second = self.controller.begin(None)
+        self.assertFalse(self.controller.is_current(first))
+        self.controller.finish(first)
+        self.assertTrue(self.search_props.is_searching)
+        self.controller.finish(second)
+        self.assertFalse(self.search_props.is_searching)
+
+    def test_cancels_superseded(self):
+        """Test that a new search cancels the one still running."""
+        async def run():  # noqa: WPS430
+            running = asyncio.ensure_future(asyncio.sleep(1))
+            self.controller.begin(running)
+            self.assertTrue(self.controller.is_searching())
+            self.controller.begin(None)
+            with self.assertRaises(asyncio.CancelledError):
+                await running
+            self.assertFalse(self.controller.is_searching())
+        asyncio.run(run())
+
+    def test_debounce(self):
+        """Test that only the last request sent while typing is searched, once typing stops."""
+        async def run():  # noqa: WPS430
+            for _ in range(3):
+                self.controller.request(debounce=True)
+                await asyncio.sleep(DEBOUNCE_DELAY / 10)
+            self.assertEqual(self.searches, [])
+            await asyncio.sleep(DEBOUNCE_DELAY * 1.5)
+        asyncio.run(run())
+        self.assertEqual(self.searches, [False])
+
+    def test_immediate_replaces_debounced(self):
+        """Test that a search sent right away drops the one waiting for typing to stop."""
+        async def run():  # noqa: WPS430
+            self.controller.request(debounce=True)
+            self.controller.request()
+            await asyncio.sleep(DEBOUNCE_DELAY * 1.5)
+        asyncio.run(run())
+        self.assertEqual(self.searches, [False])
+
+    def test_next_page_while_searching(self):
+        """Test that a next page is not requested while a search runs, but a new query is."""
+        async def run():  # noqa: WPS430
+            self.controller.begin(asyncio.ensure_future(asyncio.sleep(1)))
+            self.assertFalse(self.controller.request(get_next=True))
+            self.assertTrue(self.controller.request())
+        asyncio.run(run())
+        self.assertEqual(self.searches, [False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Shared HTTP session tests."""
+import unittest
+from unittest.mock import MagicMock, patch
+
+import stubs
+
+from hana3d.src.requests_async import session_pool
+from hana3d.src.requests_async.session_pool import DEFAULT_SETTINGS, SessionPool
+
+
+class TestSessionPool(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new pool whose sessions are mocks."""
+        self.preferences = stubs.default_preferences()
+        stubs.set_preferences(self.preferences)
+        stubs.reset_singletons()
+        self.pool = SessionPool()
+        patcher = patch.object(self.pool, '_create_session', side_effect=self._create_session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.created = []
+
+    def _create_session(self, pool_size: int, idle_timeout: int) -> MagicMock:
+        self.created.append((pool_size, idle_timeout))
+        return MagicMock()
+
+    def test_session_does_not_read_preferences(self):
+        """Test that worker threads get the session without reading the preferences."""
+        self.preferences.http_pool_size = 20
+        with patch.object(session_pool, 'Preferences') as preferences:
+            session = self.pool.session
+            self.assertIs(self.pool.session, session)
+            preferences.assert_not_called()
+        self.assertEqual(self.created, [DEFAULT_SETTINGS])
+
+    def test_configure_swaps_session(self):
+        """Test that new settings give a new session, without closing the one in use."""
+        self.pool.configure()
+        session = self.pool.session
+        self.preferences.http_pool_size = 20
+        self.pool.configure()
+        self.assertIsNot(self.pool.session, session)
+        session.close.assert_not_called()
+        self.assertEqual(self.created, [DEFAULT_SETTINGS, (20, 60)])
+
+        self.pool.close()
+        session.close.assert_called_once()
+
+    def test_configure_unchanged(self):
+        """Test that the session is kept while the settings do not change."""
+        session = self.pool.session
+        self.pool.configure()
+        self.assertIs(self.pool.session, session)
+
+    def test_post_not_retried(self):
+        """Test that requests that may create something twice are not retried."""
+        with patch.object(session_pool, 'Retry') as retry:
+            with patch.object(session_pool, 'PooledHTTPAdapter'):
+                SessionPool._create_session(self.pool, *DEFAULT_SETTINGS)  # noqa: WPS437
+        self.assertNotIn('POST', retry.call_args.kwargs['method_whitelist'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Upload stage timer tests."""
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import stubs  # noqa: F401
+
+from hana3d.src.upload.stage_timer import StageTimer
+
+
+class TestStageTimer(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Start a timer on a clock that only moves when told to."""
+        self.now = 0.0
+        patcher = patch('hana3d.src.upload.stage_timer.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.timer = StageTimer()
+
+    def _run(self, name: str, start: float, end: float, after=()):
+        self.now = start
+        with self.timer.stage(name, after=after):
+            self.now = end
+
+    def test_critical_path(self):
+        """Test that the path follows the dependency that ended last."""
+        self._run('save_file', 0, 2)
+        self._run('metadata', 0, 5)
+        self._run('export', 5, 9, after=('save_file', 'metadata'))
+        self._run('thumbnail', 0, 1)
+        self._run('upload', 9, 12, after=('export', 'thumbnail'))
+        self.assertEqual(self.timer.critical_path(), ['metadata', 'export', 'upload'])
+
+    def test_missing_dependency(self):
+        """Test that stages that did not run are ignored."""
+        self._run('export', 0, 3, after=('save_file',))
+        self._run('upload', 3, 4, after=('export', 'thumbnail'))
+        self.assertEqual(self.timer.critical_path(), ['export', 'upload'])
+
+    def test_failed_stage(self):
+        """Test that a stage that raised is still timed."""
+        with self.assertRaises(RuntimeError):
+            with self.timer.stage('export'):
+                self.now = 2
+                raise RuntimeError('export failed')
+        self.assertEqual(self.timer.critical_path(), ['export'])
+
+    def test_empty(self):
+        """Test a timer without stages."""
+        self.assertEqual(self.timer.critical_path(), [])
+        self.timer.log()
+
+    def test_first_failed_stage(self):
+        """Test that the first stage that raised is kept, and cancelled stages are not."""
+        self.assertIsNone(self.timer.failed_stage)
+        with self.assertRaises(ValueError):
+            with self.timer.stage('export'):
+                raise ValueError('Blender crashed')
+        with self.assertRaises(asyncio.CancelledError):
+            with self.timer.stage('thumbnail_upload'):
+                raise asyncio.CancelledError()
+        with self.assertRaises(ValueError):
+            with self.timer.stage('finish'):
+                raise ValueError('Not found')
+        self.assertEqual(self.timer.failed_stage, 'export')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Thumbnail cache tests."""
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import stubs
+
+from hana3d.src.cache.thumbnail_cache import (
+    INDEX_FILENAME,
+    SAVE_INTERVAL,
+    ThumbnailCache,
+    save_timer,
+)
+
+
+class TestThumbnailCache(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new temp directory and cache."""
+        self.preferences = stubs.default_preferences()
+        stubs.set_preferences(self.preferences)
+        stubs.reset_singletons()
+        sys.modules['bpy'].data.images = []
+        self.search_dir = os.path.join(tempfile.mkdtemp(), 'model_search')
+        os.makedirs(self.search_dir)
+        self.cache = ThumbnailCache()
+
+    def _download(self, file_name: str, size: int, last_access: float = 0) -> str:
+        thumbnail_path = os.path.join(self.search_dir, file_name)
+        with open(thumbnail_path, 'wb') as thumbnail_file:
+            thumbnail_file.write(bytes(size))
+        self.cache.add(thumbnail_path)
+        key = os.path.join('model_search', file_name)
+        self.cache._entries[key]['last_access'] = last_access  # noqa: WPS437
+        return thumbnail_path
+
+    def test_contains(self):
+        """Test that added thumbnails are found and other files are not."""
+        thumbnail_path = self._download('chair.jpg', 10)
+        self.assertTrue(self.cache.contains(thumbnail_path))
+        self.assertFalse(self.cache.contains(os.path.join(self.search_dir, 'table.jpg')))
+        self.assertFalse(self.cache.contains('/elsewhere/chair.jpg'))
+
+    def test_contains_does_not_touch_disk(self):
+        """Test that lookups only read memory, and a thumbnail that failed to load is dropped."""
+        thumbnail_path = self._download('chair.jpg', 10)
+        self.cache.save()
+        with patch('os.path.isfile') as isfile, patch('os.stat') as stat:
+            self.assertTrue(self.cache.contains(thumbnail_path))
+            isfile.assert_not_called()
+            stat.assert_not_called()
+        os.remove(thumbnail_path)
+        self.cache.discard(thumbnail_path)
+        self.assertFalse(self.cache.contains(thumbnail_path))
+        self.assertEqual(self.cache._total_size, 0)  # noqa: WPS437
+
+    def test_saved_by_timer(self):
+        """Test that lookups leave writing the index to the timer."""
+        thumbnail_path = self._download('chair.jpg', 10)
+        index_path = os.path.join(os.path.dirname(self.search_dir), INDEX_FILENAME)
+        self.cache.contains(thumbnail_path)
+        self.assertFalse(os.path.exists(index_path))
+        self.assertEqual(save_timer(), SAVE_INTERVAL)
+        self.assertTrue(os.path.isfile(index_path))
+
+    def test_evict(self):
+        """Test that the least recently used thumbnails go until the cache is under its target."""
+        self.preferences.thumbnail_cache_size = 1
+        old_path = self._download('old.jpg', 400 * 1000, last_access=1)
+        loaded_path = self._download('loaded.jpg', 400 * 1000, last_access=2)
+        new_path = self._download('new.jpg', 100 * 1000, last_access=3)
+        sys.modules['bpy'].data.images = [SimpleNamespace(filepath=loaded_path)]
+
+        self.assertEqual(self.cache.evict(), 0)
+        self._download('newest.jpg', 300 * 1000, last_access=4)
+        self.assertFalse(os.path.exists(old_path))
+        self.assertTrue(os.path.isfile(loaded_path))
+        self.assertTrue(os.path.isfile(new_path))
+        self.assertLessEqual(self.cache._total_size, 900 * 1000)  # noqa: WPS437
+
+    def test_index_is_saved(self):
+        """Test that a new instance reads the saved index."""
+        thumbnail_path = self._download('chair.jpg', 10)
+        self.cache.save()
+        stubs.reset_singletons()
+        self.assertTrue(ThumbnailCache().contains(thumbnail_path))
+
+    def test_scan(self):
+        """Test that thumbnails written before the index are found, but not partial downloads."""
+        for file_name in ('chair.jpg', 'table.jpg_tmp'):
+            with open(os.path.join(self.search_dir, file_name), 'wb') as thumbnail_file:
+                thumbnail_file.write(bytes(10))
+        self.assertTrue(self.cache.contains(os.path.join(self.search_dir, 'chair.jpg')))
+        self.assertFalse(self.cache.contains(os.path.join(self.search_dir, 'table.jpg_tmp')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""Thumbnail texture decoding tests."""
+import struct
+import sys
+import unittest
+import zlib
+
+import numpy
+import stubs
+
+from hana3d.src.ui.thumbnail_textures import ThumbnailTextures, _unfilter, decode_png
+
+GRAY = 0
+RGB = 2
+PALETTE = 3
+GRAY_ALPHA = 4
+
+
+def _chunk(chunk_type: bytes, body: bytes) -> bytes:
+    crc = zlib.crc32(chunk_type + body)
+    return struct.pack('>I', len(body)) + chunk_type + body + struct.pack('>I', crc)
+
+
+def _png(  # noqa: WPS211
+    width: int,
+    scanlines: list,
+    color_type: int = GRAY,
+    bit_depth: int = 8,
+    interlace: int = 0,
+) -> bytes:
+    """Build a PNG from its filter type bytes and filtered rows, split in two IDAT chunks."""
+    header = struct.pack('>IIBBBBB', width, len(scanlines), bit_depth, color_type, 0, 0, interlace)
+    compressed = zlib.compress(bytes(byte for scanline in scanlines for byte in scanline))
+    middle = len(compressed) // 2
+    return b''.join((
+        b'\x89PNG\r\n\x1a\n',
+        _chunk(b'IHDR', header),
+        _chunk(b'IDAT', compressed[:middle]),
+        _chunk(b'IDAT', compressed[middle:]),
+        _chunk(b'IEND', b''),
+    ))
+
+
+def _unfiltered(scanlines: list, channels: int = 1) -> list:
+    return _unfilter(numpy.array(scanlines, dtype=numpy.uint8), channels).tolist()
+
+
+class TestUnfilter(unittest.TestCase):  # noqa: D101
+    def test_none(self):
+        """Test that unfiltered rows are kept as they are."""
+        self.assertEqual(_unfiltered([[0, 10, 20, 250], [0, 1, 2, 3]]), [[10, 20, 250], [1, 2, 3]])
+
+    def test_sub(self):
+        """Test that Sub rows add the byte of the pixel on the left, wrapping around."""
+        self.assertEqual(_unfiltered([[1, 10, 10, 230], [1, 200, 156, 0]]), [
+            [10, 20, 250],
+            [200, 100, 100],
+        ])
+
+    def test_sub_channels(self):
+        """Test that Sub rows add the same channel of the pixel on the left."""
+        unfiltered = _unfiltered([[1, 10, 20, 1, 2, 3, 4]], channels=2)
+        self.assertEqual(unfiltered, [[10, 20, 11, 22, 14, 26]])
+
+    def test_up(self):
+        """Test that Up rows add the row above, and the first row adds nothing."""
+        self.assertEqual(_unfiltered([[2, 5, 6], [2, 1, 1], [2, 255, 0]]), [
+            [5, 6],
+            [6, 7],
+            [5, 7],
+        ])
+
+    def test_mixed(self):
+        """Test that runs of Up rows start from the row of another filter above them."""
+        self.assertEqual(_unfiltered([[0, 1, 2], [2, 3, 4], [1, 7, 1], [2, 1, 1], [2, 1, 1]]), [
+            [1, 2],
+            [4, 6],
+            [7, 8],
+            [8, 9],
+            [9, 10],
+        ])
+
+
+class TestDecodePNG(unittest.TestCase):  # noqa: D101
+    def test_gray(self):
+        """Test that gray pixels are opaque RGBA floats, bottom row first."""
+        decoded = decode_png(_png(2, [[0, 0, 255], [1, 51, 51]]))
+        self.assertEqual((decoded.width, decoded.height), (2, 2))
+        self.assertEqual(numpy.round(numpy.array(decoded.pixels) * 255).tolist(), [
+            51, 51, 51, 255, 102, 102, 102, 255,
+            0, 0, 0, 255, 255, 255, 255, 255,
+        ])
+
+    def test_rgb_up(self):
+        """Test an RGB image with an Up row."""
+        decoded = decode_png(_png(1, [[0, 255, 0, 0], [2, 1, 255, 0]], color_type=RGB))
+        self.assertEqual(numpy.round(numpy.array(decoded.pixels) * 255).tolist(), [
+            0, 255, 0, 255,
+            255, 0, 0, 255,
+        ])
+
+    def test_gray_alpha(self):
+        """Test that the alpha channel is kept."""
+        decoded = decode_png(_png(1, [[0, 255, 0]], color_type=GRAY_ALPHA))
+        self.assertEqual(list(decoded.pixels), [1, 1, 1, 0])
+
+    def test_left_to_blender(self):
+        """Test that PNGs this decoder does not handle and other files are left to Blender."""
+        self.assertIsNone(decode_png(_png(1, [[3, 1]])))
+        self.assertIsNone(decode_png(_png(1, [[0, 1], [4, 1]])))
+        self.assertIsNone(decode_png(_png(1, [[0, 0, 1]], bit_depth=16)))
+        self.assertIsNone(decode_png(_png(1, [[0, 1]], interlace=1)))
+        self.assertIsNone(decode_png(_png(1, [[0, 0]], color_type=PALETTE)))
+        self.assertIsNone(decode_png(b'\xff\xd8\xff\xe0\x00\x10JFIF\x00'))
+
+    def test_broken(self):
+        """Test that truncated PNGs and PNGs without header are errors."""
+        with self.assertRaises(ValueError):
+            decode_png(_png(4, [[0, 1, 2]]))
+        with self.assertRaises(ValueError):
+            decode_png(b'\x89PNG\r\n\x1a\n' + _chunk(b'IEND', b''))
+
+
+class TestAvailable(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use new preferences, outside of background mode."""
+        self.preferences = stubs.default_preferences()
+        stubs.set_preferences(self.preferences)
+        sys.modules['bpy'].app.background = False
+
+    def test_opt_in(self):
+        """Test that thumbnails are only loaded as textures when enabled in the preferences."""
+        self.assertFalse(ThumbnailTextures.available('/thumbnails/chair.png'))
+        self.preferences.thumbnail_textures = True
+        self.assertTrue(ThumbnailTextures.available('/thumbnails/chair.png'))
+
+    def test_png_only(self):
+        """Test that thumbnails the workers can not decode stay Image datablocks."""
+        self.preferences.thumbnail_textures = True
+        self.assertFalse(ThumbnailTextures.available('/thumbnails/chair.jpg'))
+
+
+if __name__ == '__main__':
+    unittest.main()
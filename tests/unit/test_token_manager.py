@@ -0,0 +1,109 @@
+"""API token refresh tests."""
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+import stubs
+
+from hana3d.src.authentication import token_manager
+from hana3d.src.authentication.token_manager import REFRESH_MARGIN, TokenManager
+
+
+class FakeAuthenticator(object):
+    """Auth server that counts refreshes and answers once it is released."""
+
+    def __init__(self, error: Exception = None):
+        """Create a FakeAuthenticator.
+
+        Parameters:
+            error: error raised instead of answering
+        """
+        self.calls = 0
+        self.released = threading.Event()
+        self._error = error
+
+    def get_refreshed_token(self, refresh_token: str) -> dict:  # noqa: D102
+        self.calls += 1
+        self.released.wait(timeout=5)
+        if self._error is not None:
+            raise self._error
+        return {'access_token': f'new_{refresh_token}', 'refresh_token': 'next_refresh'}
+
+
+class TestTokenManager(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a token about to expire and an auth server that answers when told to."""
+        self.preferences = stubs.default_preferences()
+        self.preferences.api_key = 'old_token'
+        self.preferences.api_key_refresh = 'refresh'
+        self.preferences.api_key_timeout = time.time() + REFRESH_MARGIN / 2
+        self.preferences.refresh_in_progress = False
+        stubs.set_preferences(self.preferences)
+        stubs.reset_singletons()
+        self.authenticator = FakeAuthenticator()
+        self.oauth = MagicMock()
+        self.oauth.create_authenticator.side_effect = lambda: self.authenticator
+        self.oauth.write_tokens.side_effect = self._write_tokens
+        for patcher in (
+            patch.object(token_manager, 'hana3d_oauth', self.oauth),
+            patch.object(token_manager, 'UI'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _write_tokens(self, oauth_response: dict):
+        self.preferences.api_key = oauth_response['access_token']
+        self.preferences.api_key_timeout = time.time() + 3600
+
+    def _gather(self, *coroutine_functions) -> list:
+        async def run():  # noqa: WPS430
+            tasks = [asyncio.ensure_future(function()) for function in coroutine_functions]
+            await asyncio.sleep(0.01)
+            self.authenticator.released.set()
+            return await asyncio.gather(*tasks)
+        return asyncio.run(run())
+
+    def test_single_flight(self):
+        """Test that concurrent callers share a single refresh."""
+        manager = TokenManager()
+        tokens = self._gather(manager.get_token, manager.refresh, manager.get_token)
+        self.assertEqual(tokens, ['new_refresh'] * 3)
+        self.assertEqual(self.authenticator.calls, 1)
+        self.assertFalse(manager.needs_refresh())
+        self.assertEqual(self._gather(manager.get_token), ['new_refresh'])
+        self.assertEqual(self.authenticator.calls, 1)
+
+    def test_rejected_token_already_replaced(self):
+        """Test that a token refused after it was replaced gets the new one without refreshing."""
+        tokens = self._gather(lambda: TokenManager().refresh(rejected_token='older_token'))
+        self.assertEqual(tokens, ['old_token'])
+        self.assertEqual(self.authenticator.calls, 0)
+
+    def test_unreachable(self):
+        """Test that the tokens are kept when the auth server can not be reached."""
+        self.authenticator = FakeAuthenticator(requests.exceptions.ConnectionError('offline'))
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(self._gather(TokenManager().get_token), [''])
+        self.oauth.reset_tokens.assert_not_called()
+        self.assertFalse(self.preferences.refresh_in_progress)
+        self.assertTrue(TokenManager().needs_refresh())
+
+    def test_refused(self):
+        """Test that the user is logged out when the refresh token is refused."""
+        self.authenticator = FakeAuthenticator(AssertionError('invalid_grant'))
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(self._gather(TokenManager().get_token), [''])
+        self.oauth.reset_tokens.assert_called_once()
+
+    def test_logged_out(self):
+        """Test that there is nothing to refresh without a token."""
+        self.preferences.api_key = ''
+        self.assertFalse(TokenManager().needs_refresh())
+        self.assertEqual(self._gather(TokenManager().get_token), [''])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Uploaded file hashes tests."""
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import stubs
+
+from hana3d.src.cache.asset_cache import hash_file
+from hana3d.src.upload.uploaded_hashes import (
+    _get_record_path,
+    get_replaced_blend_hash,
+    get_uploaded_hashes,
+    record_uploaded_hashes,
+    without_upload_ids,
+)
+
+
+class TestUploadedHashes(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new global directory."""
+        stubs.set_preferences(stubs.default_preferences())
+
+    def test_round_trip(self):
+        """Test that hashes are recorded by asset and merged with the previous ones."""
+        record_uploaded_hashes('asset', blend='blend_hash', view_id='view')
+        record_uploaded_hashes('asset', thumbnail='thumbnail_hash')
+        record_uploaded_hashes('other', blend='other_hash')
+        self.assertEqual(
+            get_uploaded_hashes('asset'),
+            {'blend': 'blend_hash', 'view_id': 'view', 'thumbnail': 'thumbnail_hash'},
+        )
+
+    def test_unknown_asset(self):
+        """Test that new assets have no hashes."""
+        self.assertEqual(get_uploaded_hashes(''), {})
+        self.assertEqual(get_uploaded_hashes('asset'), {})
+
+    def test_corrupted(self):
+        """Test that an unreadable record is ignored."""
+        with open(_get_record_path(), 'w') as record_file:
+            record_file.write('not json')
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(get_uploaded_hashes('asset'), {})
+            record_uploaded_hashes('asset', blend='blend_hash')
+        self.assertEqual(get_uploaded_hashes('asset'), {'blend': 'blend_hash'})
+        self.assertFalse(os.path.exists(f'{_get_record_path()}_tmp'))
+
+
+class TestReupload(unittest.TestCase):  # noqa: D101
+    def setUp(self):
+        """Use a new global directory and an asset uploaded once."""
+        stubs.set_preferences(stubs.default_preferences())
+        self.props = SimpleNamespace(id='asset', view_id='first_view', name='Chair')
+        record_uploaded_hashes('asset', blend=self._content_hash(), view_id='first_view')
+
+    def _content_hash(self) -> str:
+        """Write the asset as the upload does, with the ids of a new view, and hash it."""
+        self.props.view_id = f'{self.props.view_id}_new'
+        with without_upload_ids(self.props):
+            source_file, source_filepath = tempfile.mkstemp()
+            with os.fdopen(source_file, 'w') as source:
+                json.dump(vars(self.props), source)
+        self.assertEqual(self.props.id, 'asset')
+        return hash_file(source_filepath)
+
+    def test_unchanged_skips_blend(self):
+        """Test that reuploading an unchanged asset finds the blend file of the view it replaces."""
+        self.assertEqual(get_replaced_blend_hash('asset', 'first_view'), self._content_hash())
+
+    def test_changed(self):
+        """Test that a changed asset is uploaded again."""
+        self.props.name = 'Table'
+        self.assertNotEqual(get_replaced_blend_hash('asset', 'first_view'), self._content_hash())
+
+    def test_other_view(self):
+        """Test that the blend file is only compared to the view replaced."""
+        self.assertIsNone(get_replaced_blend_hash('asset', 'other_view'))
+        self.assertIsNone(get_replaced_blend_hash('asset', None))
+        self.assertIsNone(get_replaced_blend_hash('other', 'first_view'))
+
+
+if __name__ == '__main__':
+    unittest.main()